@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+import time
+import argparse
+from typing import Union
+
+import numpy as np
+
+from gops.simulate import SimulationResult
+
+# AIPlayer difficulties with an array version below
+BATCH_DIFFICULTIES = [1, 2, 3, 5]
+
+N_CARDS = 13
+NVALS = np.arange(1, N_CARDS + 1)
+
+
+def _dist_cumsum() -> np.ndarray:
+    # Hand.get_dist for every hand size. The distribution is built in an int
+    # array so each weight is truncated, e.g. 13 cards gives 13, 6, 3, 1, 0...
+    cum = np.zeros((N_CARDS + 1, N_CARDS))
+    for count in range(1, N_CARDS + 1):
+        weights = np.asarray([int(count / 2**x) for x in range(count)], dtype=float)
+        cum[count, :count] = np.cumsum(weights / weights.sum())
+        cum[count, count:] = np.inf
+    return cum
+
+
+DIST_CUMSUM = _dist_cumsum()
+
+
+# Each bid function takes the (N, 13) bool hands, the prize card and the
+# prize value (prize card plus tied pot) for every game and returns the bids.
+def random_bids(hands: np.ndarray, prize_cards: np.ndarray, prize_values: np.ndarray, rng) -> np.ndarray:
+    # Hand.select_random_card
+    keys = np.where(hands, rng.random(hands.shape), -1.0)
+    return np.argmax(keys, axis=1) + 1
+
+
+def prize_card_bids(hands: np.ndarray, prize_cards: np.ndarray, prize_values: np.ndarray, rng) -> np.ndarray:
+    # Hand.select_prize_card_strategy, the prize card value is always still in
+    # hand since each prize value only comes up once.
+    return prize_cards.copy()
+
+
+def strategy_1_bids(hands: np.ndarray, prize_cards: np.ndarray, prize_values: np.ndarray, rng) -> np.ndarray:
+    # Hand.select_card_strategy_1
+    prize_values = np.minimum(prize_values, 13)[:, None]
+    high = prize_values >= 7
+    weights = np.where(high, np.abs(NVALS - prize_values) + 0.1 * (NVALS < prize_values), NVALS)
+    weights = np.where(hands, weights, np.inf)
+    card_indexes = np.argsort(weights, axis=1)
+
+    counts = hands.sum(axis=1)
+    r = rng.random(len(hands))
+    index = (DIST_CUMSUM[counts] < r[:, None]).sum(axis=1)
+    index = np.minimum(index, counts - 1)
+    bids = card_indexes[np.arange(len(hands)), index] + 1
+
+    # play the lowest card rather than a low card on a high prize, unless it
+    # is the highest card left
+    lowest = np.argmax(hands, axis=1) + 1
+    highest = N_CARDS - np.argmax(hands[:, ::-1], axis=1)
+    low_bid = high[:, 0] & (bids < prize_values[:, 0]) & (bids != highest)
+    return np.where(low_bid, lowest, bids)
+
+
+def strategy_2_bids(hands: np.ndarray, prize_cards: np.ndarray, prize_values: np.ndarray, rng) -> np.ndarray:
+    # Hand.select_card_strategy_2. The strategy collection only changes
+    # through AIPlayer.update_state, which difficulty 5 never calls, so the
+    # predicted opponent bid is always the prize value clamped to the cards.
+    c = 3.5
+    opp_bids = np.minimum(prize_values, 13)[:, None]
+    values = prize_values[:, None]
+    efficiency = np.where(NVALS > opp_bids, (values * c) / np.log2(1 + NVALS + opp_bids),
+                          np.where(NVALS == opp_bids, 0.0, opp_bids - NVALS))
+    efficiency = np.where(hands, efficiency, -np.inf)
+    return np.argmax(efficiency, axis=1) + 1
+
+
+BID_FUNCTIONS = {1: random_bids,
+                 2: prize_card_bids,
+                 3: strategy_1_bids,
+                 5: strategy_2_bids}
+
+
+class BatchResult():
+    # Per game arrays for a batch of games, turn t is column t.
+    def __init__(self, p1_difficulty: int, p2_difficulty: int, prize_orders: np.ndarray,
+                 bids_1: np.ndarray, bids_2: np.ndarray, scores_1: np.ndarray, scores_2: np.ndarray):
+        self.p1_difficulty = p1_difficulty
+        self.p2_difficulty = p2_difficulty
+        self.prize_orders = prize_orders
+        self.bids_1 = bids_1
+        self.bids_2 = bids_2
+        self.scores_1 = scores_1
+        self.scores_2 = scores_2
+        self.winners = np.where(scores_1 > scores_2, 1, np.where(scores_2 > scores_1, 2, 0))
+        self.elapsed = 0.0
+
+    def n_games(self) -> int:
+        return len(self.winners)
+
+    def margins(self) -> np.ndarray:
+        return self.scores_1 - self.scores_2
+
+    def to_simulation_result(self) -> SimulationResult:
+        result = SimulationResult(self.p1_difficulty, self.p2_difficulty)
+        result.games = self.n_games()
+        result.p1_wins = int(np.sum(self.winners == 1))
+        result.p2_wins = int(np.sum(self.winners == 2))
+        result.draws = int(np.sum(self.winners == 0))
+        margins, counts = np.unique(self.margins(), return_counts=True)
+        for margin, count in zip(margins, counts):
+            result.margins[int(margin)] = int(count)
+        result.elapsed = self.elapsed
+        return result
+
+
+def random_prize_orders(n_games: int, rng) -> np.ndarray:
+    return rng.permuted(np.tile(NVALS, (n_games, 1)), axis=1)
+
+
+def simulate_batch(n_games: int, p1_difficulty: int, p2_difficulty: int, seed: Union[int, None] = None,
+                   prize_orders: np.ndarray = None) -> BatchResult:
+    # plays n_games in lockstep, one array operation per turn for each step
+    for difficulty in [p1_difficulty, p2_difficulty]:
+        if difficulty not in BATCH_DIFFICULTIES:
+            raise Exception("Bad difficulty.")
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    if prize_orders is None:
+        prize_orders = random_prize_orders(n_games, rng)
+    n_games = len(prize_orders)
+    rows = np.arange(n_games)
+
+    hands_1 = np.ones((n_games, N_CARDS), dtype=bool)
+    hands_2 = np.ones((n_games, N_CARDS), dtype=bool)
+    bids_1 = np.zeros((n_games, N_CARDS), dtype=np.int8)
+    bids_2 = np.zeros((n_games, N_CARDS), dtype=np.int8)
+    scores_1 = np.zeros(n_games, dtype=np.int32)
+    scores_2 = np.zeros(n_games, dtype=np.int32)
+    pot = np.zeros(n_games, dtype=np.int32)
+
+    bid_function_1 = BID_FUNCTIONS[p1_difficulty]
+    bid_function_2 = BID_FUNCTIONS[p2_difficulty]
+    for turn in range(N_CARDS):
+        prize_cards = prize_orders[:, turn].astype(np.int32)
+        prize_values = pot + prize_cards
+
+        bid_1 = bid_function_1(hands_1, prize_cards, prize_values, rng)
+        bid_2 = bid_function_2(hands_2, prize_cards, prize_values, rng)
+        hands_1[rows, bid_1 - 1] = False
+        hands_2[rows, bid_2 - 1] = False
+        bids_1[:, turn] = bid_1
+        bids_2[:, turn] = bid_2
+
+        scores_1 += np.where(bid_1 > bid_2, prize_values, 0)
+        scores_2 += np.where(bid_2 > bid_1, prize_values, 0)
+        pot = np.where(bid_1 == bid_2, prize_values, 0)
+
+    result = BatchResult(p1_difficulty, p2_difficulty, prize_orders.astype(np.int8), bids_1, bids_2, scores_1, scores_2)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def simulate_batches(n_games: int, p1_difficulty: int, p2_difficulty: int, seed: Union[int, None] = None,
+                     batch_size: int = 100000) -> SimulationResult:
+    # runs n_games in batches so memory stays bounded
+    seeds = np.random.SeedSequence(seed).spawn((n_games + batch_size - 1) // batch_size)
+    result = SimulationResult(p1_difficulty, p2_difficulty)
+    for batch, batch_seed in enumerate(seeds):
+        size = min(batch_size, n_games - batch * batch_size)
+        batch_result = simulate_batch(size, p1_difficulty, p2_difficulty, batch_seed)
+        result.merge(batch_result.to_simulation_result())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play batches of AI games with numpy arrays.")
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--p1", type=int, default=1, choices=BATCH_DIFFICULTIES)
+    parser.add_argument("--p2", type=int, default=3, choices=BATCH_DIFFICULTIES)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=100000)
+    args = parser.parse_args()
+
+    result = simulate_batches(args.games, args.p1, args.p2, args.seed, args.batch_size)
+    print(result.summary())
+
+
+if __name__ == "__main__":
+    main()
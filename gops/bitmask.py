@@ -0,0 +1,82 @@
+from typing import List, Tuple, Union
+
+# A suit is held as an integer with bit (nval - 1) set for each card present,
+# e.g. the full 13 card suit is 0b1111111111111.
+SUIT_SIZE = 13
+FULL_SUIT = (1 << SUIT_SIZE) - 1
+
+_NVAL_TO_VALUE = {1: "A", 11: "J", 12: "Q", 13: "K"}
+_VALUE_TO_NVAL = {"A": 1, "J": 11, "Q": 12, "K": 13}
+
+# ascending card values for every possible suit mask
+_MASK_NVALS = tuple(tuple(x + 1 for x in range(SUIT_SIZE) if (mask >> x) & 1) for mask in range(FULL_SUIT + 1))
+
+
+def full_mask(n_cards: int = SUIT_SIZE) -> int:
+    return (1 << n_cards) - 1
+
+
+def nval_bit(nval: int) -> int:
+    return 1 << (nval - 1)
+
+
+def nval_to_value(nval: int) -> Union[int, str]:
+    return _NVAL_TO_VALUE.get(nval, nval)
+
+
+def value_to_nval(value: Union[int, str]) -> int:
+    if isinstance(value, int):
+        return value
+    if value in _VALUE_TO_NVAL:
+        return _VALUE_TO_NVAL[value]
+    return int(value)
+
+
+def in_mask(mask: int, nval: int) -> bool:
+    if (nval < 1) or (nval > mask.bit_length()):
+        return False
+    return bool((mask >> (nval - 1)) & 1)
+
+
+def remove_nval(mask: int, nval: int) -> int:
+    return mask & ~nval_bit(nval)
+
+
+def mask_count(mask: int) -> int:
+    return mask.bit_count()
+
+
+def mask_min(mask: int) -> int:
+    # lowest card value in the mask, -1 if empty
+    if mask == 0:
+        return -1
+    return (mask & -mask).bit_length()
+
+
+def mask_max(mask: int) -> int:
+    # highest card value in the mask, -1 if empty
+    if mask == 0:
+        return -1
+    return mask.bit_length()
+
+
+def mask_to_nvals(mask: int) -> Tuple[int, ...]:
+    if mask <= FULL_SUIT:
+        return _MASK_NVALS[mask]
+    return tuple(x + 1 for x in range(mask.bit_length()) if (mask >> x) & 1)
+
+
+def nvals_to_mask(nvals: List[int]) -> int:
+    mask = 0
+    for nval in nvals:
+        mask |= nval_bit(nval)
+    return mask
+
+
+def mask_sum(mask: int) -> int:
+    return sum(mask_to_nvals(mask))
+
+
+def nval_index(mask: int, nval: int) -> int:
+    # position of the card in the ascending order of the mask
+    return (mask & (nval_bit(nval) - 1)).bit_count()
@@ -1,5 +1,6 @@
 import torch
 import random
+import numbers
 import numpy as np
 from typing import List, Tuple, Union
 
@@ -7,23 +8,71 @@ from tokenizers import Tokenizer
 from tokenizers.models import WordLevel
 
 import gops.ui_elements as ui
+import gops.bitmask as bm
 
 from gops.bid_prediction import StrategyCollection, get_player_bid_efficiency
 
-from model_components.inference_components import translate_random
+from model_components.inference_components import translate_random, translate_ids
 from model_components.transformer_components import construct_text_transform
 
 from gops.statements import state_to_statement
+from gops.state_encoder import load_state_encoder
 
 from gops.bid_prediction import StrategyCollection, get_player_bid_efficiency
 
 
+# Loaded models and tokenizers are shared by every hand in the process, so
+# playing many games only reads the files once.
+_TRANSFORMER_MODELS = {}
+_TOKENIZERS = {}
+
+
+def load_transformer_model(modelpath: str, DEVICE):
+    if (modelpath, str(DEVICE)) not in _TRANSFORMER_MODELS:
+        _TRANSFORMER_MODELS[(modelpath, str(DEVICE))] = torch.load(modelpath, map_location=DEVICE)
+    return _TRANSFORMER_MODELS[(modelpath, str(DEVICE))]
+
+
+def load_tokenizer(filepath: str) -> Tokenizer:
+    if filepath not in _TOKENIZERS:
+        _TOKENIZERS[filepath] = Tokenizer.from_file(filepath)
+    return _TOKENIZERS[filepath]
+
+
 class Card():
-    def __init__(self, suit: str, val: Union[str, int]):
-        self.ace = "low"
-        self._suit = suit
-        self._val = val
-        self.nval = self.get_num_value()
+    # Cards are immutable flyweights, there is one shared instance per
+    # (suit, value). Copying a hand or a trace only copies references.
+    __slots__ = ("ace", "_suit", "_val", "nval")
+    _instances = {}
+
+    def __new__(cls, suit: str, val: Union[str, int]):
+        card = cls._instances.get((suit, val))
+        if card is None:
+            if isinstance(val, numbers.Integral):
+                val = int(val)
+            card = object.__new__(cls)
+            object.__setattr__(card, "ace", "low")
+            object.__setattr__(card, "_suit", suit)
+            object.__setattr__(card, "_val", val)
+            object.__setattr__(card, "nval", card.get_num_value())
+            cls._instances[(suit, val)] = card
+        return card
+
+    def __setattr__(self, name, value):
+        raise Exception("Cards are immutable.")
+
+    def __delattr__(self, name):
+        raise Exception("Cards are immutable.")
+
+    def __copy__(self) -> "Card":
+        return self
+
+    def __deepcopy__(self, memo) -> "Card":
+        return self
+
+    def __reduce__(self) -> tuple:
+        # unpickling goes through __new__ and gets the shared instance
+        return (Card, (self._suit, self._val))
 
     # Move this to the card suit class
     def get_num_value(self) -> Union[int, None]:
@@ -134,9 +183,18 @@ class Hand(SuitCards):
         self.current_turn = 0
         self.opp_hand = None
 
+    def _pop_index(self, idx: int) -> Card:
+        return self._order.pop(idx)
+
+    def _pop_nval(self, nval: int) -> Union[Card, None]:
+        for idx, card in enumerate(self._order):
+            if card.nval == nval:
+                return self._order.pop(idx)
+        return None
+
     def select_random_card(self) -> Card:
         selected = random.choice(range(self.card_count()))
-        return self._order.pop(selected)
+        return self._pop_index(selected)
 
     def max_value(self) -> int:
         m = -1
@@ -166,28 +224,17 @@ class Hand(SuitCards):
 
     def select_prize_card_strategy(self, prize_card: Card) -> Card:
         # selects same card as last prize card
-        card_values = self.get_card_nvals()
-        idx = 0
-        for val in card_values:
-            if val == prize_card.nval:
-                return self._order.pop(idx)
-            idx += 1
-        return None
+        return self._pop_nval(prize_card.nval)
 
     def find_card(self, target_card: Card) -> Card:
-        card_values = self.get_card_nvals()
-        idx = 0
-        for val in card_values:
-            if val == target_card.nval:
-                return self._order.pop(idx)
-            idx += 1
-        return None
+        return self._pop_nval(target_card.nval)
 
     def select_card_strategy_1(self, prize_value: int) -> Card:
         # if prize_value < 7, select near min value vard.
         # else select card close to prize value.
         # TODO: Alg. assumes cards are sorted. Should check this!
-        card_weight = self.get_card_nvals()
+        card_nvals = self.get_card_nvals()
+        card_weight = card_nvals
         if prize_value < 7:
             card_indexes = np.argsort(card_weight)
         else:
@@ -195,8 +242,8 @@ class Hand(SuitCards):
                 prize_value = 13
             card_weight = list(np.abs(np.asarray(card_weight) - prize_value))
             # bias towards higher values
-            for idx, card in enumerate(self._order):
-                if card.nval < prize_value:
+            for idx, nval in enumerate(card_nvals):
+                if nval < prize_value:
                     card_weight[idx] = card_weight[idx] + 0.1
 
             card_indexes = np.argsort(card_weight)
@@ -206,11 +253,11 @@ class Hand(SuitCards):
 
         # if prize is high and playing a lower value card, play the lowest
         # value. unless the value select is the maximum card value in the hand.
-        card_value = self._order[card_loc].nval
+        card_value = card_nvals[card_loc]
         if ((prize_value >= 7) and (card_value < prize_value) and (card_value != self.max_value())):
             card_loc = 0
 
-        return self._order.pop(card_loc)
+        return self._pop_index(card_loc)
 
     def select_card_strategy_2(self, prize_value: int) -> Card:
         # Probabilistic strategy 2
@@ -241,37 +288,41 @@ class Hand(SuitCards):
 
         modelpath = app_path["model_path"]
 
-        game_state = state_to_statement(move_data)
-
         STATE_LANGUAGE = 'state'
         MOVE_LANGUAGE = 'move'
         BOS_IDX, EOS_IDX = 1, 2
 
         if self.transformer_model is None:
-            self.transformer_model = torch.load(modelpath, map_location=DEVICE)
+            self.transformer_model = load_transformer_model(modelpath, DEVICE)
 
             # load tokenizer
             if tokenizer_lib == "HF":
 
-                self.state_tokenizer = Tokenizer.from_file(app_path["state_tokenizer_path"])
-                self.move_tokenizer = Tokenizer.from_file(app_path["move_tokenizer_path"])
+                self.state_tokenizer = load_tokenizer(app_path["state_tokenizer_path"])
+                self.move_tokenizer = load_tokenizer(app_path["move_tokenizer_path"])
 
                 self.text_transform = construct_text_transform(self.state_tokenizer, self.move_tokenizer, STATE_LANGUAGE, MOVE_LANGUAGE)
-                selected_card = translate_random(self.transformer_model, game_state, self.text_transform, MOVE_LANGUAGE, STATE_LANGUAGE, BOS_IDX, DEVICE, EOS_IDX, topk)
+                # looks the state ids up directly, None if the tokenizer is not one it can reproduce
+                self.state_encoder = load_state_encoder(app_path["state_tokenizer_path"], self.state_tokenizer)
 
             elif tokenizer_lib == "TT":
                 raise Exception("Bad tokenizer library TT")
 
 
         if tokenizer_lib == "HF":
-            selected_card = translate_random(self.transformer_model, game_state, self.text_transform, MOVE_LANGUAGE, STATE_LANGUAGE, BOS_IDX, DEVICE, EOS_IDX, topk)
+            if self.state_encoder is not None:
+                src_ids = self.state_encoder.encode(move_data)
+                selected_card = translate_ids(self.transformer_model, src_ids, self.text_transform, MOVE_LANGUAGE, BOS_IDX, DEVICE, EOS_IDX, topk)
+            else:
+                game_state = state_to_statement(move_data)
+                selected_card = translate_random(self.transformer_model, game_state, self.text_transform, MOVE_LANGUAGE, STATE_LANGUAGE, BOS_IDX, DEVICE, EOS_IDX, topk)
         elif tokenizer_lib == "TT":
             raise Exception("Bad tokenizer library TT")
 
         selected_val = int(selected_card.split("_")[2])
-        for idx, card in enumerate(self._order):
-            if card.get_num_value() == selected_val:
-                return self._order.pop(idx)
+        card = self._pop_nval(selected_val)
+        if card is not None:
+            return card
 
         self._bad_selections += 1
         return self.select_random_card()
@@ -279,7 +330,7 @@ class Hand(SuitCards):
     def select_card(self, suit: str, val: int) -> Union[int, None]:
         in_stack, card_loc = self.card_in_stack(suit, val)
         if in_stack:
-            return self._order.pop(card_loc)
+            return self._pop_index(card_loc)
         else:
             print()
             print("Card not in hand! Select another card.")
@@ -308,6 +359,78 @@ class Hand(SuitCards):
             print()
 
 
+class BitmaskHand(Hand):
+    # Same interface as Hand but the suit is held as a 13 bit integer, bit
+    # (nval - 1) is set while the card is in the hand. The cards are always
+    # in ascending order, which is the order Hand sorts to. The mask is also
+    # a cheap hashable key for the hand.
+    def __init__(self, suit: str):
+        CardStack.__init__(self, [])
+        self.suit = suit
+        if self.suit not in self.card_suits:
+            raise Exception("Bad card suit.")
+        self.mask = bm.FULL_SUIT
+
+        self.transformer_model = None
+        self._bad_selections = 0
+
+        # probabilistic strategy 2
+        self.strat_collection = None
+        self.current_turn = 0
+        self.opp_hand = None
+
+    @property
+    def _order(self) -> List[Card]:
+        # read only view, cards are removed through the mask
+        return [Card(self.suit, bm.nval_to_value(nval)) for nval in bm.mask_to_nvals(self.mask)]
+
+    @_order.setter
+    def _order(self, cards: List[Card]):
+        self.mask = bm.nvals_to_mask([card.nval for card in cards])
+
+    def _take(self, nval: int) -> Card:
+        self.mask = bm.remove_nval(self.mask, nval)
+        return Card(self.suit, bm.nval_to_value(nval))
+
+    def _pop_index(self, idx: int) -> Card:
+        return self._take(bm.mask_to_nvals(self.mask)[idx])
+
+    def _pop_nval(self, nval: int) -> Union[Card, None]:
+        if bm.in_mask(self.mask, nval):
+            return self._take(nval)
+        return None
+
+    def card_count(self) -> int:
+        return bm.mask_count(self.mask)
+
+    def shuffle(self):
+        # a mask has no order to shuffle
+        pass
+
+    def sort_cards(self):
+        pass
+
+    def get_card_nvals(self) -> List[int]:
+        return list(bm.mask_to_nvals(self.mask))
+
+    def card_in_stack(self, suit: str, val: int) -> Tuple[bool, int]:
+        if suit not in self.card_suits:
+            raise Exception("Bad card suit.")
+        if val not in self.card_values:
+            raise Exception("Bad card value.")
+
+        nval = bm.value_to_nval(val)
+        if (suit == self.suit) and bm.in_mask(self.mask, nval):
+            return True, bm.nval_index(self.mask, nval)
+        return False, -1
+
+    def draw(self) -> Card:
+        return self._take(bm.mask_min(self.mask))
+
+    def max_value(self) -> int:
+        return bm.mask_max(self.mask)
+
+
 def card_value_to_nval(vec: list) -> list:
     convert_map = {"0": 0, "A": 1, "2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7,
                    "8": 8, "9": 9, "10": 10, "J": 11, "Q": 12, "K": 13}
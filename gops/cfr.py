@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+
+import time
+import pickle
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Tuple, Union
+
+import numpy as np
+
+import gops.bitmask as bm
+from gops.solver import canonical_hands, sign
+from gops.exploitability import best_response_value, uniform
+
+
+def _strategy(regrets: List[float]) -> List[float]:
+    # regret matching, uniform when no regret is positive
+    total = sum(regrets)
+    if total <= 0:
+        return [1 / len(regrets)] * len(regrets)
+    return [regret / total for regret in regrets]
+
+
+def _key(own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int) -> tuple:
+    # The game is symmetric and the whole state is public, so both seats share
+    # one table keyed from the side of the player to move.
+    return (*canonical_hands(own_hand, opp_hand), prizes, pot, diff)
+
+
+def _entry(table: dict, key: tuple, n_bids: int) -> list:
+    entry = table.get(key)
+    if entry is None:
+        entry = [[0.0] * n_bids, [0.0] * n_bids]
+        table[key] = entry
+    return entry
+
+
+def _traverse(table: dict, own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int,
+              iteration: int, margin_weight: float) -> float:
+    # External sampling from the side of own_hand at a decision node: every
+    # own bid is tried, the opponent bid and the next prize are sampled.
+    # Regrets are floored at zero (CFR+) and the opponent average strategy is
+    # weighted by the iteration number.
+    if (margin_weight == 0) and (abs(diff) > pot + bm.mask_sum(prizes)):
+        return sign(diff)
+
+    own_bids = bm.mask_to_nvals(own_hand)
+    opp_bids = bm.mask_to_nvals(opp_hand)
+    own_entry = _entry(table, _key(own_hand, opp_hand, prizes, pot, diff), len(own_bids))
+    opp_entry = _entry(table, _key(opp_hand, own_hand, prizes, pot, -diff), len(opp_bids))
+
+    opp_strategy = _strategy(opp_entry[0])
+    for idx, prob in enumerate(opp_strategy):
+        opp_entry[1][idx] += iteration * prob
+    opp_bid = random.choices(opp_bids, weights=opp_strategy)[0]
+    opp_rest = bm.remove_nval(opp_hand, opp_bid)
+    next_prize = random.choice(bm.mask_to_nvals(prizes)) if prizes else 0
+
+    values = []
+    for own_bid in own_bids:
+        if own_bid > opp_bid:
+            next_pot, next_diff = 0, diff + pot
+        elif opp_bid > own_bid:
+            next_pot, next_diff = 0, diff - pot
+        else:
+            next_pot, next_diff = pot, diff
+        if prizes == 0:
+            values.append(sign(next_diff) + margin_weight * next_diff)
+        else:
+            values.append(_traverse(table, bm.remove_nval(own_hand, own_bid), opp_rest,
+                                    bm.remove_nval(prizes, next_prize), next_pot + next_prize, next_diff,
+                                    iteration, margin_weight))
+
+    own_strategy = _strategy(own_entry[0])
+    value = sum(prob * val for prob, val in zip(own_strategy, values))
+    for idx, val in enumerate(values):
+        own_entry[0][idx] = max(0.0, own_entry[0][idx] + val - value)
+    return value
+
+
+def _train_subgame(n_cards: int, first_prize: int, table: dict, start: int, iterations: int,
+                   margin_weight: float, seed: int) -> dict:
+    # the subgame after the first prize is flipped, run in a worker process
+    random.seed(seed)
+    full = bm.full_mask(n_cards)
+    prizes = bm.remove_nval(full, first_prize)
+    for iteration in range(start + 1, start + iterations + 1):
+        _traverse(table, full, full, prizes, first_prize, 0, iteration, margin_weight)
+    return table
+
+
+class CFRTrainer():
+    # CFR+ for GOPS on an n_cards deck. Each first prize starts an
+    # independent subgame with its own table, and the subgames are trained in
+    # parallel in a process pool. The average strategies of all tables
+    # together are the policy.
+    def __init__(self, n_cards: int = 6, margin_weight: float = 0.0, seed: Union[int, None] = None):
+        self.n_cards = n_cards
+        self.margin_weight = margin_weight
+        self.iteration = 0
+        self.elapsed = 0.0
+        # (iteration, seconds, exploitability) at each report
+        self.history = []
+        self.tables = {prize: {} for prize in range(1, n_cards + 1)}
+        self.seed_sequence = np.random.SeedSequence(seed)
+
+    def train(self, iterations: int, workers: Union[int, None] = None, report_every: Union[int, None] = None,
+              checkpoint_path: Union[str, None] = None, on_report: Callable = None):
+        if report_every is None:
+            report_every = iterations
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            done = 0
+            while done < iterations:
+                chunk = min(report_every, iterations - done)
+                seeds = self.seed_sequence.spawn(1)[0].generate_state(self.n_cards)
+                start = time.perf_counter()
+                futures = {prize: pool.submit(_train_subgame, self.n_cards, prize, table, self.iteration, chunk,
+                                              self.margin_weight, int(seeds[prize - 1]))
+                           for prize, table in self.tables.items()}
+                for prize, future in futures.items():
+                    self.tables[prize] = future.result()
+                self.elapsed += time.perf_counter() - start
+                self.iteration += chunk
+                done += chunk
+
+                self.history.append((self.iteration, self.elapsed, self.exploitability()))
+                if checkpoint_path is not None:
+                    self.save_checkpoint(checkpoint_path)
+                if on_report is not None:
+                    on_report(*self.history[-1])
+
+    def average_policy(self) -> Dict[tuple, Tuple[float, ...]]:
+        # average strategy for every position reached, positions shared by
+        # several subgames add their strategy sums
+        sums = {}
+        for table in self.tables.values():
+            for key, entry in table.items():
+                if key in sums:
+                    sums[key] = [a + b for a, b in zip(sums[key], entry[1])]
+                else:
+                    sums[key] = list(entry[1])
+        return {key: tuple(_strategy(total)) for key, total in sums.items()}
+
+    def exploitability(self) -> float:
+        # best response win edge against the average policy, uniform play
+        # where a position was never reached
+        policy = self.average_policy()
+
+        def play(own_hand, opp_hand, prizes, pot_cards, prize, diff):
+            strategy = policy.get(_key(own_hand, opp_hand, prizes, bm.mask_sum(pot_cards), diff))
+            if strategy is None:
+                return uniform(bm.mask_count(own_hand))
+            return strategy
+
+        return best_response_value(play, self.n_cards, "win", self.margin_weight)
+
+    def save_checkpoint(self, filepath: str):
+        data = {"n_cards": self.n_cards,
+                "margin_weight": self.margin_weight,
+                "iteration": self.iteration,
+                "elapsed": self.elapsed,
+                "history": self.history,
+                "tables": self.tables,
+                "seed_sequence": self.seed_sequence}
+        with open(filepath, "wb") as outfile:
+            pickle.dump(data, outfile)
+
+    @classmethod
+    def load_checkpoint(cls, filepath: str) -> "CFRTrainer":
+        with open(filepath, "rb") as infile:
+            data = pickle.load(infile)
+        trainer = cls(data["n_cards"], data["margin_weight"])
+        trainer.iteration = data["iteration"]
+        trainer.elapsed = data["elapsed"]
+        trainer.history = data["history"]
+        trainer.tables = data["tables"]
+        trainer.seed_sequence = data["seed_sequence"]
+        return trainer
+
+    def export_policy(self, filepath: str):
+        # One row per position with more than one bid: the key as int16 and
+        # the average strategy over the bids in ascending order, zero padded.
+        policy = [(key, strategy) for key, strategy in self.average_policy().items() if len(strategy) > 1]
+        keys = np.zeros((len(policy), 5), dtype=np.int16)
+        strategies = np.zeros((len(policy), self.n_cards), dtype=np.float32)
+        for row, (key, strategy) in enumerate(policy):
+            keys[row] = key
+            strategies[row, :len(strategy)] = strategy
+        np.savez_compressed(filepath, n_cards=self.n_cards, keys=keys, strategies=strategies)
+
+
+class PolicyTable():
+    # policy exported by CFRTrainer.export_policy
+    def __init__(self, filepath: str):
+        with np.load(filepath) as data:
+            self.n_cards = int(data["n_cards"])
+            keys = data["keys"]
+            self.strategies = data["strategies"]
+        self.index = {tuple(int(x) for x in key): row for row, key in enumerate(keys)}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def strategy(self, own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int) -> Union[tuple, None]:
+        n_bids = bm.mask_count(own_hand)
+        if n_bids == 1:
+            return (1.0,)
+        row = self.index.get(_key(own_hand, opp_hand, prizes, pot, diff))
+        if row is None:
+            return None
+        return tuple(float(p) for p in self.strategies[row, :n_bids])
+
+    def select_bid(self, own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int) -> Union[int, None]:
+        strategy = self.strategy(own_hand, opp_hand, prizes, pot, diff)
+        if strategy is None:
+            return None
+        return random.choices(bm.mask_to_nvals(own_hand), weights=strategy)[0]
+
+
+_POLICIES = {}
+
+
+def load_policy(filepath: str) -> PolicyTable:
+    if filepath not in _POLICIES:
+        _POLICIES[filepath] = PolicyTable(filepath)
+    return _POLICIES[filepath]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a GOPS policy with CFR+.")
+    parser.add_argument("--cards", type=int, default=None, help="deck size, 6 by default")
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--report-every", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None)
+    parser.add_argument("--resume", action="store_true")
+    parser.add_argument("--policy", default=None)
+    args = parser.parse_args()
+
+    if args.resume:
+        if args.checkpoint is None:
+            parser.error("--resume needs --checkpoint")
+        # the deck size and random state are saved in the checkpoint
+        if (args.cards is not None) or (args.seed is not None):
+            parser.error("--cards and --seed cannot be changed when resuming")
+        trainer = CFRTrainer.load_checkpoint(args.checkpoint)
+    else:
+        trainer = CFRTrainer(6 if args.cards is None else args.cards, seed=args.seed)
+
+    def report(iteration, elapsed, exploitability):
+        print("iteration {:>8}  {:>8.1f} seconds  exploitability {:.5f}".format(iteration, elapsed, exploitability))
+
+    trainer.train(args.iterations, args.workers, args.report_every, args.checkpoint, report)
+    if args.policy is not None:
+        trainer.export_policy(args.policy)
+
+
+if __name__ == "__main__":
+    main()
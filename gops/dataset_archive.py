@@ -0,0 +1,213 @@
+import os
+import array
+import lzma
+import zlib
+import random
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+CODECS = {"zlib": 0, "lzma": 1}
+
+# one row per compressed block of samples
+INDEX_DTYPE = np.dtype([("shard", np.uint32),
+                        ("offset", np.uint64),
+                        ("nbytes", np.uint64),
+                        ("count", np.uint32),
+                        ("codec", np.uint8)])
+
+
+def _index_file(index_path: str) -> str:
+    # np.save adds .npy to a path without it, so both spellings name the same archive
+    return index_path if index_path.endswith(".npy") else index_path + ".npy"
+
+
+def shard_path(index_path: str, shard: int) -> str:
+    # models/train_data_<name>.npy -> models/train_data_<name>_00000.blocks
+    base = index_path[:-len(".npy")] if index_path.endswith(".npy") else index_path
+    return "{}_{:05d}.blocks".format(base, shard)
+
+
+def counts_path(index_path: str) -> str:
+    base = index_path[:-len(".npy")] if index_path.endswith(".npy") else index_path
+    return base + "_counts.npy"
+
+
+def _compress(data: bytes, codec: str, level: int) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, level)
+    return lzma.compress(data, preset=level)
+
+
+def _decompress(data: bytes, codec: int) -> bytes:
+    if codec == CODECS["zlib"]:
+        return zlib.decompress(data)
+    return lzma.decompress(data)
+
+
+class ArchiveWriter():
+    # Writes (state, move) string pairs in blocks of block_size samples, each
+    # compressed on its own, to shard files of about shard_bytes. The block
+    # index is saved with np.save at index_path when the writer is closed.
+    # A deduplicated set passes each pair's occurrence count to add, the
+    # counts are then saved next to the index for weighted sampling.
+    def __init__(self, index_path: str, block_size: int = 4096, shard_bytes: int = 256 * 2**20,
+                 codec: str = "zlib", level: int = 6):
+        if codec not in CODECS:
+            raise Exception("Unknown codec, use zlib or lzma.")
+        if block_size < 1:
+            raise Exception("Blocks need at least one sample.")
+        index_path = _index_file(index_path)
+        directory = os.path.dirname(index_path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        self.index_path = index_path
+        self.block_size = block_size
+        self.shard_bytes = shard_bytes
+        self.codec = codec
+        self.level = level
+        self.blocks = []
+        self.pending = []
+        self.counts = array.array("I")
+        self.weighted = False
+        self.shard = -1
+        self.outfile = None
+        self.offset = 0
+        self.closed = False
+
+    def add(self, state: str, move: str, count: int = 1):
+        if self.closed:
+            raise Exception("Archive writer is closed.")
+        for text in [state, move]:
+            if ("\t" in text) or ("\n" in text):
+                raise Exception("Samples cannot contain tabs or newlines.")
+        if count < 1:
+            raise Exception("Sample counts must be positive.")
+        self.pending.append(state + "\t" + move)
+        self.counts.append(count)
+        self.weighted = self.weighted or (count != 1)
+        if len(self.pending) == self.block_size:
+            self._write_block()
+
+    def add_many(self, pairs: Iterable[Tuple[str, ...]]):
+        # (state, move) or (state, move, count) tuples
+        for pair in pairs:
+            self.add(*pair)
+
+    def _write_block(self):
+        data = _compress("\n".join(self.pending).encode("utf-8"), self.codec, self.level)
+        if (self.outfile is None) or ((self.offset > 0) and (self.offset + len(data) > self.shard_bytes)):
+            if self.outfile is not None:
+                self.outfile.close()
+            self.shard += 1
+            self.outfile = open(shard_path(self.index_path, self.shard), "wb")
+            self.offset = 0
+        self.outfile.write(data)
+        self.blocks.append((self.shard, self.offset, len(data), len(self.pending), CODECS[self.codec]))
+        self.offset += len(data)
+        self.pending = []
+
+    def close(self):
+        if self.closed:
+            return
+        if len(self.pending) > 0:
+            self._write_block()
+        if self.outfile is not None:
+            self.outfile.close()
+        np.save(self.index_path, np.array(self.blocks, dtype=INDEX_DTYPE))
+        if self.weighted:
+            np.save(counts_path(self.index_path), np.frombuffer(self.counts, dtype=np.uint32))
+        elif os.path.exists(counts_path(self.index_path)):
+            os.remove(counts_path(self.index_path))
+        self.closed = True
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_archive(index_path: str, pairs: Iterable[Tuple[str, ...]], **kwargs):
+    with ArchiveWriter(index_path, **kwargs) as writer:
+        writer.add_many(pairs)
+
+
+class DatasetArchive():
+    # Map-style dataset over an archive, archive[i] is the i-th (state, move)
+    # pair. Every block but the last holds the same number of samples, so
+    # finding a sample's block is a division. Only the most recently used
+    # cache_blocks blocks are kept decompressed. counts holds the occurrence
+    # count of each sample for a deduplicated archive, None otherwise.
+    def __init__(self, index_path: str, cache_blocks: int = 8):
+        index_path = _index_file(index_path)
+        if not os.path.exists(index_path):
+            raise Exception("No dataset archive at " + index_path)
+        self.index_path = index_path
+        self.index = np.load(index_path)
+        if self.index.dtype != INDEX_DTYPE:
+            raise Exception("Not a dataset archive index.")
+        self.block_size = int(self.index["count"][0]) if len(self.index) > 0 else 1
+        self.n_samples = int(self.index["count"].sum())
+        self.counts = None
+        if os.path.exists(counts_path(index_path)):
+            self.counts = np.load(counts_path(index_path))
+            if len(self.counts) != self.n_samples:
+                raise Exception("Sample counts do not match the archive.")
+        self.cache_blocks = cache_blocks
+        self.cache = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.n_samples
+
+    def block(self, block: int) -> List[Tuple[str, str]]:
+        if block in self.cache:
+            self.cache.move_to_end(block)
+            return self.cache[block]
+        row = self.index[block]
+        with open(shard_path(self.index_path, int(row["shard"])), "rb") as infile:
+            infile.seek(int(row["offset"]))
+            data = _decompress(infile.read(int(row["nbytes"])), int(row["codec"]))
+        samples = [tuple(line.split("\t")) for line in data.decode("utf-8").split("\n")]
+        self.cache[block] = samples
+        if len(self.cache) > self.cache_blocks:
+            self.cache.popitem(last=False)
+        return samples
+
+    def __getitem__(self, sample: int) -> Tuple[str, str]:
+        if sample < 0:
+            sample += self.n_samples
+        if (sample < 0) or (sample >= self.n_samples):
+            raise IndexError(sample)
+        return self.block(sample // self.block_size)[sample % self.block_size]
+
+    def shuffled_order(self, seed: Union[int, None] = None, window: Union[int, None] = None) -> List[int]:
+        # A permutation of every sample that visits the blocks in random order
+        # and shuffles samples within groups of window blocks (the cache size
+        # by default), so each block is decompressed once per pass.
+        if window is None:
+            window = self.cache_blocks
+        rng = random.Random(seed)
+        blocks = list(range(len(self.index)))
+        rng.shuffle(blocks)
+        order = []
+        for start in range(0, len(blocks), window):
+            group = []
+            for block in blocks[start:start + window]:
+                first = block * self.block_size
+                group.extend(range(first, first + int(self.index["count"][block])))
+            rng.shuffle(group)
+            order.extend(group)
+        return order
+
+    def minibatches(self, batch_size: int, seed: Union[int, None] = None,
+                    window: Union[int, None] = None) -> Iterator[List[Tuple[str, str]]]:
+        batch = []
+        for sample in self.shuffled_order(seed, window):
+            batch.append(self[sample])
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if len(batch) > 0:
+            yield batch
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+import json
+import time
+import socket
+import struct
+import argparse
+import threading
+import socketserver
+from collections import deque
+from typing import Union
+
+from gops.simulate import DIFFICULTIES, DEFAULT_TRANSFORMER_PARAMS, SimulationResult, simulate
+
+# Messages are length prefixed JSON objects.
+#   worker -> coordinator: {"type": "request"}
+#   coordinator -> worker: {"type": "shard", "shard_id", "p1", "p2", "games", "seed"}
+#                          {"type": "wait", "seconds"}, no free shard yet
+#                          {"type": "done"}
+#   worker -> coordinator: {"type": "result", "shard_id", "result": SimulationResult.to_dict()}
+HEADER = struct.Struct("!I")
+
+
+def send_message(sock: socket.socket, message: dict):
+    data = json.dumps(message).encode("utf-8")
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Union[bytes, None]:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def recv_message(sock: socket.socket) -> Union[dict, None]:
+    # None once the other end has gone away
+    try:
+        header = _recv_exact(sock, HEADER.size)
+        if header is None:
+            return None
+        data = _recv_exact(sock, HEADER.unpack(header)[0])
+    except OSError:
+        return None
+    if data is None:
+        return None
+    return json.loads(data.decode("utf-8"))
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    # one per connected worker
+    def handle(self):
+        coordinator = self.server.coordinator
+        shard_id = None
+        while True:
+            message = recv_message(self.request)
+            if message is None:
+                break
+            if message["type"] == "request":
+                reply = coordinator.assign_shard(self)
+                shard_id = reply.get("shard_id")
+                send_message(self.request, reply)
+                if reply["type"] == "done":
+                    break
+            elif message["type"] == "result":
+                coordinator.complete_shard(message["shard_id"], message["result"])
+                shard_id = None
+
+        # worker died or hung up mid shard
+        if shard_id is not None:
+            coordinator.abandon_shard(shard_id, self)
+
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Coordinator():
+    # Splits n_games of one pairing into shards and hands them to workers.
+    # Shard i plays with seed + i. A shard is put back in the queue when its
+    # worker disconnects, or takes longer than shard_timeout seconds.
+    # in_flight maps each handed out shard to its start time and the worker
+    # it was last given to.
+    def __init__(self, p1_difficulty: int, p2_difficulty: int, n_games: int, seed: int = 0,
+                 shard_size: int = 1000, host: str = "localhost", port: int = 0,
+                 shard_timeout: Union[float, None] = None):
+        for difficulty in [p1_difficulty, p2_difficulty]:
+            if difficulty not in DIFFICULTIES:
+                raise Exception("Bad difficulty.")
+        self.p1_difficulty = p1_difficulty
+        self.p2_difficulty = p2_difficulty
+        self.shard_timeout = shard_timeout
+
+        self.shards = {}
+        for shard_id, start in enumerate(range(0, n_games, shard_size)):
+            self.shards[shard_id] = {"type": "shard", "shard_id": shard_id,
+                                     "p1": p1_difficulty, "p2": p2_difficulty,
+                                     "games": min(shard_size, n_games - start), "seed": seed + shard_id}
+        self.pending = deque(self.shards.keys())
+        self.in_flight = {}
+        self.completed = set()
+        self.result = SimulationResult(p1_difficulty, p2_difficulty)
+        self.abandoned = 0
+
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        if not self.shards:
+            self._finished.set()
+
+        self.server = _CoordinatorServer((host, port), _WorkerHandler)
+        self.server.coordinator = self
+        self._thread = None
+
+    def address(self) -> tuple:
+        return self.server.server_address
+
+    def _requeue_stale(self):
+        if self.shard_timeout is None:
+            return
+        now = time.monotonic()
+        for shard_id, (started, worker) in list(self.in_flight.items()):
+            if now - started > self.shard_timeout:
+                del self.in_flight[shard_id]
+                self.pending.append(shard_id)
+                self.abandoned += 1
+
+    def assign_shard(self, worker=None) -> dict:
+        with self._lock:
+            if self._finished.is_set():
+                return {"type": "done"}
+            self._requeue_stale()
+            if not self.pending:
+                return {"type": "wait", "seconds": 0.2}
+            shard_id = self.pending.popleft()
+            self.in_flight[shard_id] = (time.monotonic(), worker)
+            return self.shards[shard_id]
+
+    def complete_shard(self, shard_id: int, result: dict):
+        with self._lock:
+            # a shard can finish twice if it was handed out again after a timeout
+            if shard_id in self.completed:
+                return
+            self.completed.add(shard_id)
+            self.in_flight.pop(shard_id, None)
+            if shard_id in self.pending:
+                self.pending.remove(shard_id)
+            self.result.merge(SimulationResult.from_dict(result))
+            if len(self.completed) == len(self.shards):
+                self._finished.set()
+
+    def abandon_shard(self, shard_id: int, worker=None):
+        with self._lock:
+            # a worker that lost the shard to a timeout no longer owns it
+            if (shard_id in self.in_flight) and (self.in_flight[shard_id][1] is worker):
+                del self.in_flight[shard_id]
+                self.pending.append(shard_id)
+                self.abandoned += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def run(self, timeout: Union[float, None] = None) -> SimulationResult:
+        # blocks until every shard has a result
+        if self._thread is None:
+            self.start()
+        start = time.perf_counter()
+        finished = self._finished.wait(timeout)
+        self.server.shutdown()
+        self.server.server_close()
+        if not finished:
+            raise Exception("Simulation did not finish in time.")
+        # wall time of the whole job rather than the sum over shards
+        self.result.elapsed = time.perf_counter() - start
+        return self.result
+
+
+def run_worker(host: str, port: int, transformer_params: dict = None, max_shards: Union[int, None] = None) -> int:
+    # plays shards until the coordinator is done, returns the shards played
+    if transformer_params is None:
+        transformer_params = DEFAULT_TRANSFORMER_PARAMS
+
+    played = 0
+    with socket.create_connection((host, port)) as sock:
+        while (max_shards is None) or (played < max_shards):
+            send_message(sock, {"type": "request"})
+            message = recv_message(sock)
+            if (message is None) or (message["type"] == "done"):
+                break
+            if message["type"] == "wait":
+                time.sleep(message["seconds"])
+                continue
+
+            result = simulate(message["games"], message["p1"], message["p2"], message["seed"], transformer_params)
+            send_message(sock, {"type": "result", "shard_id": message["shard_id"], "result": result.to_dict()})
+            played += 1
+    return played
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a simulation over several machines.")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    coordinator_parser = subparsers.add_parser("coordinator")
+    coordinator_parser.add_argument("--host", default="0.0.0.0")
+    coordinator_parser.add_argument("--port", type=int, default=5123)
+    coordinator_parser.add_argument("--p1", type=int, default=3, choices=DIFFICULTIES)
+    coordinator_parser.add_argument("--p2", type=int, default=5, choices=DIFFICULTIES)
+    coordinator_parser.add_argument("--games", type=int, default=100000)
+    coordinator_parser.add_argument("--seed", type=int, default=0)
+    coordinator_parser.add_argument("--shard-size", type=int, default=1000)
+    coordinator_parser.add_argument("--shard-timeout", type=float, default=None)
+
+    worker_parser = subparsers.add_parser("worker")
+    worker_parser.add_argument("--host", default="localhost")
+    worker_parser.add_argument("--port", type=int, default=5123)
+    args = parser.parse_args()
+
+    if args.mode == "coordinator":
+        coordinator = Coordinator(args.p1, args.p2, args.games, args.seed, args.shard_size,
+                                  args.host, args.port, args.shard_timeout)
+        print("Coordinator listening on {}:{}".format(*coordinator.address()))
+        print(coordinator.run().summary())
+    else:
+        print("Played {} shards.".format(run_worker(args.host, args.port)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import random
+from typing import List, NamedTuple, Tuple, Union
+
+import gops.bitmask as bm
+
+
+# Headless game core. Hands are suit masks (see gops.bitmask) and a state is
+# an immutable tuple, so branching a game is just keeping a reference.
+class GameState(NamedTuple):
+    hand_1: int
+    hand_2: int
+    # remaining prize deck in flip order, prizes[0] is the card being bid on
+    prizes: Tuple[int, ...]
+    # value of earlier prize cards left in the play area by ties
+    pot: int = 0
+    score_1: int = 0
+    score_2: int = 0
+
+
+def new_state(prize_order: List[int], n_cards: int = bm.SUIT_SIZE) -> GameState:
+    if sorted(prize_order) != list(range(1, n_cards + 1)):
+        raise Exception("Bad prize order.")
+    hand = bm.full_mask(n_cards)
+    return GameState(hand, hand, tuple(prize_order))
+
+
+def random_state(n_cards: int = bm.SUIT_SIZE) -> GameState:
+    prize_order = list(range(1, n_cards + 1))
+    random.shuffle(prize_order)
+    return new_state(prize_order, n_cards)
+
+
+def is_terminal(state: GameState) -> bool:
+    return len(state.prizes) == 0
+
+
+def current_prize(state: GameState) -> int:
+    return state.prizes[0]
+
+
+def prize_value(state: GameState) -> int:
+    # same as PlayArea.prize_value once the prize card is flipped
+    return state.pot + state.prizes[0]
+
+
+def legal_bids(hand: int) -> Tuple[int, ...]:
+    return bm.mask_to_nvals(hand)
+
+
+def score_diff(state: GameState) -> int:
+    return state.score_1 - state.score_2
+
+
+def step(state: GameState, bid_1: int, bid_2: int) -> GameState:
+    # matches PlayArea.award_points, the higher bid takes the prize card and
+    # any tied pot, a tie leaves them for the next round.
+    if is_terminal(state):
+        raise Exception("Game is over.")
+    if not bm.in_mask(state.hand_1, bid_1):
+        raise Exception("Card not in player 1 hand.")
+    if not bm.in_mask(state.hand_2, bid_2):
+        raise Exception("Card not in player 2 hand.")
+
+    value = state.pot + state.prizes[0]
+    score_1 = state.score_1
+    score_2 = state.score_2
+    pot = 0
+    if bid_1 > bid_2:
+        score_1 += value
+    elif bid_2 > bid_1:
+        score_2 += value
+    else:
+        pot = value
+
+    return GameState(bm.remove_nval(state.hand_1, bid_1), bm.remove_nval(state.hand_2, bid_2),
+                     state.prizes[1:], pot, score_1, score_2)
+
+
+def winner(state: GameState) -> Union[int, None]:
+    # same codes as GameBase.decide_winner, None while the game is running
+    if not is_terminal(state):
+        return None
+    if state.score_1 > state.score_2:
+        return 1
+    elif state.score_2 > state.score_1:
+        return 2
+    return 0
+
+
+def decision_from_move_data(move_data: dict) -> tuple:
+    # Reads a TurnData.player_game_state_to_dict entry, from that player's
+    # side, as (own hand, opponent hand, undrawn prizes, pot, score diff).
+    # The pot includes the prize card on the table.
+    pre_play = move_data["pre_play_data"]
+    own_hand = bm.nvals_to_mask([bm.value_to_nval(val) for val in pre_play["own_hand"]])
+    opp_hand = bm.nvals_to_mask([bm.value_to_nval(val) for val in pre_play["opponent_hand"]])
+    pot_cards = [bm.value_to_nval(val) for val in pre_play["prize_values"]]
+    seen = bm.nvals_to_mask(pot_cards + [bm.value_to_nval(val) for val in pre_play["previous_prize_values"]])
+    prizes = bm.FULL_SUIT & ~seen
+    diff = int(pre_play["own_score"]) - int(pre_play["opponent_score"])
+    return own_hand, opp_hand, prizes, sum(pot_cards), diff
+
+
+def move_data_from_position(own_hand: int, opp_hand: int, prizes: int, pot_cards: int, diff: int,
+                            n_cards: int = bm.SUIT_SIZE) -> dict:
+    # Inverse of decision_from_move_data, with the prize cards on the table
+    # given as a mask. Every other flipped prize has been won, so the scores
+    # follow from their total and the diff. Values are sorted as strings like
+    # TurnData.player_game_state_to_dict.
+    def values(mask):
+        return sorted(str(bm.nval_to_value(nval)) for nval in bm.mask_to_nvals(mask))
+
+    previous = bm.full_mask(n_cards) & ~prizes & ~pot_cards
+    awarded = bm.mask_sum(previous)
+    return {"pre_play_data": {"own_score": str((awarded + diff) // 2),
+                              "own_hand": values(own_hand),
+                              "opponent_score": str((awarded - diff) // 2),
+                              "opponent_hand": values(opp_hand),
+                              "prize_values": values(pot_cards),
+                              "previous_prize_values": values(previous)},
+            "post_play_data": {}}
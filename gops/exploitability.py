@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Tuple
+
+import gops.bitmask as bm
+from gops.cards import BitmaskHand, Card
+from gops.engine import move_data_from_position
+from gops.solver import sign
+from gops.util import get_path_names
+
+OBJECTIVES = ["win", "points"]
+
+# A policy is called as policy(own_hand, opp_hand, prizes, pot_cards, prize, diff)
+# from the side of the player to move: the hands and the undrawn prizes are
+# masks, pot_cards is the mask of prize cards on the table including the
+# flipped prize, and diff is own score minus opponent score. It returns the
+# probability of each own bid in ascending order.
+
+
+def uniform(n_bids: int) -> Tuple[float, ...]:
+    return (1 / n_bids,) * n_bids
+
+
+def _hand(own_hand: int) -> BitmaskHand:
+    hand = BitmaskHand("Hearts")
+    hand.mask = own_hand
+    return hand
+
+
+def _one_hot(own_hand: int, card: Card) -> Tuple[float, ...]:
+    return tuple(float(nval == card.nval) for nval in bm.mask_to_nvals(own_hand))
+
+
+def random_policy(own_hand: int, opp_hand: int, prizes: int, pot_cards: int, prize: int, diff: int) -> tuple:
+    # Hand.select_random_card, difficulty 1
+    return uniform(bm.mask_count(own_hand))
+
+
+def prize_card_policy(own_hand: int, opp_hand: int, prizes: int, pot_cards: int, prize: int, diff: int) -> tuple:
+    # Hand.select_prize_card_strategy, difficulty 2
+    card = _hand(own_hand).select_prize_card_strategy(Card("Hearts", bm.nval_to_value(prize)))
+    if card is None:
+        # not reachable in a game, this player always holds the prize value
+        return uniform(bm.mask_count(own_hand))
+    return _one_hot(own_hand, card)
+
+
+def strategy_1_policy(own_hand: int, opp_hand: int, prizes: int, pot_cards: int, prize: int, diff: int) -> tuple:
+    # Hand.select_card_strategy_1, difficulty 3. The only randomness is
+    # Hand.select_index, so each index is forced in turn and weighted by
+    # Hand.get_dist.
+    probs = [0.0] * bm.mask_count(own_hand)
+    bids = bm.mask_to_nvals(own_hand)
+    for index, weight in enumerate(_hand(own_hand).get_dist()):
+        if weight == 0:
+            continue
+        hand = _hand(own_hand)
+        hand.select_index = lambda: index
+        card = hand.select_card_strategy_1(bm.mask_sum(pot_cards))
+        probs[bids.index(card.nval)] += weight
+    return tuple(probs)
+
+
+def strategy_2_policy(own_hand: int, opp_hand: int, prizes: int, pot_cards: int, prize: int, diff: int) -> tuple:
+    # Hand.select_card_strategy_2, difficulty 5. The StrategyCollection
+    # predictor is only updated for difficulty 6, so with its starting
+    # collection the bid is fixed by the hand and the prize value.
+    return _one_hot(own_hand, _hand(own_hand).select_card_strategy_2(bm.mask_sum(pot_cards)))
+
+
+class TransformerPolicy():
+    # Hand.select_transformer_model, difficulty 4. The move data is rebuilt
+    # from the position. With topk 1 the model picks one bid, with a larger
+    # topk the bid sampled on the call stands in for the distribution.
+    def __init__(self, transformer_params: dict, n_cards: int = bm.SUIT_SIZE):
+        self.transformer_params = transformer_params
+        self.n_cards = n_cards
+        self.app_paths = get_path_names(transformer_params["epochs"], transformer_params["version"],
+                                        transformer_params["train_device"], transformer_params["tokenizer"])
+        # keeps the loaded model between calls
+        self.hand = BitmaskHand("Hearts")
+
+    def __call__(self, own_hand: int, opp_hand: int, prizes: int, pot_cards: int, prize: int, diff: int) -> tuple:
+        move_data = move_data_from_position(own_hand, opp_hand, prizes, pot_cards, diff, self.n_cards)
+        self.hand.mask = own_hand
+        card = self.hand.select_transformer_model(move_data, self.app_paths, self.transformer_params["topk"],
+                                                  self.transformer_params["run_device"],
+                                                  self.transformer_params["tokenizer"])
+        return _one_hot(own_hand, card)
+
+
+POLICIES = {1: random_policy, 2: prize_card_policy, 3: strategy_1_policy, 5: strategy_2_policy}
+
+
+def policy_for_difficulty(difficulty: int, transformer_params: dict = None, n_cards: int = bm.SUIT_SIZE) -> Callable:
+    if difficulty == 4:
+        if transformer_params is None:
+            raise Exception("The transformer policy needs transformer parameters.")
+        return TransformerPolicy(transformer_params, n_cards)
+    if difficulty not in POLICIES:
+        raise Exception("Bad difficulty.")
+    return POLICIES[difficulty]
+
+
+class BestResponse():
+    # Exact best response to a fixed policy by memoised dynamic programming
+    # over positions. The best responder sees the whole position but not the
+    # opponent bid. "points" maximises the final score diff, "win" its sign
+    # plus margin_weight * diff like GopsSolver.
+    def __init__(self, policy: Callable, n_cards: int = bm.SUIT_SIZE, objective: str = "points",
+                 margin_weight: float = 0.0):
+        if objective not in OBJECTIVES:
+            raise Exception("Bad objective.")
+        self.policy = policy
+        self.n_cards = n_cards
+        self.objective = objective
+        self.margin_weight = margin_weight
+        self.chance_memo = {}
+        self.node_memo = {}
+
+    def states(self) -> int:
+        return len(self.chance_memo) + len(self.node_memo)
+
+    def payoff(self, diff: int) -> float:
+        if self.objective == "points":
+            return diff
+        return sign(diff) + self.margin_weight * diff
+
+    def chance_value(self, own_hand: int, opp_hand: int, prizes: int, pot_cards: int, diff: int) -> float:
+        if prizes == 0:
+            return self.payoff(diff)
+        if (self.objective == "win") and (self.margin_weight == 0) \
+                and (abs(diff) > bm.mask_sum(pot_cards) + bm.mask_sum(prizes)):
+            return sign(diff)
+
+        key = (own_hand, opp_hand, prizes, pot_cards, diff)
+        if key not in self.chance_memo:
+            prize_list = bm.mask_to_nvals(prizes)
+            total = 0.0
+            for prize in prize_list:
+                total += self.node_value(own_hand, opp_hand, bm.remove_nval(prizes, prize),
+                                         pot_cards | bm.nval_bit(prize), prize, diff)
+            self.chance_memo[key] = total / len(prize_list)
+        return self.chance_memo[key]
+
+    def node_value(self, own_hand: int, opp_hand: int, prizes: int, pot_cards: int, prize: int, diff: int) -> float:
+        key = (own_hand, opp_hand, prizes, pot_cards, diff)
+        if key in self.node_memo:
+            return self.node_memo[key]
+
+        pot = bm.mask_sum(pot_cards)
+        opp_bids = bm.mask_to_nvals(opp_hand)
+        opp_strategy = self.policy(opp_hand, own_hand, prizes, pot_cards, prize, -diff)
+        best = None
+        for own_bid in bm.mask_to_nvals(own_hand):
+            own_rest = bm.remove_nval(own_hand, own_bid)
+            value = 0.0
+            for opp_bid, prob in zip(opp_bids, opp_strategy):
+                if prob == 0:
+                    continue
+                opp_rest = bm.remove_nval(opp_hand, opp_bid)
+                if own_bid > opp_bid:
+                    value += prob * self.chance_value(own_rest, opp_rest, prizes, 0, diff + pot)
+                elif opp_bid > own_bid:
+                    value += prob * self.chance_value(own_rest, opp_rest, prizes, 0, diff - pot)
+                else:
+                    value += prob * self.chance_value(own_rest, opp_rest, prizes, pot_cards, diff)
+            if (best is None) or (value > best):
+                best = value
+        self.node_memo[key] = best
+        return best
+
+    def root_value(self, prize: int) -> float:
+        # value once the first prize is flipped
+        full = bm.full_mask(self.n_cards)
+        return self.node_value(full, full, bm.remove_nval(full, prize), bm.nval_bit(prize), prize, 0)
+
+    def game_value(self) -> float:
+        full = bm.full_mask(self.n_cards)
+        return self.chance_value(full, full, full, 0, 0)
+
+
+def _root_value(policy: Callable, n_cards: int, objective: str, margin_weight: float, prize: int) -> float:
+    return BestResponse(policy, n_cards, objective, margin_weight).root_value(prize)
+
+
+def best_response_value(policy: Callable, n_cards: int = bm.SUIT_SIZE, objective: str = "points",
+                        margin_weight: float = 0.0, workers: int = 1) -> float:
+    # The game is symmetric with value 0, so this is what the policy concedes
+    # per game in either seat: points for "points", the best responder's win
+    # rate minus loss rate for "win". With workers > 1 each first prize is
+    # solved in a separate process, so the policy must be picklable.
+    if workers == 1:
+        return BestResponse(policy, n_cards, objective, margin_weight).game_value()
+
+    prizes = list(range(1, n_cards + 1))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        values = pool.map(_root_value, [policy] * n_cards, [n_cards] * n_cards, [objective] * n_cards,
+                          [margin_weight] * n_cards, prizes)
+        return sum(values) / n_cards
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact best response to the AI strategies.")
+    parser.add_argument("--cards", type=int, default=6)
+    parser.add_argument("--difficulties", type=int, nargs="+", default=[1, 2, 3, 5])
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    for difficulty in args.difficulties:
+        policy = policy_for_difficulty(difficulty, n_cards=args.cards)
+        start = time.perf_counter()
+        points = best_response_value(policy, args.cards, "points", workers=args.workers)
+        win = best_response_value(policy, args.cards, "win", workers=args.workers)
+        elapsed = time.perf_counter() - start
+        print("AI {}: concedes {:.3f} points per game, best response edge {:.3f}, {:.1f} seconds".format(
+            difficulty, points, win, elapsed))
+
+
+if __name__ == "__main__":
+    main()
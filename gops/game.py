@@ -3,11 +3,20 @@ from typing import Union
 import numpy as np
 
 import gops.ui_elements as ui
-from gops.cards import SuitCards, Hand, Card
+from gops.cards import SuitCards, Hand, BitmaskHand, Card
 from gops.game_traces import GameTrace
 from gops.util import get_path_names
 
 from gops.bid_prediction import Strategy
+from gops.engine import decision_from_move_data
+from gops.solver import get_solver
+from gops.tablebase import load_tablebase
+from gops.mcts import MCTS, parallel_select_bid
+from gops.cfr import load_policy
+import gops.bitmask as bm
+
+# difficulties that read the game trace to pick a card
+TRACE_DIFFICULTIES = [4, 7, 8, 9]
 
 class Player():
     def __init__(self, hand: Hand):
@@ -55,7 +64,6 @@ class HumanPlayer(Player):
 class AIPlayer(Player):
     def __init__(self, transformer_params, id, hand: Hand, difficulty: int = 1):
         Player.__init__(self, hand)
-        self._difficulty = difficulty
         self.id = id
 
         NUM_EPOCHS = transformer_params["epochs"]
@@ -67,6 +75,25 @@ class AIPlayer(Player):
 
         self.app_paths = get_path_names(NUM_EPOCHS, model_version, train_device, self.tokenizer)
 
+        # equilibrium solver, only used once this many cards are left
+        self.solver_cards = transformer_params.get("solver_cards", 4)
+        self.solver_margin_weight = transformer_params.get("solver_margin_weight", 0.001)
+        self.solver = None
+
+        # monte carlo tree search, seconds per move and worker processes
+        self.mcts_time = transformer_params.get("mcts_time", 0.25)
+        self.mcts_workers = transformer_params.get("mcts_workers", 1)
+        self.mcts_rollout = transformer_params.get("mcts_rollout", "strategy_1")
+        self.mcts = None
+
+        # policy file exported by gops.cfr
+        self.cfr_policy = transformer_params.get("cfr_policy")
+
+        # optional endgame tablebase file, used by every difficulty
+        self.tablebase_path = transformer_params.get("tablebase")
+
+        self.set_difficulty(difficulty)
+
     def update_state(self, prize, opp_played_card, current_turn):
         if self._difficulty == 6:
             bid_diff = opp_played_card.nval - prize.nval
@@ -77,6 +104,11 @@ class AIPlayer(Player):
             self._hand.opp_hand = np.delete(self._hand.opp_hand, index)
 
     def play_card(self, prize_value: int, prize_card: Card, game_state) -> Card:
+        if (self.tablebase_path is not None) and (game_state is not None):
+            card = self.play_tablebase_card(game_state)
+            if card is not None:
+                return card
+
         if self._difficulty == 1:
             return self._hand.select_random_card()
         elif self._difficulty == 2:
@@ -90,10 +122,71 @@ class AIPlayer(Player):
         elif self._difficulty == 5:
             selected_card = self._hand.select_card_strategy_2(prize_value)
             return selected_card
+        elif self._difficulty == 7:
+            return self.play_equilibrium_card(prize_value, game_state)
+        elif self._difficulty == 8:
+            return self.play_mcts_card(game_state)
+        elif self._difficulty == 9:
+            return self.play_policy_card(prize_value, game_state)
+
+    def play_equilibrium_card(self, prize_value: int, game_state) -> Card:
+        # exact equilibrium play in the endgame, strategy 1 before that
+        if (game_state is None) or (self._hand.card_count() > self.solver_cards):
+            return self._hand.select_card_strategy_1(prize_value)
+        if self.solver is None:
+            self.solver = get_solver(self.solver_margin_weight)
+
+        turn_data = game_state.game_trace[game_state.turn]
+        move_data = turn_data.player_game_state_to_dict(self.id)
+        bid = self.solver.select_bid(*decision_from_move_data(move_data))
+        return self._hand.find_card(Card(self._hand.suit, bm.nval_to_value(bid)))
+
+    def play_mcts_card(self, game_state) -> Card:
+        if self._hand.card_count() == 1:
+            return self._hand.select_random_card()
+
+        turn_data = game_state.game_trace[game_state.turn]
+        move_data = turn_data.player_game_state_to_dict(self.id)
+        decision = decision_from_move_data(move_data)
+        if self.mcts_workers > 1:
+            bid = parallel_select_bid(self.mcts_workers, *decision, self.mcts_time, rollout=self.mcts_rollout)
+        else:
+            if self.mcts is None:
+                self.mcts = MCTS(rollout=self.mcts_rollout)
+            bid = self.mcts.select_bid(*decision, time_budget=self.mcts_time)
+        return self._hand.find_card(Card(self._hand.suit, bm.nval_to_value(bid)))
+
+    def play_policy_card(self, prize_value: int, game_state) -> Card:
+        # CFR policy where the position is in the table, strategy 1 otherwise
+        if (self.cfr_policy is None) or (game_state is None):
+            return self._hand.select_card_strategy_1(prize_value)
+
+        turn_data = game_state.game_trace[game_state.turn]
+        move_data = turn_data.player_game_state_to_dict(self.id)
+        bid = load_policy(self.cfr_policy).select_bid(*decision_from_move_data(move_data))
+        if bid is None:
+            return self._hand.select_card_strategy_1(prize_value)
+        return self._hand.find_card(Card(self._hand.suit, bm.nval_to_value(bid)))
+
+    def play_tablebase_card(self, game_state) -> Union[Card, None]:
+        # perfect play once the position is in the tablebase
+        tablebase = load_tablebase(self.tablebase_path)
+        if self._hand.card_count() > tablebase.max_cards:
+            return None
+
+        turn_data = game_state.game_trace[game_state.turn]
+        move_data = turn_data.player_game_state_to_dict(self.id)
+        bid = tablebase.select_bid(*decision_from_move_data(move_data))
+        if bid is None:
+            return None
+        return self._hand.find_card(Card(self._hand.suit, bm.nval_to_value(bid)))
 
     def set_difficulty(self, difficulty: int):
-        if difficulty not in [1, 2, 3, 4, 5, 6]:
+        if difficulty not in [1, 2, 3, 4, 5, 6, 7, 8, 9]:
             raise Exception("Bad difficulty.")
+        # without a policy difficulty 9 would only ever play strategy 1
+        if (difficulty == 9) and (self.cfr_policy is None):
+            raise Exception("Difficulty 9 needs a cfr_policy file.")
         self._difficulty = difficulty
 
 
@@ -244,10 +337,16 @@ class AIHumanGame(GameBase):
             print("3: Selects random card biased toward prize value")
             print("4: Selects card using a Transformer model")
             print("5: Selects card using probabilistic model with memory")
+            print("7: Selects card using an exact equilibrium in the endgame")
+            print("8: Selects card using Monte Carlo tree search")
+            choices = ["1", "2", "3", "4", "5", "7", "8"]
+            if self.player_1.cfr_policy is not None:
+                print("9: Selects card using a trained CFR policy")
+                choices.append("9")
             print()
 
-            selected = input("Select AI difficulty [1, 2, 3, 4, 5]: ")
-            if selected not in ["1", "2", "3", "4", "5"]:
+            selected = input("Select AI difficulty [" + ", ".join(choices) + "]: ")
+            if selected not in choices:
                 print("Invalid selection.")
                 print()
             else:
@@ -282,3 +381,44 @@ class AIHumanGame(GameBase):
 
         self.decide_winner()
         self.final_msg()
+
+
+class AIAIGame(GameBase):
+    # Headless game between two AI players, nothing is printed or read.
+    # The trace is only kept when asked for or a player needs it to move.
+    def __init__(self, transformer_params, difficulty_1: int, difficulty_2: int, record_trace: bool = False):
+        player_1 = AIPlayer(transformer_params, 1, BitmaskHand("Hearts"))
+        player_2 = AIPlayer(transformer_params, 2, BitmaskHand("Spades"))
+        player_1.set_difficulty(difficulty_1)
+        player_2.set_difficulty(difficulty_2)
+        GameBase.__init__(self, player_1, player_2, reset=False)
+
+        self.game_trace = None
+        if record_trace or (difficulty_1 in TRACE_DIFFICULTIES) or (difficulty_2 in TRACE_DIFFICULTIES) \
+                or (transformer_params.get("tablebase") is not None):
+            self.game_trace = GameTrace()
+
+    def score_margin(self) -> int:
+        return self.player_1.score() - self.player_2.score()
+
+    def run_game(self) -> int:
+        while not self.game_over():
+            prize = self.prize_deck.draw()
+            self.play_area.flip_prize(prize)
+
+            if self.game_trace is not None:
+                self.game_trace.update_trace(self.player_1, self.player_2, self.play_area.prize_cards)
+
+            player_1_card = self.player_1.play_card(self.play_area.prize_value(), prize, self.game_trace)
+            player_2_card = self.player_2.play_card(self.play_area.prize_value(), prize, self.game_trace)
+
+            if self.game_trace is not None:
+                self.game_trace.add_played_cards(player_1_card, player_2_card)
+
+            self.play_area.flip_cards(player_1_card, player_2_card)
+            self.play_area.award_points(self.player_1, self.player_2)
+
+        self.decide_winner()
+        if self.game_trace is not None:
+            self.game_trace.update_winner(self.winner)
+        return self.winner
@@ -0,0 +1,116 @@
+import os
+import struct
+from typing import List, Union
+
+import numpy as np
+
+import gops.bitmask as bm
+from gops.game_traces import GameTrace
+from gops.trace_batch import TraceBatch
+
+MAGIC = b"GOPSGR01"
+# magic, record size, turns per game
+HEADER = struct.Struct("<8sII")
+
+N_TURNS = bm.SUIT_SIZE
+
+# One finished game, cards as nvals: 13 + 13 + 13 + 1 = 40 bytes.
+RECORD_DTYPE = np.dtype([("prizes", np.uint8, (N_TURNS,)),
+                         ("bids_1", np.uint8, (N_TURNS,)),
+                         ("bids_2", np.uint8, (N_TURNS,)),
+                         ("winner", np.uint8)])
+
+
+def to_records(batch: TraceBatch) -> np.ndarray:
+    records = np.zeros(len(batch), dtype=RECORD_DTYPE)
+    records["prizes"] = batch.prizes
+    records["bids_1"] = batch.bids_1
+    records["bids_2"] = batch.bids_2
+    records["winner"] = batch.winners
+    return records
+
+
+def from_records(records: np.ndarray) -> TraceBatch:
+    return TraceBatch(records["prizes"], records["bids_1"], records["bids_2"], records["winner"])
+
+
+def write_records(filepath: str, games: Union[TraceBatch, List[GameTrace], np.ndarray], append: bool = True):
+    # Appends to a shard, writing the header first if the file is new.
+    if isinstance(games, TraceBatch):
+        games = to_records(games)
+    elif not isinstance(games, np.ndarray):
+        games = to_records(TraceBatch.from_game_traces(games))
+    if games.dtype != RECORD_DTYPE:
+        raise Exception("Records have the wrong dtype.")
+
+    new_file = (not append) or (not os.path.exists(filepath)) or (os.path.getsize(filepath) == 0)
+    if not new_file:
+        _read_header(filepath)
+    with open(filepath, "wb" if new_file else "ab") as outfile:
+        if new_file:
+            outfile.write(HEADER.pack(MAGIC, RECORD_DTYPE.itemsize, N_TURNS))
+        outfile.write(games.tobytes())
+
+
+def _read_header(filepath: str) -> int:
+    # returns the number of complete records in the shard
+    with open(filepath, "rb") as infile:
+        header = infile.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise Exception("Not a game record file.")
+    magic, record_size, n_turns = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise Exception("Not a game record file.")
+    if (record_size != RECORD_DTYPE.itemsize) or (n_turns != N_TURNS):
+        raise Exception("Game records were written with a different layout.")
+    return (os.path.getsize(filepath) - HEADER.size) // record_size
+
+
+class GameRecords():
+    # Memory maps one or more record shards and indexes games across them by
+    # number, games[i] reads 40 bytes straight from the page cache.
+    def __init__(self, filepaths: Union[str, List[str]]):
+        if isinstance(filepaths, str):
+            filepaths = [filepaths]
+        self.filepaths = list(filepaths)
+        self.shards = []
+        for filepath in self.filepaths:
+            count = _read_header(filepath)
+            if count == 0:
+                continue
+            self.shards.append(np.memmap(filepath, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size,
+                                         shape=(count,)))
+        self.starts = np.cumsum([0] + [len(shard) for shard in self.shards])
+
+    def __len__(self) -> int:
+        return int(self.starts[-1])
+
+    def __getitem__(self, game: int) -> np.void:
+        if game < 0:
+            game += len(self)
+        if (game < 0) or (game >= len(self)):
+            raise IndexError(game)
+        shard = int(np.searchsorted(self.starts, game, side="right")) - 1
+        return self.shards[shard][game - self.starts[shard]]
+
+    def records(self, games: Union[range, List[int], np.ndarray, None] = None) -> np.ndarray:
+        # copies the chosen games (all of them by default) into one array
+        if games is None:
+            if len(self.shards) == 0:
+                return np.zeros(0, dtype=RECORD_DTYPE)
+            return np.concatenate([np.asarray(shard) for shard in self.shards])
+        games = np.asarray(games, dtype=np.int64)
+        records = np.zeros(len(games), dtype=RECORD_DTYPE)
+        shards = np.searchsorted(self.starts, games, side="right") - 1
+        for shard in np.unique(shards):
+            rows = shards == shard
+            records[rows] = self.shards[shard][games[rows] - self.starts[shard]]
+        return records
+
+    def trace_batch(self, games: Union[range, List[int], np.ndarray, None] = None) -> TraceBatch:
+        return from_records(self.records(games))
+
+    def game_trace(self, game: int) -> GameTrace:
+        record = self[game]
+        return TraceBatch(record["prizes"][None], record["bids_1"][None], record["bids_2"][None],
+                          record["winner"][None]).game_trace(0)
@@ -1,35 +1,41 @@
-import copy
 import json
+from typing import List, NamedTuple, Union
 
-from gops.cards import Hand
+import gops.bitmask as bm
+from gops.cards import Hand, BitmaskHand, Card
+
+
+def _values(mask: int) -> List[str]:
+    values = [str(bm.nval_to_value(nval)) for nval in bm.mask_to_nvals(mask)]
+    values.sort()
+    return values
 
 
 class PlayerTraceData():
-    def __init__(self, id, hand, score):
+    # One player's side of a turn, built on demand from the trace.
+    def __init__(self, id, suit: str, hand_mask: int, score: int, card_played: Union[Card, None] = None):
         self.player_id = id
-        self.player_hand = copy.deepcopy(hand)
-        self.player_suit = hand.suit
+        self.player_suit = suit
+        self.hand_mask = hand_mask
         self.player_score = score
-        self.prev_cards_played = self.add_prev_cards_played()
-        self.card_played = None
+        self.card_played = card_played
+
+    @property
+    def player_hand(self) -> BitmaskHand:
+        hand = BitmaskHand(self.player_suit)
+        hand.mask = self.hand_mask
+        return hand
 
-    def add_prev_cards_played(self):
-        prev_cards_played = []
-        og_hand = Hand(self.player_suit)
-        for card in og_hand._order:
-            if self.player_hand.card_in_stack(card.suit(), card.value())[0] is False:
-                prev_cards_played.append(card)
-        return prev_cards_played
+    @property
+    def prev_cards_played(self) -> List[Card]:
+        played = bm.FULL_SUIT & ~self.hand_mask
+        return [Card(self.player_suit, bm.nval_to_value(nval)) for nval in bm.mask_to_nvals(played)]
 
     def play_data_to_dict(self):
         player_data = {"pre_play_data": {}, "post_play_data": {}}
 
         player_data["pre_play_data"]["own_score"] = str(self.player_score)
-        hand_values = []
-        for card in self.player_hand._order:
-            hand_values.append(str(card.value()))
-        hand_values.sort()
-        player_data["pre_play_data"]["own_hand"] = hand_values
+        player_data["pre_play_data"]["own_hand"] = _values(self.hand_mask)
 
         if self.card_played:
             player_data["post_play_data"]["own_played_card"] = str(self.card_played.value())
@@ -38,15 +44,12 @@ class PlayerTraceData():
 
 
 class TurnData():
-    def __init__(self, player_1_data: PlayerTraceData, player_2_data: PlayerTraceData, prize_cards):
+    def __init__(self, player_1_data: PlayerTraceData, player_2_data: PlayerTraceData, prize_cards: List[Card],
+                 previous_prize_cards: List[Card] = None):
         self.player_1_data = player_1_data
         self.player_2_data = player_2_data
-        self.prize_cards = copy.deepcopy(prize_cards)
-        self.previous_prize_cards = []
-
-    def add_prize_cards(self, previous_prizes):
-        for prize in previous_prizes:
-            self.previous_prize_cards.append(prize)
+        self.prize_cards = prize_cards
+        self.previous_prize_cards = [] if previous_prize_cards is None else previous_prize_cards
 
     def player_game_state_to_dict(self, player):
         # this assumes perfect memory of the game state
@@ -78,36 +81,125 @@ class TurnData():
         return player_dict
 
 
+class TurnEvent(NamedTuple):
+    # what happened in a turn, bids and points are filled in once played
+    prize: int
+    bid_1: int = 0
+    bid_2: int = 0
+    points_1: int = 0
+    points_2: int = 0
+
+
+class TurnState(NamedTuple):
+    # state before the bids of a turn, hands and cards as masks
+    hand_1: int
+    hand_2: int
+    score_1: int
+    score_2: int
+    # prize cards on the table including the flipped prize
+    pot_cards: int
+    # earlier prize cards that have been won
+    previous: int
+
+
+class TurnViews():
+    # game_trace[turn] -> TurnData, built from the event log on first use
+    # and cached until the turn is played.
+    def __init__(self, trace: "GameTrace"):
+        self.trace = trace
+        self.cache = {}
+
+    def __getitem__(self, turn: int) -> TurnData:
+        if turn not in self.cache:
+            self.cache[turn] = self.trace.turn_data(turn)
+        return self.cache[turn]
+
+    def __contains__(self, turn: int) -> bool:
+        return 1 <= turn <= len(self.trace.events)
+
+    def __len__(self) -> int:
+        return len(self.trace.events)
+
+    def __iter__(self):
+        return iter(range(1, len(self.trace.events) + 1))
+
+    def keys(self):
+        return list(self)
+
+    def invalidate(self, turn: int):
+        self.cache.pop(turn, None)
+
+
 class GameTrace():
+    # Records each turn as an event (prize flipped, bids, points awarded)
+    # plus a few ints of state, instead of copying both hands and the prize
+    # history every turn. TurnData views are made from these when asked for.
     def __init__(self):
         self.turn = 1
-        self.game_trace = {}
+        self.events = []
+        self.states = []
+        self.player_ids = (1, 2)
+        self.player_suits = ("Hearts", "Spades")
+        self.prize_suit = "Clubs"
+        self.game_trace = TurnViews(self)
         self.game_winner = None
 
     def update_trace(self, player_1, player_2, prize_cards):
-        player_1_data = PlayerTraceData(player_1.id, player_1._hand, player_1._score)
-        player_2_data = PlayerTraceData(player_2.id, player_2._hand, player_2._score)
-        current_turn = TurnData(player_1_data, player_2_data, prize_cards)
-
-        if self.turn > 1:
-            previous_turn = self.game_trace[self.turn-1]
-            current_turn.add_prize_cards(previous_turn.previous_prize_cards)
-
-        # update previous prizes if last round scored
-        if (self.turn > 1) and (len(prize_cards) == 1):
-            current_turn.add_prize_cards(previous_turn.prize_cards)
+        pot_cards = bm.nvals_to_mask([card.nval for card in prize_cards])
+        prize = prize_cards[-1].nval
+
+        if len(self.states) == 0:
+            self.player_ids = (player_1.id, player_2.id)
+            self.player_suits = (player_1._hand.suit, player_2._hand.suit)
+            self.prize_suit = prize_cards[-1].suit()
+            state = TurnState(bm.nvals_to_mask(player_1._hand.get_card_nvals()),
+                              bm.nvals_to_mask(player_2._hand.get_card_nvals()),
+                              player_1._score, player_2._score, pot_cards, 0)
+        else:
+            last = self.states[-1]
+            event = self.events[-1]
+            flipped = last.previous | last.pot_cards | pot_cards
+            state = TurnState(bm.remove_nval(last.hand_1, event.bid_1), bm.remove_nval(last.hand_2, event.bid_2),
+                              last.score_1 + event.points_1, last.score_2 + event.points_2,
+                              pot_cards, flipped & ~pot_cards)
 
-        self.game_trace[self.turn] = current_turn
+        self.states.append(state)
+        self.events.append(TurnEvent(prize))
 
     # no protection for this turn update happening at the correct time
     def update_trace_turn(self):
         self.turn += 1
 
     def add_played_cards(self, player_1_card, player_2_card):
-        self.game_trace[self.turn].player_1_data.card_played = player_1_card
-        self.game_trace[self.turn].player_2_data.card_played = player_2_card
+        state = self.states[self.turn - 1]
+        value = bm.mask_sum(state.pot_cards)
+        points_1 = value if player_1_card.nval > player_2_card.nval else 0
+        points_2 = value if player_2_card.nval > player_1_card.nval else 0
+        self.events[self.turn - 1] = self.events[self.turn - 1]._replace(bid_1=player_1_card.nval,
+                                                                         bid_2=player_2_card.nval,
+                                                                         points_1=points_1, points_2=points_2)
+        self.game_trace.invalidate(self.turn)
         self.update_trace_turn()
 
+    def turn_data(self, turn: int) -> TurnData:
+        if turn not in self.game_trace:
+            raise KeyError(turn)
+        state = self.states[turn - 1]
+        event = self.events[turn - 1]
+
+        played = [None, None]
+        if event.bid_1 > 0:
+            played = [Card(self.player_suits[0], bm.nval_to_value(event.bid_1)),
+                      Card(self.player_suits[1], bm.nval_to_value(event.bid_2))]
+        player_1_data = PlayerTraceData(self.player_ids[0], self.player_suits[0], state.hand_1, state.score_1,
+                                        played[0])
+        player_2_data = PlayerTraceData(self.player_ids[1], self.player_suits[1], state.hand_2, state.score_2,
+                                        played[1])
+        prize_cards = [Card(self.prize_suit, bm.nval_to_value(nval)) for nval in bm.mask_to_nvals(state.pot_cards)]
+        previous_prize_cards = [Card(self.prize_suit, bm.nval_to_value(nval))
+                                for nval in bm.mask_to_nvals(state.previous)]
+        return TurnData(player_1_data, player_2_data, prize_cards, previous_prize_cards)
+
     def update_winner(self, winner):
         self.game_winner = winner
 
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+import math
+import time
+import random
+import bisect
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Tuple, Union
+
+import gops.bitmask as bm
+from gops.solver import canonical_hands, sign
+
+
+def _dist_cumsum() -> List[List[float]]:
+    # Hand.get_dist for every hand size, with the same int truncated weights
+    cum = [[]]
+    for count in range(1, bm.SUIT_SIZE + 1):
+        weights = [int(count / 2**x) for x in range(count)]
+        total = sum(weights)
+        cum.append([sum(weights[:idx + 1]) / total for idx in range(count)])
+    return cum
+
+
+_CUMSUM = _dist_cumsum()
+
+
+def random_bid(hand: int, prize_value: int) -> int:
+    # Hand.select_random_card
+    return random.choice(bm.mask_to_nvals(hand))
+
+
+def strategy_1_bid(hand: int, prize_value: int) -> int:
+    # Hand.select_card_strategy_1
+    nvals = bm.mask_to_nvals(hand)
+    if prize_value < 7:
+        order = nvals
+    else:
+        prize_value = min(prize_value, 13)
+        order = sorted(nvals, key=lambda nval: abs(nval - prize_value) + 0.1 * (nval < prize_value))
+    index = min(bisect.bisect_left(_CUMSUM[len(nvals)], random.random()), len(nvals) - 1)
+    bid = order[index]
+
+    if (prize_value >= 7) and (bid < prize_value) and (bid != nvals[-1]):
+        return nvals[0]
+    return bid
+
+
+ROLLOUT_POLICIES = {"random": random_bid, "strategy_1": strategy_1_bid}
+
+
+class _Node():
+    # decoupled statistics, each player keeps visit counts and total payoff
+    # (from their side) for their own bids in ascending order
+    __slots__ = ("visits", "counts_1", "totals_1", "counts_2", "totals_2")
+
+    def __init__(self, n_bids: int):
+        self.visits = 0
+        self.counts_1 = [0] * n_bids
+        self.totals_1 = [0.0] * n_bids
+        self.counts_2 = [0] * n_bids
+        self.totals_2 = [0.0] * n_bids
+
+
+def _ucb_index(visits: int, counts: List[int], totals: List[float], exploration: float) -> int:
+    best = -1
+    best_score = -math.inf
+    log_visits = math.log(visits + 1)
+    for idx, count in enumerate(counts):
+        if count == 0:
+            return idx
+        score = totals[idx] / count + exploration * math.sqrt(log_visits / count)
+        if score > best_score:
+            best = idx
+            best_score = score
+    return best
+
+
+class MCTS():
+    # Decoupled UCT for the simultaneous bids. A node is a decision (after
+    # the prize flip) keyed like the solver, by the canonical hands, undrawn
+    # prizes, pot and score diff, so the tree is shared between transpositions
+    # and reused on the next turn. The next prize is sampled on the way down.
+    # Payoffs match GopsSolver: sign of the final diff plus margin_weight * diff.
+    def __init__(self, exploration: float = 1.4, rollout: str = "strategy_1", margin_weight: float = 0.001,
+                 max_nodes: int = 500000):
+        if rollout not in ROLLOUT_POLICIES:
+            raise Exception("Bad rollout policy.")
+        self.exploration = exploration
+        self.rollout_policy = ROLLOUT_POLICIES[rollout]
+        self.margin_weight = margin_weight
+        self.max_nodes = max_nodes
+        self.tree = {}
+
+    def payoff(self, diff: int) -> float:
+        return sign(diff) + self.margin_weight * diff
+
+    def rollout(self, hand_1: int, hand_2: int, prizes: int, pot: int, diff: int) -> float:
+        while True:
+            bid_1 = self.rollout_policy(hand_1, pot)
+            bid_2 = self.rollout_policy(hand_2, pot)
+            hand_1 = bm.remove_nval(hand_1, bid_1)
+            hand_2 = bm.remove_nval(hand_2, bid_2)
+            if bid_1 > bid_2:
+                diff += pot
+                pot = 0
+            elif bid_2 > bid_1:
+                diff -= pot
+                pot = 0
+            if prizes == 0:
+                return self.payoff(diff)
+            prize = random.choice(bm.mask_to_nvals(prizes))
+            prizes = bm.remove_nval(prizes, prize)
+            pot += prize
+
+    def iterate(self, hand_1: int, hand_2: int, prizes: int, pot: int, diff: int):
+        path = []
+        while True:
+            key = (*canonical_hands(hand_1, hand_2), prizes, pot, diff)
+            node = self.tree.get(key)
+            if node is None:
+                self.tree[key] = _Node(bm.mask_count(hand_1))
+                value = self.rollout(hand_1, hand_2, prizes, pot, diff)
+                break
+
+            idx_1 = _ucb_index(node.visits, node.counts_1, node.totals_1, self.exploration)
+            idx_2 = _ucb_index(node.visits, node.counts_2, node.totals_2, self.exploration)
+            path.append((node, idx_1, idx_2))
+
+            bid_1 = bm.mask_to_nvals(hand_1)[idx_1]
+            bid_2 = bm.mask_to_nvals(hand_2)[idx_2]
+            hand_1 = bm.remove_nval(hand_1, bid_1)
+            hand_2 = bm.remove_nval(hand_2, bid_2)
+            if bid_1 > bid_2:
+                diff += pot
+                pot = 0
+            elif bid_2 > bid_1:
+                diff -= pot
+                pot = 0
+            if prizes == 0:
+                value = self.payoff(diff)
+                break
+            prize = random.choice(bm.mask_to_nvals(prizes))
+            prizes = bm.remove_nval(prizes, prize)
+            pot += prize
+
+        for node, idx_1, idx_2 in path:
+            node.visits += 1
+            node.counts_1[idx_1] += 1
+            node.totals_1[idx_1] += value
+            node.counts_2[idx_2] += 1
+            node.totals_2[idx_2] -= value
+
+    def search(self, own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int,
+               time_budget: Union[float, None] = None, iterations: Union[int, None] = None,
+               deadline: Union[float, None] = None) -> Tuple[list, list]:
+        # Searches from the side of the player holding own_hand until the time
+        # budget (seconds), the deadline (a time.time() value) or the
+        # iteration count runs out. At least one iteration is always run.
+        # Returns the root visit counts and total payoffs for own bids in
+        # ascending order.
+        if (time_budget is None) and (iterations is None) and (deadline is None):
+            raise Exception("Search needs a time budget, a deadline or an iteration count.")
+        if len(self.tree) > self.max_nodes:
+            self.tree.clear()
+
+        end = math.inf if time_budget is None else time.perf_counter() + time_budget
+        if deadline is None:
+            deadline = math.inf
+        count = 0
+        while (iterations is None) or (count < iterations):
+            self.iterate(own_hand, opp_hand, prizes, pot, diff)
+            count += 1
+            if (time.perf_counter() > end) or (time.time() > deadline):
+                break
+
+        root = self.tree[(*canonical_hands(own_hand, opp_hand), prizes, pot, diff)]
+        return list(root.counts_1), list(root.totals_1)
+
+    def select_bid(self, own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int,
+                   time_budget: Union[float, None] = None, iterations: Union[int, None] = None) -> int:
+        counts, totals = self.search(own_hand, opp_hand, prizes, pot, diff, time_budget, iterations)
+        return best_bid(own_hand, counts, pot, self.rollout_policy)
+
+
+def best_bid(own_hand: int, counts: List[int], pot: int, rollout_policy: Callable = strategy_1_bid) -> int:
+    # Most visited bid. The first iteration on a new root only adds the root,
+    # so a search cut short there has no visits and the rollout policy bids.
+    if sum(counts) == 0:
+        return rollout_policy(own_hand, pot)
+    return bm.mask_to_nvals(own_hand)[max(range(len(counts)), key=lambda idx: counts[idx])]
+
+
+# Root parallelism, every worker process searches the same root with its own
+# tree and the visit counts are summed. Each process keeps its tree between
+# calls so later turns reuse earlier searches. The tasks share one wall clock
+# deadline rather than each getting the time budget, so if the pool is busy
+# and a task starts late it stops at the deadline too, and the move still
+# takes about time_budget seconds.
+_WORKER_SEARCH = {}
+_POOLS = {}
+
+
+def _search_worker(config: tuple, seed: int, decision: tuple, deadline: float) -> Tuple[list, list]:
+    if config not in _WORKER_SEARCH:
+        _WORKER_SEARCH[config] = MCTS(*config)
+    random.seed(seed)
+    return _WORKER_SEARCH[config].search(*decision, deadline=deadline)
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    if workers not in _POOLS:
+        _POOLS[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _POOLS[workers]
+
+
+def parallel_search(workers: int, own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int,
+                    time_budget: float, exploration: float = 1.4, rollout: str = "strategy_1",
+                    margin_weight: float = 0.001, max_nodes: int = 500000) -> List[int]:
+    # root visit counts summed over the workers
+    config = (exploration, rollout, margin_weight, max_nodes)
+    decision = (own_hand, opp_hand, prizes, pot, diff)
+    deadline = time.time() + time_budget
+    pool = get_pool(workers)
+    futures = [pool.submit(_search_worker, config, random.getrandbits(64), decision, deadline)
+               for x in range(workers)]
+
+    counts = [0] * bm.mask_count(own_hand)
+    for future in futures:
+        for idx, count in enumerate(future.result()[0]):
+            counts[idx] += count
+    return counts
+
+
+def parallel_select_bid(workers: int, own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int,
+                        time_budget: float, exploration: float = 1.4, rollout: str = "strategy_1",
+                        margin_weight: float = 0.001, max_nodes: int = 500000) -> int:
+    counts = parallel_search(workers, own_hand, opp_hand, prizes, pot, diff, time_budget, exploration, rollout,
+                             margin_weight, max_nodes)
+    return best_bid(own_hand, counts, pot, ROLLOUT_POLICIES[rollout])
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Tuple, Union
+
+from gops.statements import move_to_statement
+from gops.trace_sink import read_trace_lines
+from gops.dataset_archive import ArchiveWriter
+from model_components.training_components import MoveCounter
+
+PLAYER_MOVES = ["player_1_move", "player_2_move"]
+
+
+def trace_pairs(json_trace: dict) -> List[Tuple[str, str]]:
+    # both players' (state, move) statements for every played turn, in turn order
+    pairs = []
+    for turn in sorted(json_trace["turns"], key=int):
+        turn_data = json_trace["turns"][turn]
+        for move in PLAYER_MOVES:
+            if "own_played_card" in turn_data[move]["post_play_data"]:
+                sample = move_to_statement(turn_data[move])
+                pairs.append((sample["state"], sample["move"]))
+    return pairs
+
+
+def _chunk_pairs(chunk: List[Union[dict, str]]) -> List[Tuple[str, str]]:
+    pairs = []
+    for json_trace in chunk:
+        if isinstance(json_trace, str):
+            json_trace = json.loads(json_trace)
+        pairs.extend(trace_pairs(json_trace))
+    return pairs
+
+
+def _chunks(traces: Iterable[Union[dict, str]], chunk_games: int) -> Iterator[List[Union[dict, str]]]:
+    chunk = []
+    for json_trace in traces:
+        chunk.append(json_trace)
+        if len(chunk) == chunk_games:
+            yield chunk
+            chunk = []
+    if len(chunk) > 0:
+        yield chunk
+
+
+def stream_pairs(traces: Iterable[Union[dict, str]], workers: int = 1, chunk_games: int = 256,
+                 max_in_flight: Union[int, None] = None) -> Iterator[Tuple[str, str]]:
+    # Pairs for each game in the order the traces come in. Traces can be
+    # to_json dicts or their JSON lines, which are then parsed in the workers
+    # rather than the reading process. Games are sent to the pool in chunks
+    # and at most max_in_flight chunks (two per worker by default) are read
+    # ahead, so memory stays bounded however long the input.
+    if workers <= 1:
+        for chunk in _chunks(traces, chunk_games):
+            yield from _chunk_pairs(chunk)
+        return
+
+    if max_in_flight is None:
+        max_in_flight = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in _chunks(traces, chunk_games):
+            in_flight.append(pool.submit(_chunk_pairs, chunk))
+            if len(in_flight) >= max_in_flight:
+                yield from in_flight.popleft().result()
+        while len(in_flight) > 0:
+            yield from in_flight.popleft().result()
+
+
+def write_pairs(traces: Iterable[Union[dict, str]], writer, workers: int = 1, chunk_games: int = 256,
+                report_every: float = 10.0, on_report: Callable = None) -> Tuple[int, float]:
+    # Streams pairs into writer.add (an ArchiveWriter or MoveCounter), calling
+    # on_report(pairs, elapsed, pairs_per_sec) every report_every seconds and
+    # once at the end. Returns the pair count and elapsed seconds.
+    start = time.perf_counter()
+    last_report = start
+    count = 0
+    for state, move in stream_pairs(traces, workers, chunk_games):
+        writer.add(state, move)
+        count += 1
+        if (on_report is not None) and (count % 1024 == 0):
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                on_report(count, now - start, count / (now - start))
+                last_report = now
+    elapsed = time.perf_counter() - start
+    if on_report is not None:
+        on_report(count, elapsed, count / elapsed if elapsed > 0 else 0.0)
+    return count, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn trace shards into a (state, move) dataset archive.")
+    parser.add_argument("--traces", required=True, help="directory of trace shards from gops.trace_sink")
+    parser.add_argument("--out", required=True, help="dataset archive index path (.npy)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-games", type=int, default=256)
+    parser.add_argument("--report-every", type=float, default=10.0)
+    parser.add_argument("--dedupe", action="store_true",
+                        help="store each distinct pair once with its occurrence count")
+    args = parser.parse_args()
+
+    def report(pairs, elapsed, pairs_per_sec):
+        print("{:>12} pairs  {:>8.1f} seconds  {:>10.0f} pairs per second".format(pairs, elapsed, pairs_per_sec))
+
+    with ArchiveWriter(args.out) as writer:
+        if args.dedupe:
+            with MoveCounter() as counter:
+                write_pairs(read_trace_lines(args.traces), counter, args.workers, args.chunk_games, args.report_every,
+                            report)
+                writer.add_many(counter.unique())
+            print("{:>12} unique pairs".format(len(writer.counts)))
+        else:
+            write_pairs(read_trace_lines(args.traces), writer, args.workers, args.chunk_games, args.report_every,
+                        report)
+
+
+if __name__ == "__main__":
+    main()
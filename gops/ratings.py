@@ -0,0 +1,123 @@
+import json
+from typing import Iterable, List, Union
+
+from gops.util import get_model_base_name
+from gops.simulate import simulate, SimulationResult
+
+
+class Rating():
+    def __init__(self, name: str, rating: float):
+        self.name = name
+        self.rating = rating
+        self.games = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "rating": self.rating, "games": self.games,
+                "wins": self.wins, "draws": self.draws, "losses": self.losses}
+
+
+class RatingTable():
+    # Elo ratings updated one game at a time, so results can be fed in as
+    # they are played. Players are strategies ("difficulty_3") or transformer
+    # checkpoints named by get_model_base_name.
+    def __init__(self, k_factor: float = 16.0, initial_rating: float = 1500.0):
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+        self.ratings = {}
+
+    def rating(self, name: str) -> Rating:
+        if name not in self.ratings:
+            self.ratings[name] = Rating(name, self.initial_rating)
+        return self.ratings[name]
+
+    def expected_score(self, name_1: str, name_2: str) -> float:
+        diff = self.rating(name_2).rating - self.rating(name_1).rating
+        return 1 / (1 + 10 ** (diff / 400))
+
+    def update(self, name_1: str, name_2: str, score_1: float):
+        # score_1 is 1 for a player 1 win, 0.5 for a draw and 0 for a loss
+        rating_1 = self.rating(name_1)
+        rating_2 = self.rating(name_2)
+        delta = self.k_factor * (score_1 - self.expected_score(name_1, name_2))
+        rating_1.rating += delta
+        rating_2.rating -= delta
+
+        rating_1.games += 1
+        rating_2.games += 1
+        if score_1 == 1:
+            rating_1.wins += 1
+            rating_2.losses += 1
+        elif score_1 == 0:
+            rating_1.losses += 1
+            rating_2.wins += 1
+        else:
+            rating_1.draws += 1
+            rating_2.draws += 1
+
+    def record_game(self, name_1: str, name_2: str, winner: int):
+        # winner uses the GameBase.decide_winner codes
+        if winner == 1:
+            self.update(name_1, name_2, 1)
+        elif winner == 2:
+            self.update(name_1, name_2, 0)
+        else:
+            self.update(name_1, name_2, 0.5)
+
+    def record_games(self, name_1: str, name_2: str, winners: Iterable[int]):
+        for winner in winners:
+            self.record_game(name_1, name_2, int(winner))
+
+    def leaderboard(self, top: Union[int, None] = None) -> List[Rating]:
+        ranked = sorted(self.ratings.values(), key=lambda x: x.rating, reverse=True)
+        if top is not None:
+            ranked = ranked[:top]
+        return ranked
+
+    def display_leaderboard(self, top: Union[int, None] = None):
+        print()
+        print("{:<4}{:<28}{:>9}{:>9}".format("", "Player", "Rating", "Games"))
+        for rank, rating in enumerate(self.leaderboard(top)):
+            print("{:<4}{:<28}{:>9.1f}{:>9}".format(rank + 1, rating.name, rating.rating, rating.games))
+
+    def save(self, filepath: str):
+        data = {"k_factor": self.k_factor, "initial_rating": self.initial_rating,
+                "ratings": [rating.to_dict() for rating in self.ratings.values()]}
+        with open(filepath, "w") as outfile:
+            json.dump(data, outfile)
+
+    @classmethod
+    def load(cls, filepath: str) -> "RatingTable":
+        with open(filepath) as infile:
+            data = json.load(infile)
+        table = cls(data["k_factor"], data["initial_rating"])
+        for saved in data["ratings"]:
+            rating = table.rating(saved["name"])
+            rating.rating = saved["rating"]
+            rating.games = saved["games"]
+            rating.wins = saved["wins"]
+            rating.draws = saved["draws"]
+            rating.losses = saved["losses"]
+        return table
+
+
+def player_name(difficulty: int, transformer_params: dict = None) -> str:
+    # the transformer difficulty is rated per checkpoint
+    if (difficulty == 4) and (transformer_params is not None):
+        return get_model_base_name(transformer_params["epochs"], transformer_params["version"],
+                                   transformer_params["train_device"], transformer_params["tokenizer"])
+    return "difficulty_" + str(difficulty)
+
+
+def rate_simulation(table: RatingTable, n_games: int, p1_difficulty: int, p2_difficulty: int,
+                    seed: Union[int, None] = None, transformer_params: dict = None) -> SimulationResult:
+    # plays n_games and updates the table after each one
+    name_1 = player_name(p1_difficulty, transformer_params)
+    name_2 = player_name(p2_difficulty, transformer_params)
+
+    def on_game(winner: int, margin: int):
+        table.record_game(name_1, name_2, winner)
+
+    return simulate(n_games, p1_difficulty, p2_difficulty, seed, transformer_params, on_game)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+import time
+import random
+import argparse
+from collections import defaultdict
+from typing import Callable, Union
+
+import numpy as np
+import torch
+
+from gops.game import AIAIGame
+from gops.trace_sink import TraceSink
+
+DIFFICULTIES = [1, 2, 3, 4, 5, 7, 8, 9]
+
+DEFAULT_TRANSFORMER_PARAMS = {"epochs": 7,
+                              "version": 45,
+                              "topk": 1,
+                              "run_device": "cpu",
+                              "train_device": "xpu",
+                              "tokenizer": "HF",
+                              "nproc": 12}
+
+
+class SimulationResult():
+    # Win counts and score margins (player 1 score - player 2 score) for one
+    # pairing. Margins are kept as a histogram so results stay small and can
+    # be merged.
+    def __init__(self, p1_difficulty: int, p2_difficulty: int):
+        self.p1_difficulty = p1_difficulty
+        self.p2_difficulty = p2_difficulty
+        self.games = 0
+        self.p1_wins = 0
+        self.p2_wins = 0
+        self.draws = 0
+        self.margins = defaultdict(int)
+        self.elapsed = 0.0
+
+    def add_game(self, winner: int, margin: int):
+        self.games += 1
+        if winner == 1:
+            self.p1_wins += 1
+        elif winner == 2:
+            self.p2_wins += 1
+        else:
+            self.draws += 1
+        self.margins[margin] += 1
+
+    def merge(self, other: "SimulationResult"):
+        if (self.p1_difficulty, self.p2_difficulty) != (other.p1_difficulty, other.p2_difficulty):
+            raise Exception("Cannot merge results for different difficulties.")
+        self.games += other.games
+        self.p1_wins += other.p1_wins
+        self.p2_wins += other.p2_wins
+        self.draws += other.draws
+        for margin, count in other.margins.items():
+            self.margins[margin] += count
+        self.elapsed += other.elapsed
+
+    def mean_margin(self) -> float:
+        if self.games == 0:
+            return 0.0
+        return sum(margin * count for margin, count in self.margins.items()) / self.games
+
+    def games_per_sec(self) -> float:
+        if self.elapsed == 0:
+            return 0.0
+        return self.games / self.elapsed
+
+    def to_dict(self) -> dict:
+        return {"p1_difficulty": self.p1_difficulty,
+                "p2_difficulty": self.p2_difficulty,
+                "games": self.games,
+                "p1_wins": self.p1_wins,
+                "p2_wins": self.p2_wins,
+                "draws": self.draws,
+                "margins": {str(margin): count for margin, count in self.margins.items()},
+                "elapsed": self.elapsed}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SimulationResult":
+        result = cls(data["p1_difficulty"], data["p2_difficulty"])
+        result.games = data["games"]
+        result.p1_wins = data["p1_wins"]
+        result.p2_wins = data["p2_wins"]
+        result.draws = data["draws"]
+        for margin, count in data["margins"].items():
+            result.margins[int(margin)] = count
+        result.elapsed = data["elapsed"]
+        return result
+
+    def summary(self) -> str:
+        lines = ["AI {} vs AI {}".format(self.p1_difficulty, self.p2_difficulty),
+                 "    games:            {}".format(self.games),
+                 "    player 1 wins:    {}".format(self.p1_wins),
+                 "    player 2 wins:    {}".format(self.p2_wins),
+                 "    draws:            {}".format(self.draws),
+                 "    mean margin:      {:.3f}".format(self.mean_margin()),
+                 "    games per second: {:.1f}".format(self.games_per_sec())]
+        return "\n".join(lines)
+
+
+def seed_all(seed: int):
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    torch.manual_seed(seed)
+
+
+def play_game(p1_difficulty: int, p2_difficulty: int, transformer_params: dict = None,
+              trace_sink: TraceSink = None) -> tuple:
+    if transformer_params is None:
+        transformer_params = DEFAULT_TRANSFORMER_PARAMS
+    game = AIAIGame(transformer_params, p1_difficulty, p2_difficulty, record_trace=trace_sink is not None)
+    winner = game.run_game()
+    if trace_sink is not None:
+        trace_sink.write(game.game_trace)
+    return winner, game.score_margin()
+
+
+def simulate(n_games: int, p1_difficulty: int, p2_difficulty: int, seed: Union[int, None] = None,
+             transformer_params: dict = None, on_game: Callable = None,
+             trace_sink: TraceSink = None) -> SimulationResult:
+    for difficulty in [p1_difficulty, p2_difficulty]:
+        if difficulty not in DIFFICULTIES:
+            raise Exception("Bad difficulty.")
+    if seed is not None:
+        seed_all(seed)
+
+    result = SimulationResult(p1_difficulty, p2_difficulty)
+    start = time.perf_counter()
+    for x in range(n_games):
+        winner, margin = play_game(p1_difficulty, p2_difficulty, transformer_params, trace_sink)
+        result.add_game(winner, margin)
+        if on_game is not None:
+            on_game(winner, margin)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play AI against AI without a human player.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--p1", type=int, default=1, choices=DIFFICULTIES)
+    parser.add_argument("--p2", type=int, default=3, choices=DIFFICULTIES)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--trace-dir", type=str, default=None,
+                        help="append each game trace as a JSON line to shards in this directory")
+    args = parser.parse_args()
+
+    if args.trace_dir is None:
+        result = simulate(args.games, args.p1, args.p2, args.seed)
+    else:
+        with TraceSink(args.trace_dir) as trace_sink:
+            result = simulate(args.games, args.p1, args.p2, args.seed, trace_sink=trace_sink)
+    print(result.summary())
+
+
+if __name__ == "__main__":
+    main()
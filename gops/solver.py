@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+import time
+import random
+import argparse
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+import gops.bitmask as bm
+
+EPS = 1e-12
+
+
+def solve_matrix_game(payoff: np.ndarray) -> tuple:
+    # Zero sum matrix game, the row player maximises the payoff.
+    # Returns (value, row strategy, column strategy).
+    n_rows, n_cols = payoff.shape
+
+    # pure saddle point, the common case near the end of a game
+    row_mins = payoff.min(axis=1)
+    col_maxs = payoff.max(axis=0)
+    if row_mins.max() >= col_maxs.min() - EPS:
+        row_strategy = np.zeros(n_rows)
+        col_strategy = np.zeros(n_cols)
+        row_strategy[np.argmax(row_mins)] = 1
+        col_strategy[np.argmin(col_maxs)] = 1
+        return float(row_mins.max()), row_strategy, col_strategy
+
+    # Shift the payoffs to be positive then solve
+    #   max sum(y) s.t. A y <= 1, y >= 0
+    # with the tableau simplex method and Bland's rule. The column strategy
+    # is y / sum(y) and the row strategy comes from the slack duals.
+    shift = 1 - payoff.min()
+    tableau = np.zeros((n_rows + 1, n_cols + n_rows + 1))
+    tableau[:n_rows, :n_cols] = payoff + shift
+    tableau[:n_rows, n_cols:n_cols + n_rows] = np.eye(n_rows)
+    tableau[:n_rows, -1] = 1
+    tableau[n_rows, :n_cols] = -1
+    basis = list(range(n_cols, n_cols + n_rows))
+
+    while True:
+        entering = np.flatnonzero(tableau[n_rows, :-1] < -EPS)
+        if len(entering) == 0:
+            break
+        col = entering[0]
+        column = tableau[:n_rows, col]
+        rows = np.flatnonzero(column > EPS)
+        ratios = tableau[rows, -1] / column[rows]
+        best = rows[ratios <= ratios.min() + EPS]
+        row = min(best, key=lambda x: basis[x])
+
+        tableau[row] /= tableau[row, col]
+        for other in range(n_rows + 1):
+            if other != row:
+                tableau[other] -= tableau[other, col] * tableau[row]
+        basis[row] = col
+
+    total = tableau[n_rows, -1]
+    col_strategy = np.zeros(n_cols)
+    for row, var in enumerate(basis):
+        if var < n_cols:
+            col_strategy[var] = tableau[row, -1]
+    row_strategy = np.clip(tableau[n_rows, n_cols:n_cols + n_rows], 0, None)
+    col_strategy = np.clip(col_strategy, 0, None)
+    return 1 / total - shift, row_strategy / row_strategy.sum(), col_strategy / col_strategy.sum()
+
+
+def canonical_hands(hand_1: int, hand_2: int) -> Tuple[int, int]:
+    # Bids are only ever compared, so the hands can be relabelled to the
+    # ranks of their union without changing the game. Each hand keeps its
+    # ascending order, so strategies over the bids carry over by index.
+    union = hand_1 | hand_2
+    if union == (1 << union.bit_length()) - 1:
+        return hand_1, hand_2
+    canon_1 = 0
+    canon_2 = 0
+    for rank, nval in enumerate(bm.mask_to_nvals(union)):
+        if bm.in_mask(hand_1, nval):
+            canon_1 |= 1 << rank
+        if bm.in_mask(hand_2, nval):
+            canon_2 |= 1 << rank
+    return canon_1, canon_2
+
+
+def sign(diff: int) -> int:
+    return (diff > 0) - (diff < 0)
+
+
+class NodeSolution(NamedTuple):
+    # strategies are over each player's bids in ascending order
+    value: float
+    strategy_1: Tuple[float, ...]
+    strategy_2: Tuple[float, ...]
+
+
+class GopsSolver():
+    # Equilibrium of GOPS played for the win: the payoff is 1 for a player 1
+    # win, 0 for a draw and -1 for a loss. Rules follow PlayArea.award_points,
+    # ties carry the pot and a tie on the last card awards nothing.
+    #
+    # margin_weight adds margin_weight * final score diff to the payoff. Kept
+    # small it only breaks ties between bids, so a lost position is still
+    # played for points instead of any card at all, but decided positions can
+    # no longer be cut off early.
+    #
+    # A chance node is before the next prize is flipped, a decision node after.
+    # Both are memoised on (hand_1, hand_2, remaining prizes, pot, score diff)
+    # where the pot at a decision node includes the flipped prize.
+    def __init__(self, margin_weight: float = 0.0):
+        self.margin_weight = margin_weight
+        self.chance_memo = {}
+        self.node_memo = {}
+
+    def states(self) -> int:
+        return len(self.chance_memo) + len(self.node_memo)
+
+    def _decided(self, prizes: int, pot: int, diff: int) -> bool:
+        return (self.margin_weight == 0) and (abs(diff) > pot + bm.mask_sum(prizes))
+
+    def chance_value(self, hand_1: int, hand_2: int, prizes: int, pot: int, diff: int) -> float:
+        if prizes == 0:
+            return sign(diff) + self.margin_weight * diff
+        if self._decided(prizes, pot, diff):
+            return sign(diff)
+
+        hand_1, hand_2 = canonical_hands(hand_1, hand_2)
+        key = (hand_1, hand_2, prizes, pot, diff)
+        if key in self.chance_memo:
+            return self.chance_memo[key]
+
+        prize_list = bm.mask_to_nvals(prizes)
+        total = 0.0
+        for prize in prize_list:
+            total += self.node(hand_1, hand_2, bm.remove_nval(prizes, prize), pot + prize, diff).value
+        value = total / len(prize_list)
+        self.chance_memo[key] = value
+        return value
+
+    def node(self, hand_1: int, hand_2: int, prizes: int, pot: int, diff: int) -> NodeSolution:
+        hand_1, hand_2 = canonical_hands(hand_1, hand_2)
+        key = (hand_1, hand_2, prizes, pot, diff)
+        if key in self.node_memo:
+            return self.node_memo[key]
+
+        bids_1 = bm.mask_to_nvals(hand_1)
+        bids_2 = bm.mask_to_nvals(hand_2)
+        if self._decided(prizes, pot, diff):
+            # decided whatever is played
+            solution = NodeSolution(sign(diff), (1 / len(bids_1),) * len(bids_1), (1 / len(bids_2),) * len(bids_2))
+            self.node_memo[key] = solution
+            return solution
+
+        payoff = np.zeros((len(bids_1), len(bids_2)))
+        for row, bid_1 in enumerate(bids_1):
+            rest_1 = bm.remove_nval(hand_1, bid_1)
+            for col, bid_2 in enumerate(bids_2):
+                rest_2 = bm.remove_nval(hand_2, bid_2)
+                if bid_1 > bid_2:
+                    payoff[row, col] = self.chance_value(rest_1, rest_2, prizes, 0, diff + pot)
+                elif bid_2 > bid_1:
+                    payoff[row, col] = self.chance_value(rest_1, rest_2, prizes, 0, diff - pot)
+                else:
+                    payoff[row, col] = self.chance_value(rest_1, rest_2, prizes, pot, diff)
+
+        value, strategy_1, strategy_2 = solve_matrix_game(payoff)
+        solution = NodeSolution(value, tuple(strategy_1), tuple(strategy_2))
+        self.node_memo[key] = solution
+        return solution
+
+    def game_value(self, n_cards: int = bm.SUIT_SIZE) -> float:
+        full = bm.full_mask(n_cards)
+        return self.chance_value(full, full, full, 0, 0)
+
+    def select_bid(self, own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int) -> int:
+        # samples a bid from the equilibrium strategy of the player holding
+        # own_hand, diff is that player's score minus the opponent's
+        solution = self.node(own_hand, opp_hand, prizes, pot, diff)
+        return random.choices(bm.mask_to_nvals(own_hand), weights=solution.strategy_1)[0]
+
+
+_SOLVERS = {}
+
+
+def get_solver(margin_weight: float = 0.0) -> GopsSolver:
+    # One solver per margin weight in the process, so subgames solved in one
+    # game are still memoised in the next. The memos only hold endgames the
+    # players reached, which are few for the small endgames it is used on.
+    if margin_weight not in _SOLVERS:
+        _SOLVERS[margin_weight] = GopsSolver(margin_weight)
+    return _SOLVERS[margin_weight]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve GOPS exactly for a small deck.")
+    parser.add_argument("--cards", type=int, nargs="+", default=[5, 6])
+    args = parser.parse_args()
+
+    for n_cards in args.cards:
+        solver = GopsSolver()
+        start = time.perf_counter()
+        value = solver.game_value(n_cards)
+        elapsed = time.perf_counter() - start
+        print("{} cards: value {:.6f}, {} states, {:.1f} seconds".format(n_cards, value, solver.states(), elapsed))
+
+        full = bm.full_mask(n_cards)
+        for prize in range(1, n_cards + 1):
+            solution = solver.node(full, full, bm.remove_nval(full, prize), prize, 0)
+            print("    first prize {:>2}: ".format(prize) + " ".join("{:.3f}".format(p) for p in solution.strategy_1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import math
+import time
+import argparse
+from typing import Union
+
+from gops.simulate import DIFFICULTIES, SimulationResult, play_game, seed_all
+
+ACCEPT_H1 = "H1"
+ACCEPT_H0 = "H0"
+
+
+class SPRT():
+    # Wald's sequential probability ratio test on the player 1 win rate over
+    # decisive games, draws carry no information and are skipped.
+    #   H0: win rate == h0_win_rate
+    #   H1: win rate == h1_win_rate
+    # alpha is the chance of accepting H1 when H0 holds, beta the reverse.
+    def __init__(self, h0_win_rate: float = 0.5, h1_win_rate: float = 0.55, alpha: float = 0.05, beta: float = 0.05):
+        if not (0 < h0_win_rate < 1) or not (0 < h1_win_rate < 1) or (h0_win_rate == h1_win_rate):
+            raise Exception("Bad hypothesis win rates.")
+        self.h0_win_rate = h0_win_rate
+        self.h1_win_rate = h1_win_rate
+        self.alpha = alpha
+        self.beta = beta
+
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+        self._win_llr = math.log(h1_win_rate / h0_win_rate)
+        self._loss_llr = math.log((1 - h1_win_rate) / (1 - h0_win_rate))
+        self.llr = 0.0
+
+    def add_game(self, winner: int):
+        if winner == 1:
+            self.llr += self._win_llr
+        elif winner == 2:
+            self.llr += self._loss_llr
+
+    def verdict(self) -> Union[str, None]:
+        if self.llr >= self.upper:
+            return ACCEPT_H1
+        elif self.llr <= self.lower:
+            return ACCEPT_H0
+        return None
+
+    def confidence(self) -> float:
+        # probability of the favoured hypothesis given equal priors
+        return 1 / (1 + math.exp(-abs(self.llr)))
+
+
+class SPRTResult():
+    def __init__(self, test: SPRT, result: SimulationResult):
+        self.verdict = test.verdict()
+        self.llr = test.llr
+        self.confidence = test.confidence()
+        self.games = result.games
+        self.result = result
+
+    def summary(self) -> str:
+        if self.verdict == ACCEPT_H1:
+            outcome = "player 1 is stronger (H1 accepted)"
+        elif self.verdict == ACCEPT_H0:
+            outcome = "player 1 is not stronger (H0 accepted)"
+        else:
+            outcome = "no verdict before the game limit"
+        lines = [self.result.summary(),
+                 "    verdict:          " + outcome,
+                 "    games played:     {}".format(self.games),
+                 "    log likelihood:   {:.3f}".format(self.llr),
+                 "    confidence:       {:.4f}".format(self.confidence)]
+        return "\n".join(lines)
+
+
+def run_sprt(p1_difficulty: int, p2_difficulty: int, test: SPRT = None, max_games: int = 100000,
+             seed: Union[int, None] = None, transformer_params: dict = None) -> SPRTResult:
+    # plays games one at a time until the test reaches a verdict
+    for difficulty in [p1_difficulty, p2_difficulty]:
+        if difficulty not in DIFFICULTIES:
+            raise Exception("Bad difficulty.")
+    if test is None:
+        test = SPRT()
+    if seed is not None:
+        seed_all(seed)
+
+    result = SimulationResult(p1_difficulty, p2_difficulty)
+    start = time.perf_counter()
+    while (result.games < max_games) and (test.verdict() is None):
+        winner, margin = play_game(p1_difficulty, p2_difficulty, transformer_params)
+        result.add_game(winner, margin)
+        test.add_game(winner)
+    result.elapsed = time.perf_counter() - start
+    return SPRTResult(test, result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play two AIs until a sequential test decides which is stronger.")
+    parser.add_argument("--p1", type=int, default=5, choices=DIFFICULTIES)
+    parser.add_argument("--p2", type=int, default=3, choices=DIFFICULTIES)
+    parser.add_argument("--h0", type=float, default=0.5, help="player 1 win rate under H0")
+    parser.add_argument("--h1", type=float, default=0.55, help="player 1 win rate under H1")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--max-games", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    test = SPRT(args.h0, args.h1, args.alpha, args.beta)
+    print(run_sprt(args.p1, args.p2, test, args.max_games, args.seed).summary())
+
+
+if __name__ == "__main__":
+    main()
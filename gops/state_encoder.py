@@ -0,0 +1,108 @@
+import json
+from typing import List, Union
+
+import numpy as np
+from tokenizers import Tokenizer
+
+import gops.bitmask as bm
+
+# most points a score or pot can reach, 1 + 2 + ... + 13
+MAX_POINTS = 91
+
+VALUE_BITS = {str(bm.nval_to_value(nval)): bm.nval_bit(nval) for nval in range(1, bm.SUIT_SIZE + 1)}
+
+
+class StateEncoder():
+    # Maps a game state straight to the token ids the state tokenizer gives
+    # state_to_statement(move_data), without building the statement string.
+    # A statement is six words, each fixed by one part of the state, so the
+    # id of every possible word is looked up in the vocab once, up front:
+    # hands and card sets by bitmask, scores and the pot by value.
+    def __init__(self, tokenizer):
+        config = json.loads(tokenizer.to_str())
+        if not self.supports(config):
+            raise Exception("State encoder needs a WordLevel tokenizer with a Whitespace pre-tokenizer.")
+        vocab = config["model"]["vocab"]
+        unk = vocab[config["model"]["unk_token"]]
+        special = config["post_processor"]["special_tokens"]
+        self.bos = special["<bos>"]["ids"][0]
+        self.eos = special["<eos>"]["ids"][0]
+
+        def mask_ids(prefix):
+            ids = np.zeros(bm.full_mask(bm.SUIT_SIZE) + 1, dtype=np.int64)
+            for mask in range(len(ids)):
+                word = prefix + "_".join(str(nval) for nval in bm.mask_to_nvals(mask))
+                ids[mask] = vocab.get(word, unk)
+            return ids
+
+        def value_ids(prefix):
+            return np.array([vocab.get(prefix + str(value), unk) for value in range(MAX_POINTS + 1)], dtype=np.int64)
+
+        self.hand_ids = mask_ids("player_hand_")
+        self.player_score_ids = value_ids("player_score_")
+        self.opp_played_ids = mask_ids("opp_cards_played_")
+        self.opponent_score_ids = value_ids("opponent_score_")
+        self.pot_ids = value_ids("current_score_card_")
+        self.previous_ids = mask_ids("prev_score_cards_")
+
+    @staticmethod
+    def supports(config: dict) -> bool:
+        # the layout the training scripts save: WordLevel words split on
+        # whitespace, no normalizer, wrapped in <bos> ... <eos>
+        post_processor = config.get("post_processor") or {}
+        return (config.get("model", {}).get("type") == "WordLevel") \
+            and (config.get("pre_tokenizer") or {}).get("type") in ["Whitespace", "WhitespaceSplit"] \
+            and (config.get("normalizer") is None) \
+            and (post_processor.get("type") == "TemplateProcessing") \
+            and ("<bos>" in post_processor.get("special_tokens", {})) \
+            and ("<eos>" in post_processor.get("special_tokens", {})) \
+            and ([list(item) for item in post_processor.get("single", [])] ==
+                 [["SpecialToken"], ["Sequence"], ["SpecialToken"]])
+
+    def encode_masks(self, own_hand: int, own_score: int, opp_hand: int, opp_score: int, pot_value: int,
+                     previous: int) -> List[int]:
+        # previous is the mask of prize cards won on earlier turns
+        return [self.bos,
+                int(self.hand_ids[own_hand]),
+                int(self.player_score_ids[own_score]),
+                int(self.opp_played_ids[bm.FULL_SUIT & ~opp_hand]),
+                int(self.opponent_score_ids[opp_score]),
+                int(self.pot_ids[pot_value]),
+                int(self.previous_ids[previous]),
+                self.eos]
+
+    def encode(self, move_data: dict) -> List[int]:
+        # same ids as state_tokenizer.encode(state_to_statement(move_data)).ids
+        pre_play = move_data["pre_play_data"]
+        own_hand = 0
+        for value in pre_play["own_hand"]:
+            own_hand |= VALUE_BITS[value]
+        opp_hand = 0
+        for value in pre_play["opponent_hand"]:
+            opp_hand |= VALUE_BITS[value]
+        previous = 0
+        for value in pre_play["previous_prize_values"]:
+            previous |= VALUE_BITS[value]
+        pot_value = sum(bm.value_to_nval(value) for value in pre_play["prize_values"])
+        return self.encode_masks(own_hand, int(pre_play["own_score"]), opp_hand, int(pre_play["opponent_score"]),
+                                 pot_value, previous)
+
+
+def encoder_for(tokenizer) -> Union[StateEncoder, None]:
+    # None when the tokenizer is not one the encoder can reproduce
+    if not StateEncoder.supports(json.loads(tokenizer.to_str())):
+        return None
+    return StateEncoder(tokenizer)
+
+
+_ENCODERS = {}
+
+
+def load_state_encoder(filepath: str, tokenizer: Union[Tokenizer, None] = None) -> Union[StateEncoder, None]:
+    # Building the lookup arrays takes about 0.1s, so there is one encoder
+    # per tokenizer file in the process rather than one per hand.
+    if filepath not in _ENCODERS:
+        if tokenizer is None:
+            tokenizer = Tokenizer.from_file(filepath)
+        _ENCODERS[filepath] = encoder_for(tokenizer)
+    return _ENCODERS[filepath]
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+import json
+import math
+import time
+import random
+import struct
+import argparse
+from itertools import combinations
+from typing import List, Tuple, Union
+
+import numpy as np
+
+import gops.bitmask as bm
+from gops.solver import GopsSolver, canonical_hands, sign
+
+MAGIC = b"GOPSTB01"
+HEADER = struct.Struct("<8sI")
+
+
+def section_dtype(cards: int) -> np.dtype:
+    # equilibrium value for the player to move and their strategy over the
+    # bids in ascending order
+    return np.dtype([("value", "<f4"), ("strategy", "<f4", (cards,))])
+
+
+def hand_patterns(cards: int) -> List[Tuple[int, int]]:
+    # Every pair of canonical hands (see solver.canonical_hands) with this many
+    # cards each. A rank of the union is in hand 1 only, hand 2 only or both.
+    patterns = []
+
+    def extend(rank: int, hand_1: int, hand_2: int, left_1: int, left_2: int):
+        if (left_1 == 0) and (left_2 == 0):
+            patterns.append((hand_1, hand_2))
+            return
+        bit = 1 << rank
+        if left_1 > 0:
+            extend(rank + 1, hand_1 | bit, hand_2, left_1 - 1, left_2)
+        if left_2 > 0:
+            extend(rank + 1, hand_1, hand_2 | bit, left_1, left_2 - 1)
+        if (left_1 > 0) and (left_2 > 0):
+            extend(rank + 1, hand_1 | bit, hand_2 | bit, left_1 - 1, left_2 - 1)
+
+    extend(0, 0, 0, cards, cards)
+    return patterns
+
+
+def subset_rank(mask: int) -> int:
+    # colex rank of the mask among masks with the same number of cards
+    rank = 0
+    for idx, nval in enumerate(bm.mask_to_nvals(mask)):
+        rank += math.comb(nval - 1, idx + 1)
+    return rank
+
+
+class _Section():
+    # Records for positions with `cards` cards in each hand. The file holds
+    # one block per (undrawn prize set, pot) and inside a block the records
+    # are ordered by score diff then hand pattern. Only diffs the remaining
+    # points can still overturn are stored.
+    def __init__(self, cards: int, n_cards: int, pot_max: int):
+        self.cards = cards
+        self.pot_max = pot_max
+        self.patterns = hand_patterns(cards)
+        self.pattern_index = {pattern: idx for idx, pattern in enumerate(self.patterns)}
+
+        self.prize_sets = [bm.nvals_to_mask(combo) for combo in combinations(range(1, n_cards + 1), cards - 1)]
+        self.prize_sets.sort(key=subset_rank)
+        self.block_start = np.zeros((len(self.prize_sets), pot_max + 1), dtype=np.int64)
+        records = 0
+        for rank, prizes in enumerate(self.prize_sets):
+            for pot in range(1, pot_max + 1):
+                self.block_start[rank, pot] = records
+                records += (2 * self.window(prizes, pot) + 1) * len(self.patterns)
+        self.records = records
+
+    def window(self, prizes: int, pot: int) -> int:
+        return pot + bm.mask_sum(prizes)
+
+    def index(self, pattern: Tuple[int, int], prizes: int, pot: int, diff: int) -> int:
+        window = self.window(prizes, pot)
+        start = self.block_start[subset_rank(prizes), pot]
+        return int(start + (diff + window) * len(self.patterns) + self.pattern_index[pattern])
+
+
+class Tablebase():
+    # Exact equilibrium values and strategies (see gops.solver) for every
+    # decision with at most max_cards cards in hand, in one flat file that is
+    # memory mapped. A position is looked up from the hand masks, the
+    # undrawn prizes, the pot (including the flipped prize) and the score diff.
+    def __init__(self, filepath: str):
+        with open(filepath, "rb") as infile:
+            magic, header_size = HEADER.unpack(infile.read(HEADER.size))
+            if magic != MAGIC:
+                raise Exception("Not a tablebase file.")
+            header = json.loads(infile.read(header_size).decode("utf-8"))
+
+        self.n_cards = header["n_cards"]
+        self.max_cards = header["max_cards"]
+        self.pot_max = header["pot_max"]
+        self.sections = {}
+        self.records = {}
+        for info in header["sections"]:
+            section = _Section(info["cards"], self.n_cards, self.pot_max)
+            self.sections[section.cards] = section
+            self.records[section.cards] = np.memmap(filepath, dtype=section_dtype(section.cards), mode="r",
+                                                    offset=info["offset"], shape=(section.records,))
+
+    def lookup(self, own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int) -> Union[tuple, None]:
+        # (value, strategy over own bids in ascending order) for the player
+        # holding own_hand, None when the position is not in the table
+        cards = bm.mask_count(own_hand)
+        if (cards not in self.sections) or (pot < 1) or (pot > self.pot_max):
+            return None
+        section = self.sections[cards]
+        if abs(diff) > section.window(prizes, pot):
+            return sign(diff), (1 / cards,) * cards
+
+        record = self.records[cards][section.index(canonical_hands(own_hand, opp_hand), prizes, pot, diff)]
+        return float(record["value"]), tuple(float(p) for p in record["strategy"])
+
+    def select_bid(self, own_hand: int, opp_hand: int, prizes: int, pot: int, diff: int) -> Union[int, None]:
+        entry = self.lookup(own_hand, opp_hand, prizes, pot, diff)
+        if entry is None:
+            return None
+        return random.choices(bm.mask_to_nvals(own_hand), weights=entry[1])[0]
+
+
+_OPEN_TABLEBASES = {}
+
+
+def load_tablebase(filepath: str) -> Tablebase:
+    # memory maps are shared, so players can open the file every game
+    if filepath not in _OPEN_TABLEBASES:
+        _OPEN_TABLEBASES[filepath] = Tablebase(filepath)
+    return _OPEN_TABLEBASES[filepath]
+
+
+def build_tablebase(filepath: str, max_cards: int = 3, pot_max: int = 26, n_cards: int = bm.SUIT_SIZE,
+                    verbose: bool = False):
+    sections = [_Section(cards, n_cards, pot_max) for cards in range(1, max_cards + 1)]
+    header = {"n_cards": n_cards, "max_cards": max_cards, "pot_max": pot_max, "sections": []}
+
+    # sections start after the header, 8 byte aligned
+    offset = 0
+    for section in sections:
+        header["sections"].append({"cards": section.cards, "offset": offset, "records": section.records})
+        offset += section.records * section_dtype(section.cards).itemsize
+    header_size = len(json.dumps(header)) + 64 * len(sections) + 64
+    header_size += (-(HEADER.size + header_size)) % 8
+    for info in header["sections"]:
+        info["offset"] += HEADER.size + header_size
+
+    data = json.dumps(header).encode("utf-8").ljust(header_size)
+    with open(filepath, "wb") as outfile:
+        outfile.write(HEADER.pack(MAGIC, header_size))
+        outfile.write(data)
+        outfile.truncate(HEADER.size + header_size + offset)
+
+    for section, info in zip(sections, header["sections"]):
+        start = time.perf_counter()
+        records = np.memmap(filepath, dtype=section_dtype(section.cards), mode="r+",
+                            offset=info["offset"], shape=(section.records,))
+        for prizes in section.prize_sets:
+            # subgames only share positions within a prize set
+            solver = GopsSolver()
+            for pot in range(1, pot_max + 1):
+                window = section.window(prizes, pot)
+                for diff in range(-window, window + 1):
+                    for pattern in section.patterns:
+                        solution = solver.node(pattern[0], pattern[1], prizes, pot, diff)
+                        idx = section.index(pattern, prizes, pot, diff)
+                        records[idx]["value"] = solution.value
+                        records[idx]["strategy"] = solution.strategy_1
+        records.flush()
+        del records
+        if verbose:
+            print("{} cards: {} records in {:.1f} seconds".format(section.cards, section.records,
+                                                                  time.perf_counter() - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an endgame tablebase.")
+    parser.add_argument("filepath")
+    parser.add_argument("--max-cards", type=int, default=3)
+    parser.add_argument("--pot-max", type=int, default=26)
+    args = parser.parse_args()
+    build_tablebase(args.filepath, args.max_cards, args.pot_max, verbose=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Union
+
+import numpy as np
+
+from gops.simulate import DIFFICULTIES, DEFAULT_TRANSFORMER_PARAMS, SimulationResult, simulate
+
+# played when no difficulties are given, the slower search and policy AIs are opted into
+DEFAULT_DIFFICULTIES = [1, 2, 3, 4, 5]
+
+
+def _play_chunk(p1_difficulty: int, p2_difficulty: int, n_games: int, seed: int, transformer_params: dict) -> dict:
+    # runs in a worker process, results go back as dicts
+    result = simulate(n_games, p1_difficulty, p2_difficulty, seed, transformer_params)
+    return result.to_dict()
+
+
+class TournamentResult():
+    # Row difficulty plays as player 1 against the column difficulty.
+    def __init__(self, difficulties: List[int]):
+        self.difficulties = list(difficulties)
+        self.results = {}
+        for p1 in self.difficulties:
+            for p2 in self.difficulties:
+                self.results[(p1, p2)] = SimulationResult(p1, p2)
+        self.elapsed = 0.0
+
+    def _matrix(self, value) -> np.ndarray:
+        size = len(self.difficulties)
+        matrix = np.zeros((size, size))
+        for row, p1 in enumerate(self.difficulties):
+            for col, p2 in enumerate(self.difficulties):
+                result = self.results[(p1, p2)]
+                if result.games > 0:
+                    matrix[row, col] = value(result)
+        return matrix
+
+    def win_matrix(self) -> np.ndarray:
+        return self._matrix(lambda result: result.p1_wins / result.games)
+
+    def draw_matrix(self) -> np.ndarray:
+        return self._matrix(lambda result: result.draws / result.games)
+
+    def loss_matrix(self) -> np.ndarray:
+        return self._matrix(lambda result: result.p2_wins / result.games)
+
+    def margin_matrix(self) -> np.ndarray:
+        return self._matrix(lambda result: result.mean_margin())
+
+    def games(self) -> int:
+        return sum(result.games for result in self.results.values())
+
+    def _format_matrix(self, title: str, matrix: np.ndarray, fmt: str) -> List[str]:
+        lines = [title, "       " + "".join("{:>9}".format("AI " + str(p2)) for p2 in self.difficulties)]
+        for row, p1 in enumerate(self.difficulties):
+            lines.append("{:>7}".format("AI " + str(p1)) + "".join(fmt.format(val) for val in matrix[row]))
+        lines.append("")
+        return lines
+
+    def summary(self) -> str:
+        lines = ["Rows play as player 1 against the columns as player 2.", ""]
+        lines += self._format_matrix("Win rate:", self.win_matrix(), "{:>9.3f}")
+        lines += self._format_matrix("Draw rate:", self.draw_matrix(), "{:>9.3f}")
+        lines += self._format_matrix("Loss rate:", self.loss_matrix(), "{:>9.3f}")
+        lines += self._format_matrix("Mean margin:", self.margin_matrix(), "{:>9.2f}")
+        lines.append("{} games in {:.1f} seconds".format(self.games(), self.elapsed))
+        return "\n".join(lines)
+
+
+def run_tournament(n_games: int, difficulties: List[int] = None, seed: Union[int, None] = None,
+                   workers: Union[int, None] = None, chunk_size: int = 500,
+                   transformer_params: dict = None) -> TournamentResult:
+    # plays n_games for every ordered pairing, split into chunks that each
+    # get their own seed so runs can be repeated whatever the worker count
+    if difficulties is None:
+        difficulties = DEFAULT_DIFFICULTIES
+    if transformer_params is None:
+        transformer_params = DEFAULT_TRANSFORMER_PARAMS
+    if workers is None:
+        workers = os.cpu_count()
+
+    tasks = []
+    for p1 in difficulties:
+        for p2 in difficulties:
+            for start in range(0, n_games, chunk_size):
+                tasks.append((p1, p2, min(chunk_size, n_games - start)))
+    seeds = np.random.SeedSequence(seed).generate_state(len(tasks))
+
+    tournament = TournamentResult(difficulties)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_play_chunk, p1, p2, games, int(task_seed), transformer_params)
+                   for (p1, p2, games), task_seed in zip(tasks, seeds)]
+        for future in futures:
+            result = SimulationResult.from_dict(future.result())
+            tournament.results[(result.p1_difficulty, result.p2_difficulty)].merge(result)
+    tournament.elapsed = time.perf_counter() - start
+    return tournament
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play every AI difficulty against every other.")
+    parser.add_argument("--games", type=int, default=1000, help="games per pairing")
+    parser.add_argument("--difficulties", type=int, nargs="+", default=DEFAULT_DIFFICULTIES,
+                        choices=DIFFICULTIES)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    tournament = run_tournament(args.games, args.difficulties, args.seed, args.workers, args.chunk_size)
+    print(tournament.summary())
+
+
+if __name__ == "__main__":
+    main()
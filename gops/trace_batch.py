@@ -0,0 +1,131 @@
+from typing import Iterator, List, Union
+
+import numpy as np
+
+import gops.bitmask as bm
+from gops.batch_simulate import BatchResult
+from gops.game_traces import GameTrace, TurnEvent, TurnState
+
+N_TURNS = bm.SUIT_SIZE
+
+
+class TraceBatch():
+    # Traces for many games in columns, row g is a game and column t is turn
+    # t. Every array is int8 (no pot or score goes over 91), so a game takes
+    # under 100 bytes against a GameTrace object graph per game.
+    #   prizes:   prize card flipped
+    #   bids_1/2: card played by each player
+    #   pots:     value bid for, the prize plus any tied pot
+    #   scores_1/2: scores before the bids
+    def __init__(self, prizes: np.ndarray, bids_1: np.ndarray, bids_2: np.ndarray, winners: np.ndarray = None):
+        prizes = np.asarray(prizes, dtype=np.int8)
+        if (prizes.ndim != 2) or (prizes.shape[1] != N_TURNS):
+            raise Exception("Traces must have shape (games, 13).")
+        if (np.shape(bids_1) != prizes.shape) or (np.shape(bids_2) != prizes.shape):
+            raise Exception("Prize and bid arrays must have the same shape.")
+        self.prizes = prizes
+        self.bids_1 = np.asarray(bids_1, dtype=np.int8)
+        self.bids_2 = np.asarray(bids_2, dtype=np.int8)
+
+        n_games = len(prizes)
+        self.pots = np.zeros((n_games, N_TURNS), dtype=np.int8)
+        self.scores_1 = np.zeros((n_games, N_TURNS), dtype=np.int8)
+        self.scores_2 = np.zeros((n_games, N_TURNS), dtype=np.int8)
+        score_1 = np.zeros(n_games, dtype=np.int32)
+        score_2 = np.zeros(n_games, dtype=np.int32)
+        pot = np.zeros(n_games, dtype=np.int32)
+        for turn in range(N_TURNS):
+            value = pot + self.prizes[:, turn]
+            self.pots[:, turn] = value
+            self.scores_1[:, turn] = score_1
+            self.scores_2[:, turn] = score_2
+            bid_1 = self.bids_1[:, turn]
+            bid_2 = self.bids_2[:, turn]
+            score_1 = score_1 + np.where(bid_1 > bid_2, value, 0)
+            score_2 = score_2 + np.where(bid_2 > bid_1, value, 0)
+            pot = np.where(bid_1 == bid_2, value, 0)
+        self.final_scores_1 = score_1.astype(np.int8)
+        self.final_scores_2 = score_2.astype(np.int8)
+
+        if winners is None:
+            winners = np.where(score_1 > score_2, 1, np.where(score_2 > score_1, 2, 0))
+        self.winners = np.asarray(winners, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.prizes)
+
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in [self.prizes, self.bids_1, self.bids_2, self.pots, self.scores_1,
+                                              self.scores_2, self.final_scores_1, self.final_scores_2, self.winners])
+
+    @classmethod
+    def from_batch_result(cls, result: BatchResult) -> "TraceBatch":
+        return cls(result.prize_orders, result.bids_1, result.bids_2, result.winners)
+
+    @classmethod
+    def from_game_traces(cls, traces: List[GameTrace]) -> "TraceBatch":
+        prizes = np.zeros((len(traces), N_TURNS), dtype=np.int8)
+        bids_1 = np.zeros((len(traces), N_TURNS), dtype=np.int8)
+        bids_2 = np.zeros((len(traces), N_TURNS), dtype=np.int8)
+        winners = np.zeros(len(traces), dtype=np.int8)
+        for game, trace in enumerate(traces):
+            if len(trace.events) != N_TURNS:
+                raise Exception("Only finished games can be batched.")
+            prizes[game] = [event.prize for event in trace.events]
+            bids_1[game] = [event.bid_1 for event in trace.events]
+            bids_2[game] = [event.bid_2 for event in trace.events]
+            winners[game] = trace.game_winner
+        return cls(prizes, bids_1, bids_2, winners)
+
+    @classmethod
+    def concatenate(cls, batches: List["TraceBatch"]) -> "TraceBatch":
+        return cls(np.concatenate([batch.prizes for batch in batches]),
+                   np.concatenate([batch.bids_1 for batch in batches]),
+                   np.concatenate([batch.bids_2 for batch in batches]),
+                   np.concatenate([batch.winners for batch in batches]))
+
+    def game_trace(self, game: int) -> GameTrace:
+        # the game as a GameTrace, players 1 and 2 hold Hearts and Spades
+        trace = GameTrace()
+        hand_1 = bm.FULL_SUIT
+        hand_2 = bm.FULL_SUIT
+        pot_cards = 0
+        previous = 0
+        for turn in range(N_TURNS):
+            prize = int(self.prizes[game, turn])
+            bid_1 = int(self.bids_1[game, turn])
+            bid_2 = int(self.bids_2[game, turn])
+            pot_cards |= bm.nval_bit(prize)
+            trace.states.append(TurnState(hand_1, hand_2, int(self.scores_1[game, turn]),
+                                          int(self.scores_2[game, turn]), pot_cards, previous))
+            value = int(self.pots[game, turn])
+            trace.events.append(TurnEvent(prize, bid_1, bid_2, value if bid_1 > bid_2 else 0,
+                                          value if bid_2 > bid_1 else 0))
+
+            hand_1 = bm.remove_nval(hand_1, bid_1)
+            hand_2 = bm.remove_nval(hand_2, bid_2)
+            if bid_1 != bid_2:
+                previous |= pot_cards
+                pot_cards = 0
+        trace.turn = N_TURNS + 1
+        trace.update_winner(int(self.winners[game]))
+        return trace
+
+    def to_json(self, game: int) -> dict:
+        # same shape as GameTrace.to_json
+        return self.game_trace(game).to_json()
+
+    def iter_json(self, games: Union[range, List[int], None] = None) -> Iterator[dict]:
+        if games is None:
+            games = range(len(self))
+        for game in games:
+            yield self.to_json(game)
+
+    def save(self, filepath: str):
+        np.savez_compressed(filepath, prizes=self.prizes, bids_1=self.bids_1, bids_2=self.bids_2,
+                            winners=self.winners)
+
+    @classmethod
+    def load(cls, filepath: str) -> "TraceBatch":
+        with np.load(filepath) as data:
+            return cls(data["prizes"], data["bids_1"], data["bids_2"], data["winners"])
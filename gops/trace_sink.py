@@ -0,0 +1,117 @@
+import os
+import glob
+import json
+import queue
+import threading
+from typing import Iterator, List, Union
+
+from gops.game_traces import GameTrace
+
+_STOP = object()
+
+
+def shard_paths(directory: str, prefix: str = "traces") -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, prefix + "_*.jsonl")))
+
+
+class TraceSink():
+    # Appends one compact JSON line per game (the GameTrace.to_json dict) to
+    # shard files of at most max_shard_bytes. A writer thread drains a
+    # bounded queue, so the game loop only waits when the queue is full.
+    # Shards already in the directory are kept and new ones numbered after.
+    def __init__(self, directory: str, prefix: str = "traces", max_shard_bytes: int = 64 * 2**20,
+                 queue_size: int = 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.max_shard_bytes = max_shard_bytes
+        self.games = 0
+        self.error = None
+
+        existing = shard_paths(directory, prefix)
+        self.shard = 0
+        if len(existing) > 0:
+            self.shard = int(os.path.basename(existing[-1])[len(prefix) + 1:-len(".jsonl")]) + 1
+        self.outfile = None
+        self.shard_bytes = 0
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _open_shard(self):
+        if self.outfile is not None:
+            self.outfile.close()
+        path = os.path.join(self.directory, "{}_{:05d}.jsonl".format(self.prefix, self.shard))
+        self.outfile = open(path, "wb")
+        self.shard += 1
+        self.shard_bytes = 0
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    if self.outfile is not None:
+                        self.outfile.close()
+                        self.outfile = None
+                    return
+                if self.error is None:
+                    line = (json.dumps(item, separators=(",", ":")) + "\n").encode("utf-8")
+                    if (self.outfile is None) or \
+                            ((self.shard_bytes > 0) and (self.shard_bytes + len(line) > self.max_shard_bytes)):
+                        self._open_shard()
+                    self.outfile.write(line)
+                    self.shard_bytes += len(line)
+            except Exception as error:
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    def _check(self):
+        if self.error is not None:
+            raise Exception("Trace writer failed.") from self.error
+
+    def write(self, trace: Union[GameTrace, dict]):
+        self._check()
+        if not self.thread.is_alive():
+            raise Exception("Trace sink is closed.")
+        if isinstance(trace, GameTrace):
+            trace = trace.to_json()
+        self.queue.put(trace)
+        self.games += 1
+
+    def flush(self):
+        # waits until every queued game is on disk
+        self.queue.join()
+        if self.outfile is not None:
+            self.outfile.flush()
+        self._check()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+        self._check()
+
+    def __enter__(self) -> "TraceSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_trace_lines(directory: str, prefix: str = "traces") -> Iterator[str]:
+    # the unparsed JSON line of each game, for handing to other processes
+    for path in shard_paths(directory, prefix):
+        with open(path, "r", encoding="utf-8") as infile:
+            for line in infile:
+                if line.strip():
+                    yield line
+
+
+def read_traces(directory: str, prefix: str = "traces") -> Iterator[dict]:
+    # Streams the games back one at a time in the order written. As with
+    # save_game_trace, turn numbers come back as strings.
+    for line in read_trace_lines(directory, prefix):
+        yield json.loads(line)
@@ -0,0 +1,158 @@
+import sqlite3
+from typing import Iterable, List, Tuple, Union
+
+from gops.game_traces import GameTrace
+from gops.statements import state_to_statement, card_value_to_nval
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    winner INTEGER
+);
+CREATE TABLE IF NOT EXISTS turns (
+    game_id INTEGER NOT NULL,
+    turn INTEGER NOT NULL,
+    prize INTEGER NOT NULL,
+    bid_1 INTEGER NOT NULL,
+    bid_2 INTEGER NOT NULL,
+    PRIMARY KEY (game_id, turn)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS states (
+    id INTEGER PRIMARY KEY,
+    statement TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS moves (
+    game_id INTEGER NOT NULL,
+    turn INTEGER NOT NULL,
+    player INTEGER NOT NULL,
+    state_id INTEGER NOT NULL,
+    card INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS moves_state ON moves (state_id, card);
+CREATE INDEX IF NOT EXISTS turns_bids ON turns (turn, prize, bid_1, bid_2);
+"""
+
+PLAYER_MOVES = ["player_1_move", "player_2_move"]
+
+
+def _game_rows(json_trace: dict) -> Tuple[list, list]:
+    # (turn, prize, bid_1, bid_2) and (turn, player, statement, card) rows
+    turn_rows = []
+    move_rows = []
+    last_prizes = []
+    for turn in sorted(json_trace["turns"], key=int):
+        turn_data = json_trace["turns"][turn]
+        prizes = turn_data["player_1_move"]["pre_play_data"]["prize_values"]
+        # the flipped prize is the card that was not in the pot last turn
+        flipped = list(prizes)
+        for value in last_prizes:
+            if value in flipped:
+                flipped.remove(value)
+        if len(flipped) != 1:
+            raise Exception("Cannot tell which prize was flipped on turn {}.".format(turn))
+        bids = []
+        for player, move in enumerate(PLAYER_MOVES, 1):
+            played = turn_data[move]["post_play_data"].get("own_played_card")
+            if played is None:
+                raise Exception("Only played turns can be stored.")
+            bids.append(card_value_to_nval([played])[0])
+            move_rows.append((int(turn), player, state_to_statement(turn_data[move]), bids[-1]))
+        turn_rows.append((int(turn), card_value_to_nval(flipped)[0], bids[0], bids[1]))
+        last_prizes = prizes if bids[0] == bids[1] else []
+    return turn_rows, move_rows
+
+
+class TraceStore():
+    # Game traces in SQLite, one row per game, turn and move. States are kept
+    # once each as the state_to_statement string and moves are indexed by
+    # state, so per state queries are an index lookup.
+    def __init__(self, filepath: str):
+        self.connection = sqlite3.connect(filepath)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "TraceStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def ingest(self, games: Iterable[Union[GameTrace, dict]], batch_size: int = 1000) -> int:
+        # Loads games in transactions of batch_size games. Moves go through a
+        # staging table so each batch adds its new states and looks up their
+        # ids in two set based statements.
+        count = 0
+        batch = []
+        for game in games:
+            batch.append(game.to_json() if isinstance(game, GameTrace) else game)
+            if len(batch) == batch_size:
+                count += self._ingest_batch(batch)
+                batch = []
+        if len(batch) > 0:
+            count += self._ingest_batch(batch)
+        return count
+
+    def _ingest_batch(self, batch: List[dict]) -> int:
+        rows = [_game_rows(json_trace) for json_trace in batch]
+        with self.connection:
+            cursor = self.connection.cursor()
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS staging "
+                           "(game_id INTEGER, turn INTEGER, player INTEGER, statement TEXT, card INTEGER)")
+            cursor.execute("DELETE FROM staging")
+            first_id = cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM games").fetchone()[0]
+            cursor.executemany("INSERT INTO games (id, winner) VALUES (?, ?)",
+                               [(first_id + game, json_trace["winner"]) for game, json_trace in enumerate(batch)])
+            cursor.executemany("INSERT INTO turns VALUES (?, ?, ?, ?, ?)",
+                               [(first_id + game,) + row for game, (turn_rows, _) in enumerate(rows)
+                                for row in turn_rows])
+            cursor.executemany("INSERT INTO staging VALUES (?, ?, ?, ?, ?)",
+                               [(first_id + game,) + row for game, (_, move_rows) in enumerate(rows)
+                                for row in move_rows])
+            cursor.execute("INSERT OR IGNORE INTO states (statement) SELECT DISTINCT statement FROM staging")
+            cursor.execute("INSERT INTO moves SELECT staging.game_id, staging.turn, staging.player, states.id, "
+                           "staging.card FROM staging JOIN states ON states.statement = staging.statement")
+            cursor.execute("DELETE FROM staging")
+        return len(batch)
+
+    def moves_from_state(self, statement: str) -> List[Tuple[int, int]]:
+        # (card, times played) for every card played from the state, most played first
+        return self.connection.execute(
+            "SELECT moves.card, COUNT(*) AS n FROM moves JOIN states ON states.id = moves.state_id "
+            "WHERE states.statement = ? GROUP BY moves.card ORDER BY n DESC, moves.card", (statement,)).fetchall()
+
+    def win_rate(self, opening: List[Tuple[int, int, int]], player: int = 1) -> dict:
+        # Results for player in the games that began with the given turns,
+        # each a (prize, bid_1, bid_2) tuple of nvals.
+        if player not in [1, 2]:
+            raise Exception("Player must be 1 or 2.")
+        if len(opening) == 0:
+            query = "SELECT winner, COUNT(*) FROM games GROUP BY winner"
+            parameters = []
+        else:
+            matches = " INTERSECT ".join(["SELECT game_id FROM turns WHERE turn = ? AND prize = ? AND bid_1 = ? "
+                                          "AND bid_2 = ?"] * len(opening))
+            query = "SELECT winner, COUNT(*) FROM games WHERE id IN ({}) GROUP BY winner".format(matches)
+            parameters = [value for turn, moves in enumerate(opening, 1) for value in (turn,) + tuple(moves)]
+        counts = dict(self.connection.execute(query, parameters).fetchall())
+        games = sum(counts.values())
+        wins = counts.get(player, 0)
+        losses = counts.get(3 - player, 0)
+        return {"games": games, "wins": wins, "losses": losses, "draws": games - wins - losses,
+                "win_rate": wins / games if games > 0 else 0.0}
+
+    def most_frequent_moves(self) -> List[Tuple[str, str]]:
+        # (state, move) statements for the most played move from every state,
+        # keeping every move tied for the most as get_most_freq_move does
+        return self.connection.execute(
+            "WITH counts AS (SELECT state_id, card, COUNT(*) AS n FROM moves GROUP BY state_id, card), "
+            "best AS (SELECT state_id, MAX(n) AS n FROM counts GROUP BY state_id) "
+            "SELECT states.statement, 'played_card_' || counts.card FROM counts "
+            "JOIN best ON best.state_id = counts.state_id AND best.n = counts.n "
+            "JOIN states ON states.id = counts.state_id ORDER BY counts.state_id, counts.card").fetchall()
@@ -0,0 +1,137 @@
+from typing import Any, Union
+
+import numpy as np
+
+import gops.bitmask as bm
+from gops.engine import GameState
+
+ZOBRIST_SEED = 0x60B5
+
+# every pot and score diff a 13 card game can reach
+MAX_POINTS = bm.mask_sum(bm.FULL_SUIT)
+
+
+def _random_keys(rng, count: int) -> list:
+    return [int(x) for x in rng.integers(0, 2**64, size=count, dtype=np.uint64)]
+
+
+_rng = np.random.default_rng(ZOBRIST_SEED)
+# indexed by nval, index 0 is unused
+HAND_KEYS = (_random_keys(_rng, bm.SUIT_SIZE + 1), _random_keys(_rng, bm.SUIT_SIZE + 1))
+PRIZE_KEYS = _random_keys(_rng, bm.SUIT_SIZE + 1)
+POT_KEYS = _random_keys(_rng, MAX_POINTS + 1)
+# indexed by diff + MAX_POINTS
+DIFF_KEYS = _random_keys(_rng, 2 * MAX_POINTS + 1)
+
+
+# 64 bit keys for GOPS positions. A key covers both hands, the set of prizes
+# still to be won, the pot and the score diff, so positions reached by
+# different orders of play or with different absolute scores share a key.
+# Keys are the xor of one random number per feature and are updated as cards
+# are played instead of being recomputed.
+def hash_position(hand_1: int, hand_2: int, prizes: int, pot: int, diff: int) -> int:
+    key = POT_KEYS[pot] ^ DIFF_KEYS[diff + MAX_POINTS]
+    for nval in bm.mask_to_nvals(hand_1):
+        key ^= HAND_KEYS[0][nval]
+    for nval in bm.mask_to_nvals(hand_2):
+        key ^= HAND_KEYS[1][nval]
+    for nval in bm.mask_to_nvals(prizes):
+        key ^= PRIZE_KEYS[nval]
+    return key
+
+
+def hash_state(state: GameState) -> int:
+    # the prize being bid on counts as still to be won
+    return hash_position(state.hand_1, state.hand_2, bm.nvals_to_mask(state.prizes), state.pot,
+                         state.score_1 - state.score_2)
+
+
+def toggle_card(key: int, player: int, nval: int) -> int:
+    # player 1 or 2 plays (or takes back) a card
+    return key ^ HAND_KEYS[player - 1][nval]
+
+
+def toggle_prize(key: int, nval: int) -> int:
+    return key ^ PRIZE_KEYS[nval]
+
+
+def update_pot(key: int, old_pot: int, new_pot: int) -> int:
+    return key ^ POT_KEYS[old_pot] ^ POT_KEYS[new_pot]
+
+
+def update_diff(key: int, old_diff: int, new_diff: int) -> int:
+    return key ^ DIFF_KEYS[old_diff + MAX_POINTS] ^ DIFF_KEYS[new_diff + MAX_POINTS]
+
+
+def step_key(key: int, state: GameState, bid_1: int, bid_2: int) -> int:
+    # key of engine.step(state, bid_1, bid_2) from the key of state
+    prize = state.prizes[0]
+    value = state.pot + prize
+    diff = state.score_1 - state.score_2
+    key = toggle_card(toggle_card(key, 1, bid_1), 2, bid_2)
+    key = toggle_prize(key, prize)
+    if bid_1 > bid_2:
+        return update_diff(update_pot(key, state.pot, 0), diff, diff + value)
+    elif bid_2 > bid_1:
+        return update_diff(update_pot(key, state.pot, 0), diff, diff - value)
+    return update_pot(key, state.pot, value)
+
+
+class TranspositionTable():
+    # Fixed size table of key -> value. Each bucket has two slots: the first
+    # keeps the entry with the most depth (work to recompute, e.g. cards
+    # left) and the second always takes the newest entry, so deep results
+    # survive while recent shallow ones still get cached.
+    def __init__(self, size: int = 2**20):
+        if (size < 2) or (size & (size - 1)):
+            raise Exception("Table size must be a power of two.")
+        self.size = size
+        self.mask = (size // 2) - 1
+        self.keys = [None] * size
+        self.depths = [0] * size
+        self.values = [None] * size
+        self.hits = 0
+        self.misses = 0
+
+    def _slots(self, key: int) -> tuple:
+        deep = 2 * (key & self.mask)
+        return deep, deep + 1
+
+    def store(self, key: int, value: Any, depth: int = 0):
+        deep, recent = self._slots(key)
+        if (self.keys[deep] is None) or (self.keys[deep] == key) or (depth >= self.depths[deep]):
+            if (self.keys[deep] is not None) and (self.keys[deep] != key):
+                # the old deep entry moves down rather than being lost
+                self.keys[recent] = self.keys[deep]
+                self.depths[recent] = self.depths[deep]
+                self.values[recent] = self.values[deep]
+            elif self.keys[recent] == key:
+                self.keys[recent] = None
+            slot = deep
+        else:
+            slot = recent
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.values[slot] = value
+
+    def lookup(self, key: int) -> Union[Any, None]:
+        for slot in self._slots(key):
+            if self.keys[slot] == key:
+                self.hits += 1
+                return self.values[slot]
+        self.misses += 1
+        return None
+
+    def __contains__(self, key: int) -> bool:
+        deep, recent = self._slots(key)
+        return (self.keys[deep] == key) or (self.keys[recent] == key)
+
+    def __len__(self) -> int:
+        return self.size - self.keys.count(None)
+
+    def clear(self):
+        self.keys = [None] * self.size
+        self.depths = [0] * self.size
+        self.values = [None] * self.size
+        self.hits = 0
+        self.misses = 0
@@ -28,9 +28,13 @@ def random_decode(model, src, src_mask, max_len, start_symbol, DEVICE, EOS_IDX,
     return ys
 
 def translate_random(model: torch.nn.Module, src_sentence: str, text_transform, MOVE_LANGUAGE, STATE_LANGUAGE, BOS_IDX, DEVICE, EOS_IDX, topk):
+    src_ids = text_transform[STATE_LANGUAGE].encode(src_sentence).ids
+    return translate_ids(model, src_ids, text_transform, MOVE_LANGUAGE, BOS_IDX, DEVICE, EOS_IDX, topk)
+
+# same as translate_random for a state already turned into token ids, e.g. by gops.state_encoder
+def translate_ids(model: torch.nn.Module, src_ids, text_transform, MOVE_LANGUAGE, BOS_IDX, DEVICE, EOS_IDX, topk):
     model.eval()
-    src = text_transform[STATE_LANGUAGE].encode(src_sentence).ids
-    src = torch.tensor(src).view(-1, 1)
+    src = torch.tensor(src_ids).view(-1, 1)
 
     num_tokens = src.shape[0]
     src_mask = (torch.zeros(num_tokens, num_tokens)).type(torch.bool)
@@ -1,10 +1,145 @@
-def get_most_freq_move(data):
+import os
+import heapq
+import shutil
+import zlib
+import tempfile
 
-    dup_count_df = data.groupby(["State","Move"]).transform("size").rename("Dup_Count")
-    data = data.join(dup_count_df)
-    data = data.drop_duplicates()
+import pandas as pd
 
-    max_idx = data.groupby(["State"])["Dup_Count"].transform("max") == data["Dup_Count"]
-    data = data[max_idx]
-    data = data.drop(["Dup_Count"], axis=1)
-    return data
+
+# Counts (state, move) pairs in a dict and, when the dict grows past max_entries,
+# spills it to partition files split by a hash of the state. Every count for a
+# state ends up in one partition, so the most frequent moves can be found one
+# partition at a time with bounded memory, as can the unique pairs and their counts
+# for a deduplicated training set. States and moves cannot contain tabs.
+class MoveCounter():
+    def __init__(self, max_entries=1000000, partitions=64, spill_dir=None):
+        self.max_entries = max_entries
+        self.partitions = partitions
+        self.spill_dir = spill_dir
+        self.tmp_dir = None
+        # (state, move) -> [count, index of first occurrence]
+        self.counts = {}
+        self.seen = 0
+
+    def add(self, state, move):
+        entry = self.counts.get((state, move))
+        if entry is None:
+            self.counts[(state, move)] = [1, self.seen]
+            if len(self.counts) >= self.max_entries:
+                self.spill()
+        else:
+            entry[0] += 1
+        self.seen += 1
+
+    def add_many(self, pairs):
+        for state, move in pairs:
+            self.add(state, move)
+
+    def _partition_path(self, partition):
+        return os.path.join(self.tmp_dir, "partition_{:04d}.tsv".format(partition))
+
+    def spill(self):
+        if self.tmp_dir is None:
+            self.tmp_dir = tempfile.mkdtemp(prefix="move_counts_", dir=self.spill_dir)
+        lines = [[] for partition in range(self.partitions)]
+        for (state, move), (count, first) in self.counts.items():
+            partition = zlib.crc32(state.encode("utf-8")) % self.partitions
+            lines[partition].append("{}\t{}\t{}\t{}\n".format(first, count, state, move))
+        for partition in range(self.partitions):
+            if len(lines[partition]) > 0:
+                with open(self._partition_path(partition), "a", encoding="utf-8") as outfile:
+                    outfile.writelines(lines[partition])
+        self.counts = {}
+
+    def _read_partition(self, partition):
+        counts = {}
+        path = self._partition_path(partition)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as infile:
+                for line in infile:
+                    first, count, state, move = line.rstrip("\n").split("\t")
+                    entry = counts.get((state, move))
+                    if entry is None:
+                        counts[(state, move)] = [int(count), int(first)]
+                    else:
+                        entry[0] += int(count)
+                        entry[1] = min(entry[1], int(first))
+        return counts
+
+    @staticmethod
+    def _all(counts):
+        rows = [(first, count, state, move) for (state, move), (count, first) in counts.items()]
+        rows.sort()
+        return rows
+
+    @staticmethod
+    def _winners(counts):
+        # (first, count, state, move) for every move tied for the most plays of its state
+        best = {}
+        for (state, move), (count, first) in counts.items():
+            if count > best.get(state, 0):
+                best[state] = count
+        winners = [(first, count, state, move) for (state, move), (count, first) in counts.items()
+                   if count == best[state]]
+        winners.sort()
+        return winners
+
+    def _rows(self, select):
+        if self.tmp_dir is None:
+            yield from select(self.counts)
+            return
+
+        self.spill()
+        results = []
+        for partition in range(self.partitions):
+            rows = select(self._read_partition(partition))
+            path = os.path.join(self.tmp_dir, "result_{:04d}.tsv".format(partition))
+            with open(path, "w", encoding="utf-8") as outfile:
+                outfile.writelines("{}\t{}\t{}\t{}\n".format(*row) for row in rows)
+            results.append(path)
+
+        def read_result(path):
+            with open(path, "r", encoding="utf-8") as infile:
+                for line in infile:
+                    first, count, state, move = line.rstrip("\n").split("\t")
+                    yield int(first), int(count), state, move
+
+        # each result file is sorted by first occurrence, merging them keeps the input order
+        yield from heapq.merge(*[read_result(path) for path in results])
+
+    def most_frequent(self):
+        # yields (state, move, count) for the most frequent moves of each state,
+        # all of them when tied, in order of their first occurrence
+        for first, count, state, move in self._rows(self._winners):
+            yield state, move, count
+
+    def unique(self):
+        # yields (state, move, count) for every distinct pair in order of first occurrence
+        for first, count, state, move in self._rows(self._all):
+            yield state, move, count
+
+    def close(self):
+        if self.tmp_dir is not None:
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+            self.tmp_dir = None
+        self.counts = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# keeps every (State, Move) row tied for the most frequent move of its state, once,
+# at the position and index label of its first occurrence
+def get_most_freq_move(data, max_entries=1000000):
+
+    with MoveCounter(max_entries) as counter:
+        counter.add_many(zip(data["State"], data["Move"]))
+        rows = list(counter._rows(counter._winners))
+
+    firsts = [row[0] for row in rows]
+    return pd.DataFrame({"State": [row[2] for row in rows], "Move": [row[3] for row in rows]},
+                        index=data.index[firsts])
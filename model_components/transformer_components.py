@@ -5,7 +5,7 @@ import torch
 import torch.nn as nn
 from torch.nn import Transformer
 from torch import Tensor
-from torch.utils.data import DataLoader
+from torch.utils.data import DataLoader, WeightedRandomSampler
 
 #########################################################################################################
 # Classes
@@ -64,12 +64,23 @@ class Seq2SeqTransformer(nn.Module):
 
 class DataLoaderWrapper(DataLoader):
 
-    def __init__(self, train_iter, BATCH_SIZE, text_transform, STATE_LANGUAGE, MOVE_LANGUAGE, DEVICE):
+    # train_iter can be a list of (state, move) pairs or a map-style dataset such as
+    # gops.dataset_archive.DatasetArchive, optionally read in the order given by sampler.
+    # For a deduplicated set, weights holds each pair's occurrence count and batches are
+    # drawn in proportion to them, num_samples pairs per pass (one per unique pair by default).
+    def __init__(self, train_iter, BATCH_SIZE, text_transform, STATE_LANGUAGE, MOVE_LANGUAGE, DEVICE, sampler=None,
+                 weights=None, num_samples=None):
         self.STATE_LANGUAGE = STATE_LANGUAGE
         self.MOVE_LANGUAGE = MOVE_LANGUAGE
         self.text_transform = text_transform
         self.DEVICE = DEVICE
-        super().__init__(train_iter, batch_size=BATCH_SIZE, collate_fn=self.collate_fn)
+        if weights is not None:
+            if sampler is not None:
+                raise Exception("Give either a sampler or weights, not both.")
+            if num_samples is None:
+                num_samples = len(weights)
+            sampler = WeightedRandomSampler(torch.as_tensor(np.asarray(weights), dtype=torch.double), num_samples)
+        super().__init__(train_iter, batch_size=BATCH_SIZE, collate_fn=self.collate_fn, sampler=sampler)
 
     # converts batched state, move pairs to two inline tensors
     def collate_fn(self, batch):
@@ -118,12 +129,16 @@ def create_mask(src, tgt, DEVICE):
     src_mask = torch.zeros((src_seq_len, src_seq_len),device=DEVICE).type(torch.bool)
     return src_mask, tgt_mask
 
-def train_epoch(model, optimizer, loss_fn, train_iter, BATCH_SIZE, text_transform, STATE_LANGUAGE, MOVE_LANGUAGE, DEVICE):
+# weights and num_samples train on a deduplicated set, see DataLoaderWrapper
+def train_epoch(model, optimizer, loss_fn, train_iter, BATCH_SIZE, text_transform, STATE_LANGUAGE, MOVE_LANGUAGE, DEVICE,
+                weights=None, num_samples=None):
 
     model.train()
 
     losses = 0
-    train_dataloader = DataLoaderWrapper(train_iter, BATCH_SIZE, text_transform, STATE_LANGUAGE, MOVE_LANGUAGE, DEVICE)
+    train_dataloader = DataLoaderWrapper(train_iter, BATCH_SIZE, text_transform, STATE_LANGUAGE, MOVE_LANGUAGE, DEVICE,
+                                         weights=weights, num_samples=num_samples)
+    n_batches = 0
 
     for src, tgt in train_dataloader:
         tgt_input = tgt[:-1, :]
@@ -137,8 +152,9 @@ def train_epoch(model, optimizer, loss_fn, train_iter, BATCH_SIZE, text_transfor
 
         optimizer.step()
         losses += loss.item()
+        n_batches += 1
 
-    return losses / len(list(train_dataloader))
+    return losses / n_batches
 
 def evaluate(model, loss_fn, val_iter, BATCH_SIZE, DEVICE, text_transform, STATE_LANGUAGE, MOVE_LANGUAGE):
     model.eval().to(DEVICE)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import gops.engine as engine
+from gops.cards import BitmaskHand, Card
+from gops.batch_simulate import simulate_batch, simulate_batches, strategy_1_bids
+
+
+def play_scalar(prize_order):
+    # player 1 plays strategy 5 and player 2 strategy 2, both deterministic, so
+    # the object version gives the same game
+    state = engine.new_state(list(prize_order))
+    hand_1 = BitmaskHand("Hearts")
+    hand_2 = BitmaskHand("Spades")
+    bids_1 = []
+    for prize in prize_order:
+        bid_1 = hand_1.select_card_strategy_2(engine.prize_value(state)).nval
+        bid_2 = hand_2.select_prize_card_strategy(Card("Clubs", int(prize))).nval
+        state = engine.step(state, bid_1, bid_2)
+        bids_1.append(bid_1)
+    return bids_1, state
+
+
+def test_simulate_batch():
+    result = simulate_batch(200, 1, 3, seed=3)
+    assert result.n_games() == 200
+
+    # every game plays each card once
+    for bids in [result.bids_1, result.bids_2, result.prize_orders]:
+        assert (np.sort(bids, axis=1) == np.arange(1, 14)).all()
+    assert ((result.scores_1 + result.scores_2) <= 91).all()
+
+    summary = result.to_simulation_result()
+    assert summary.games == 200
+    assert summary.p1_wins == np.sum(result.scores_1 > result.scores_2)
+
+    repeat = simulate_batch(200, 1, 3, seed=3)
+    assert (repeat.bids_1 == result.bids_1).all()
+
+    with pytest.raises(Exception):
+        simulate_batch(1, 4, 1)
+
+
+def test_simulate_batch_matches_scalar():
+    result = simulate_batch(100, 5, 2, seed=11)
+    for game in range(result.n_games()):
+        bids_1, state = play_scalar(result.prize_orders[game])
+        assert bids_1 == list(result.bids_1[game])
+        assert state.score_1 == result.scores_1[game]
+        assert state.score_2 == result.scores_2[game]
+
+
+def test_strategy_1_bids():
+    # first bid frequencies match Hand.select_card_strategy_1
+    n_games = 4000
+    rng = np.random.default_rng(5)
+    for prize_value in [3, 8, 13, 20]:
+        hands = np.ones((n_games, 13), dtype=bool)
+        hands[:, 6] = False
+        prize_values = np.full(n_games, prize_value)
+        bids = strategy_1_bids(hands, prize_values, prize_values, rng)
+        batch_freq = np.bincount(bids, minlength=14) / n_games
+
+        scalar_bids = []
+        for x in range(n_games):
+            hand = BitmaskHand("Hearts")
+            hand.find_card(Card("Hearts", 7))
+            scalar_bids.append(hand.select_card_strategy_1(prize_value).nval)
+        scalar_freq = np.bincount(scalar_bids, minlength=14) / n_games
+
+        assert batch_freq[7] == 0
+        assert np.abs(batch_freq - scalar_freq).max() < 0.05
+
+
+def test_simulate_batches():
+    result = simulate_batches(2500, 3, 5, seed=1, batch_size=1000)
+    assert result.games == 2500
+    assert result.p1_wins + result.p2_wins + result.draws == 2500
@@ -1,9 +1,13 @@
 import copy
+import pickle
+import pytest
+import random
 import numpy as np
 from collections import defaultdict
 
 from gops.util import get_path_names
-from gops.cards import Card, CardStack, SuitCards, Hand
+import gops.cards as cards
+from gops.cards import Card, CardStack, SuitCards, Hand, BitmaskHand
 
 CLOSE = 0.00001
 
@@ -22,13 +26,26 @@ def test_Card():
     assert card_1.suit() == "Clubs"
     assert card_1.nval == 1
 
-    card_1.ace = "high"
-    assert card_1.get_num_value() == 14
-
-    card_1._val = None
-    assert card_1.get_num_value() is None
+    assert card_1.get_num_value() == 1
+    assert Card("Clubs", "X").get_num_value() is None
     card_1.display()
 
+    # one shared, immutable instance per card
+    assert Card("Clubs", "A") is card_1
+    assert Card("Clubs", np.int64(5)) is Card("Clubs", 5)
+    assert Card("Clubs", np.int64(5)).nval == 5
+    assert Card("Spades", "A") is not card_1
+    assert copy.copy(card_1) is card_1
+    assert copy.deepcopy([card_1])[0] is card_1
+    assert pickle.loads(pickle.dumps(card_1)) is card_1
+    with pytest.raises(Exception):
+        card_1.ace = "high"
+    with pytest.raises(Exception):
+        card_1._val = None
+    with pytest.raises(Exception):
+        del card_1.nval
+    assert not hasattr(card_1, "__dict__")
+
 
 def test_CardStack():
     cards = [Card("Clubs", "A"), Card("Clubs", 2), Card("Clubs", 3), Card("Clubs", 4), Card("Clubs", 5)]
@@ -230,3 +247,72 @@ def test_Hand_select_transformer_model():
     r1 = tmp_hand.select_transformer_model(move_data, app_paths, topk, run_device, tokenizer)
     assert isinstance(r1, Card)
 
+
+def test_load_transformer_model(mocker):
+    # every hand in the process shares one copy of the model and tokenizers
+    mocker.patch.dict(cards._TRANSFORMER_MODELS, clear=True)
+    load = mocker.patch("gops.cards.torch.load", return_value=object())
+    app_paths = get_path_names(7, 45, "xpu", "HF")
+    model = cards.load_transformer_model(app_paths["model_path"], "cpu")
+    assert cards.load_transformer_model(app_paths["model_path"], "cpu") is model
+    assert load.call_count == 1
+    assert cards.load_tokenizer(app_paths["state_tokenizer_path"]) is \
+        cards.load_tokenizer(app_paths["state_tokenizer_path"])
+
+
+def test_BitmaskHand():
+    hand = BitmaskHand("Clubs")
+    list_hand = Hand("Clubs")
+
+    assert hand.card_count() == 13
+    assert hand.get_card_nvals() == list_hand.get_card_nvals()
+    assert hand.max_value() == 13
+    assert hand.card_in_stack("Clubs", 4) == list_hand.card_in_stack("Clubs", 4)
+    assert hand.card_in_stack("Spades", 4) == (False, -1)
+
+    card = hand.select_card("Clubs", "Q")
+    assert card.value() == "Q"
+    assert card.suit() == "Clubs"
+    assert hand.card_in_stack("Clubs", "Q") == (False, -1)
+    assert hand.card_in_stack("Clubs", "K") == (True, 11)
+    assert hand.select_card("Clubs", "Q") is None
+
+    assert hand.find_card(Card("Hearts", "K")).nval == 13
+    assert hand.max_value() == 11
+    assert hand.draw().value() == "A"
+    assert hand.card_count() == 10
+    assert [card.nval for card in hand._order] == hand.get_card_nvals()
+
+    while not hand.empty():
+        hand.select_random_card()
+    assert hand.mask == 0
+    assert hand.max_value() == -1
+
+
+def test_BitmaskHand_strategies():
+    hand = BitmaskHand("Diamonds")
+
+    assert hand.select_prize_card_strategy(Card("Hearts", 7)).value() == 7
+    assert hand.select_prize_card_strategy(Card("Hearts", 7)) is None
+    assert hand.select_prize_card_strategy(Card("Clubs", 100)) is None
+
+    # strategy 1 and 2 consume the same random numbers as Hand
+    for prize_value in [3, 9, 15]:
+        bit_hand = BitmaskHand("Diamonds")
+        list_hand = Hand("Diamonds")
+        for x in range(13):
+            random.seed(x)
+            bit_card = bit_hand.select_card_strategy_1(prize_value)
+            random.seed(x)
+            list_card = list_hand.select_card_strategy_1(prize_value)
+            assert bit_card.nval == list_card.nval
+
+    bit_hand = BitmaskHand("Diamonds")
+    list_hand = Hand("Diamonds")
+    for prize_value in [13, 1, 7, 20, 5, 2, 9, 11, 4, 8, 6, 10, 3]:
+        random.seed(prize_value)
+        bit_card = bit_hand.select_card_strategy_2(prize_value)
+        random.seed(prize_value)
+        list_card = list_hand.select_card_strategy_2(prize_value)
+        assert bit_card.nval == list_card.nval
+    assert bit_hand.empty()
@@ -0,0 +1,83 @@
+import sys
+
+import pytest
+
+import gops.bitmask as bm
+from gops.cfr import CFRTrainer, PolicyTable, load_policy, main
+from gops.exploitability import best_response_value, random_policy
+from gops.game import AIAIGame
+from gops.simulate import simulate
+
+transformer_params = {"epochs": 7,
+                      "version": 45,
+                      "topk": 1,
+                      "run_device": "cpu",
+                      "train_device": "xpu",
+                      "tokenizer": "HF",
+                      "nproc": 12}
+
+
+def test_CFRTrainer(tmp_path):
+    checkpoint = str(tmp_path / "cfr.pkl")
+    reports = []
+    trainer = CFRTrainer(4, seed=0)
+    trainer.train(400, workers=2, report_every=200, checkpoint_path=checkpoint,
+                  on_report=lambda *report: reports.append(report))
+    assert trainer.iteration == 400
+    assert [report[0] for report in reports] == [200, 400]
+    assert reports[-1][2] < best_response_value(random_policy, 4, "win")
+    assert reports[-1][2] < 0.25
+
+    resumed = CFRTrainer.load_checkpoint(checkpoint)
+    assert resumed.iteration == 400
+    assert resumed.history == trainer.history
+    assert resumed.average_policy() == trainer.average_policy()
+    resumed.train(100, workers=2)
+    assert resumed.iteration == 500
+    assert len(resumed.history) == 3
+
+    policy_path = str(tmp_path / "policy.npz")
+    trainer.export_policy(policy_path)
+    table = PolicyTable(policy_path)
+    assert table.n_cards == 4
+    assert len(table) > 0
+
+    full = bm.full_mask(4)
+    strategy = table.strategy(full, full, bm.remove_nval(full, 4), 4, 0)
+    assert len(strategy) == 4
+    assert sum(strategy) == pytest.approx(1, abs=1e-5)
+    assert strategy == pytest.approx(trainer.average_policy()[(full, full, bm.remove_nval(full, 4), 4, 0)], abs=1e-6)
+    assert bm.in_mask(full, table.select_bid(full, full, bm.remove_nval(full, 4), 4, 0))
+    assert table.strategy(0b1, 0b10, 0, 3, 0) == (1.0,)
+    assert table.strategy(full, full, 0, 90, 0) is None
+    assert table.select_bid(full, full, 0, 90, 0) is None
+
+
+
+def test_main_resume(tmp_path, monkeypatch):
+    checkpoint = str(tmp_path / "cfr.pkl")
+    CFRTrainer(3, seed=1).save_checkpoint(checkpoint)
+    for args in [["--resume"], ["--resume", "--checkpoint", checkpoint, "--cards", "4"],
+                 ["--resume", "--checkpoint", checkpoint, "--seed", "2"]]:
+        monkeypatch.setattr(sys, "argv", ["cfr.py", "--iterations", "0"] + args)
+        with pytest.raises(SystemExit):
+            main()
+
+
+def test_AIAIGame_cfr(tmp_path):
+    # no silent strategy 1 stand in without a policy
+    with pytest.raises(Exception):
+        AIAIGame(transformer_params, 9, 3)
+    with pytest.raises(Exception):
+        simulate(1, 9, 3, transformer_params=transformer_params)
+
+    policy_path = str(tmp_path / "policy.npz")
+    trainer = CFRTrainer(3, seed=0)
+    trainer.train(50, workers=1)
+    trainer.export_policy(policy_path)
+    assert load_policy(policy_path) is load_policy(policy_path)
+
+    game = AIAIGame(dict(transformer_params, cfr_policy=policy_path), 9, 3)
+    assert game.game_trace is not None
+    assert game.run_game() in [0, 1, 2]
+    assert game.player_1._hand.empty()
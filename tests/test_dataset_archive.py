@@ -0,0 +1,135 @@
+import os
+
+import pytest
+from tokenizers import Tokenizer
+
+from gops.batch_simulate import simulate_batch
+from gops.trace_batch import TraceBatch
+from gops.statements import move_to_statement
+from gops.util import get_path_names
+from gops.dataset_archive import ArchiveWriter, DatasetArchive, write_archive, shard_path, counts_path
+import torch
+
+from model_components.transformer_components import DataLoaderWrapper, construct_text_transform, Seq2SeqTransformer, \
+    train_epoch
+from model_components.training_components import MoveCounter
+
+
+def sample_pairs(n_games):
+    batch = TraceBatch.from_batch_result(simulate_batch(n_games, 1, 3, seed=8))
+    pairs = []
+    for trace in batch.iter_json():
+        for turn in trace["turns"].values():
+            for move in ["player_1_move", "player_2_move"]:
+                sample = move_to_statement(turn[move])
+                pairs.append((sample["state"], sample["move"]))
+    return pairs
+
+
+def test_DatasetArchive(tmp_path):
+    pairs = sample_pairs(40)
+    index_path = str(tmp_path / "train_data_test.npy")
+    write_archive(index_path, pairs, block_size=100, shard_bytes=2000)
+    assert os.path.exists(shard_path(index_path, 1))
+
+    archive = DatasetArchive(index_path, cache_blocks=3)
+    assert len(archive) == len(pairs)
+    for sample in [0, 99, 100, 555, len(pairs) - 1, -1]:
+        assert archive[sample] == pairs[sample]
+    assert len(archive.cache) <= 3
+    with pytest.raises(IndexError):
+        archive[len(pairs)]
+
+    order = archive.shuffled_order(seed=1)
+    assert sorted(order) == list(range(len(pairs)))
+    assert order != list(range(len(pairs)))
+    assert order == archive.shuffled_order(seed=1)
+
+    batches = list(archive.minibatches(64, seed=2))
+    assert sum(len(batch) for batch in batches) == len(pairs)
+    assert sorted(sum(batches, [])) == sorted(pairs)
+
+    lzma_path = str(tmp_path / "train_data_lzma.npy")
+    with ArchiveWriter(lzma_path, block_size=64, codec="lzma") as writer:
+        writer.add_many(pairs[:200])
+    assert DatasetArchive(lzma_path)[150] == pairs[150]
+
+    assert archive.counts is None
+
+    with pytest.raises(Exception):
+        ArchiveWriter(lzma_path, codec="bz2")
+    with pytest.raises(Exception):
+        writer.add("state", "move")
+    with pytest.raises(Exception):
+        ArchiveWriter(str(tmp_path / "bad.npy")).add("a\tb", "c")
+
+
+def test_DatasetArchive_no_extension(tmp_path):
+    pairs = sample_pairs(1)
+    index_path = str(tmp_path / "train_data_test")
+    write_archive(index_path, pairs, block_size=8)
+    assert os.path.exists(index_path + ".npy")
+    assert DatasetArchive(index_path)[11] == pairs[11]
+    assert DatasetArchive(index_path + ".npy")[11] == pairs[11]
+
+
+def test_DatasetArchive_DataLoaderWrapper(tmp_path):
+    index_path = str(tmp_path / "train_data_test.npy")
+    pairs = sample_pairs(2)
+    write_archive(index_path, pairs, block_size=16)
+
+    app_paths = get_path_names(7, 45, "xpu", "HF")
+    text_transform = construct_text_transform(Tokenizer.from_file(app_paths["state_tokenizer_path"]),
+                                              Tokenizer.from_file(app_paths["move_tokenizer_path"]),
+                                              "state", "move")
+    loader = DataLoaderWrapper(DatasetArchive(index_path), 8, text_transform, "state", "move", "cpu")
+    state_batch, move_batch = next(iter(loader))
+    assert state_batch.shape[1] == 8
+    assert move_batch.shape == (3, 8)
+    assert len(list(loader)) == 7
+
+    archive = DatasetArchive(index_path, cache_blocks=2)
+    loader = DataLoaderWrapper(archive, 8, text_transform, "state", "move", "cpu",
+                               sampler=archive.shuffled_order(seed=3))
+    assert sum(move_batch.shape[1] for state_batch, move_batch in loader) == len(pairs)
+
+
+def test_DatasetArchive_weighted(tmp_path):
+    pairs = sample_pairs(20)
+    index_path = str(tmp_path / "train_data_unique.npy")
+    with MoveCounter() as counter:
+        counter.add_many(pairs)
+        unique = list(counter.unique())
+    write_archive(index_path, unique, block_size=32)
+    assert len(unique) < len(pairs)
+
+    archive = DatasetArchive(index_path)
+    assert len(archive) == len(unique)
+    assert archive.counts.sum() == len(pairs)
+    assert archive[3] == unique[3][:2]
+    assert archive.counts[3] == unique[3][2]
+
+    # rewriting without counts drops the stale counts file
+    write_archive(index_path, pairs[:10])
+    assert not os.path.exists(counts_path(index_path))
+
+    write_archive(index_path, unique, block_size=32)
+    archive = DatasetArchive(index_path)
+    app_paths = get_path_names(7, 45, "xpu", "HF")
+    state_tokenizer = Tokenizer.from_file(app_paths["state_tokenizer_path"])
+    move_tokenizer = Tokenizer.from_file(app_paths["move_tokenizer_path"])
+    text_transform = construct_text_transform(state_tokenizer, move_tokenizer, "state", "move")
+
+    loader = DataLoaderWrapper(archive, 16, text_transform, "state", "move", "cpu", weights=archive.counts,
+                               num_samples=64)
+    assert sum(move_batch.shape[1] for state_batch, move_batch in loader) == 64
+    with pytest.raises(Exception):
+        DataLoaderWrapper(archive, 16, text_transform, "state", "move", "cpu", sampler=[0], weights=archive.counts)
+
+    torch.manual_seed(0)
+    model = Seq2SeqTransformer(1, 1, 16, 2, state_tokenizer.get_vocab_size(), move_tokenizer.get_vocab_size(),
+                               dim_feedforward=32)
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+    loss = train_epoch(model, optimizer, torch.nn.CrossEntropyLoss(), archive, 16, text_transform, "state", "move",
+                       "cpu", weights=archive.counts, num_samples=48)
+    assert loss > 0
@@ -0,0 +1,71 @@
+import time
+import socket
+import multiprocessing
+
+from gops.distributed import Coordinator, run_worker, send_message, recv_message
+from gops.simulate import simulate
+
+
+def take_shard(address):
+    sock = socket.create_connection(address)
+    send_message(sock, {"type": "request"})
+    shard = recv_message(sock)
+    assert shard["type"] == "shard"
+    return sock, shard
+
+
+def test_Coordinator():
+    coordinator = Coordinator(1, 3, 230, seed=10, shard_size=50)
+    coordinator.start()
+    address = coordinator.address()
+
+    # a worker that dies mid shard and one that hangs
+    sock, dead_shard = take_shard(address)
+    sock.close()
+    hung_sock, hung_shard = take_shard(address)
+    coordinator.shard_timeout = 0.5
+
+    workers = [multiprocessing.Process(target=run_worker, args=address) for x in range(2)]
+    for worker in workers:
+        worker.start()
+    result = coordinator.run(timeout=60)
+    for worker in workers:
+        worker.join(10)
+    hung_sock.close()
+
+    assert result.games == 230
+    assert result.p1_wins + result.p2_wins + result.draws == 230
+    assert coordinator.abandoned >= 2
+    assert len(coordinator.completed) == 5
+
+    # shards are seeded from the seed range, so the result is repeatable
+    assert dead_shard["seed"] == 10 + dead_shard["shard_id"]
+    total_wins = 0
+    for shard in coordinator.shards.values():
+        total_wins += simulate(shard["games"], 1, 3, seed=shard["seed"]).p1_wins
+    assert total_wins == result.p1_wins
+
+
+def test_run_worker_done():
+    coordinator = Coordinator(2, 2, 20, shard_size=10)
+    coordinator.start()
+    assert run_worker(*coordinator.address()) == 2
+    result = coordinator.run(timeout=10)
+    assert result.draws == 20
+
+
+def test_Coordinator_late_abandon():
+    coordinator = Coordinator(1, 3, 10, shard_size=10, shard_timeout=0.05)
+    first, second = object(), object()
+    shard = coordinator.assign_shard(first)
+    time.sleep(0.1)
+    # timed out and handed to the second worker, then the first one hangs up
+    assert coordinator.assign_shard(second) == shard
+    coordinator.abandon_shard(shard["shard_id"], first)
+    assert len(coordinator.pending) == 0
+    assert coordinator.abandoned == 1
+    assert coordinator.assign_shard(object())["type"] == "wait"
+
+    coordinator.complete_shard(shard["shard_id"], simulate(10, 1, 3).to_dict())
+    assert coordinator.result.games == 10
+    coordinator.server.server_close()
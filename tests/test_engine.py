@@ -0,0 +1,105 @@
+import random
+import pytest
+
+import gops.engine as engine
+import gops.bitmask as bm
+from gops.engine import GameState
+from gops.game import Player, PlayArea
+from gops.cards import Card, Hand
+
+
+def test_new_state():
+    state = engine.new_state([3, 1, 2], n_cards=3)
+    assert state == GameState(0b111, 0b111, (3, 1, 2), 0, 0, 0)
+    assert engine.current_prize(state) == 3
+    assert engine.legal_bids(state.hand_1) == (1, 2, 3)
+    assert not engine.is_terminal(state)
+    assert engine.winner(state) is None
+
+    with pytest.raises(Exception):
+        engine.new_state([1, 1, 2], n_cards=3)
+
+    state = engine.random_state()
+    assert sorted(state.prizes) == list(range(1, 14))
+
+
+def test_step():
+    state = engine.new_state([3, 1, 2], n_cards=3)
+
+    # tie carries the prize over
+    tied = engine.step(state, 2, 2)
+    assert tied.pot == 3
+    assert tied.score_1 == 0
+    assert tied.score_2 == 0
+    assert engine.prize_value(tied) == 4
+    assert tied.hand_1 == 0b101
+
+    # the original state is untouched
+    assert state.hand_1 == 0b111
+    assert state.pot == 0
+
+    won = engine.step(tied, 1, 3)
+    assert won.pot == 0
+    assert won.score_2 == 4
+
+    # a tie on the last card awards nothing
+    end = engine.step(won, 3, 1)
+    assert end.score_1 == 2
+    assert engine.is_terminal(end)
+    assert engine.winner(end) == 2
+    assert engine.score_diff(end) == -2
+
+    with pytest.raises(Exception):
+        engine.step(end, 1, 1)
+    with pytest.raises(Exception):
+        engine.step(tied, 2, 1)
+
+
+def test_step_matches_PlayArea():
+    for game in range(50):
+        state = engine.random_state()
+        player_1 = Player(Hand("Hearts"))
+        player_2 = Player(Hand("Spades"))
+        play_area = PlayArea()
+
+        for prize in state.prizes:
+            bid_1 = random.choice(engine.legal_bids(state.hand_1))
+            bid_2 = random.choice(engine.legal_bids(state.hand_2))
+            state = engine.step(state, bid_1, bid_2)
+
+            play_area.flip_prize(Card("Clubs", prize))
+            play_area.flip_cards(Card("Hearts", bid_1), Card("Spades", bid_2))
+            play_area.award_points(player_1, player_2)
+
+        assert state.score_1 == player_1.score()
+        assert state.score_2 == player_2.score()
+
+
+def test_decision_from_move_data():
+    move_data = {'pre_play_data': {'own_score': '12',
+                                   'own_hand': ['10', '2', '3', 'A'],
+                                   'opponent_score': '20',
+                                   'opponent_hand': ['4', '5', '9', 'K'],
+                                   'prize_values': ['7', 'Q'],
+                                   'previous_prize_values': ['10', '2', '3', '4', '5', '8', 'J']},
+                 'post_play_data': {}}
+    own, opp, prizes, pot, diff = engine.decision_from_move_data(move_data)
+    assert own == 0b1000000111
+    assert opp == 0b1000100011000
+    assert prizes == 0b1000100100001
+    assert pot == 19
+    assert diff == -8
+
+
+def test_move_data_from_position():
+    own = bm.nvals_to_mask([1, 2, 3, 10])
+    opp = bm.nvals_to_mask([4, 5, 9, 13])
+    pot_cards = bm.nvals_to_mask([7, 12])
+    prizes = bm.nvals_to_mask([1, 6])
+    move_data = engine.move_data_from_position(own, opp, prizes, pot_cards, -9)
+    pre_play = move_data["pre_play_data"]
+    assert pre_play["own_hand"] == ['10', '2', '3', 'A']
+    assert pre_play["prize_values"] == ['7', 'Q']
+    assert pre_play["previous_prize_values"] == ['10', '2', '3', '4', '5', '8', '9', 'J', 'K']
+    assert int(pre_play["own_score"]) + int(pre_play["opponent_score"]) == 91 - 1 - 6 - 7 - 12
+    assert engine.decision_from_move_data(move_data) == (own, opp, prizes, 19, -9)
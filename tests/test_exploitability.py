@@ -0,0 +1,82 @@
+import random
+import pytest
+
+import gops.bitmask as bm
+from gops.cards import BitmaskHand, Card
+from gops.solver import GopsSolver
+from gops.exploitability import (BestResponse, TransformerPolicy, best_response_value, policy_for_difficulty,
+                                 random_policy, prize_card_policy, strategy_1_policy, strategy_2_policy)
+
+transformer_params = {"epochs": 7,
+                      "version": 45,
+                      "topk": 1,
+                      "run_device": "cpu",
+                      "train_device": "xpu",
+                      "tokenizer": "HF",
+                      "nproc": 12}
+
+
+def test_best_response_value():
+    solver = GopsSolver()
+
+    def equilibrium(own_hand, opp_hand, prizes, pot_cards, prize, diff):
+        return solver.node(own_hand, opp_hand, prizes, bm.mask_sum(pot_cards), diff).strategy_1
+
+    assert best_response_value(equilibrium, 4, "win") == pytest.approx(0, abs=1e-9)
+    assert best_response_value(random_policy, 4, "win") > 0.3
+    assert best_response_value(random_policy, 4, "points") > 1
+
+    # playing the prize card is beaten by one more, except against the ace
+    assert best_response_value(prize_card_policy, 4, "win") == pytest.approx(1)
+
+    points = best_response_value(strategy_1_policy, 5)
+    assert points > 0
+    assert best_response_value(strategy_1_policy, 5, workers=2) == pytest.approx(points)
+
+    with pytest.raises(Exception):
+        BestResponse(random_policy, 4, "bad")
+
+
+def test_policies():
+    own = bm.nvals_to_mask([2, 5, 9, 13])
+    pot_cards = bm.nvals_to_mask([4, 8])
+    assert random_policy(own, own, 0, pot_cards, 8, 0) == (0.25,) * 4
+    assert prize_card_policy(own, own, 0, pot_cards, 9, 0) == (0, 0, 1, 0)
+
+    hand = BitmaskHand("Hearts")
+    hand.mask = own
+    card = hand.select_card_strategy_2(12)
+    assert strategy_2_policy(own, own, 0, pot_cards, 8, 0) == tuple(float(nval == card.nval)
+                                                                    for nval in bm.mask_to_nvals(own))
+
+    # matches the frequencies of the real strategy
+    probs = strategy_1_policy(own, own, 0, pot_cards, 8, 0)
+    assert sum(probs) == pytest.approx(1)
+    random.seed(0)
+    counts = dict.fromkeys(bm.mask_to_nvals(own), 0)
+    for x in range(4000):
+        hand.mask = own
+        counts[hand.select_card_strategy_1(12).nval] += 1
+    for prob, count in zip(probs, counts.values()):
+        assert count / 4000 == pytest.approx(prob, abs=0.03)
+
+    assert policy_for_difficulty(3) is strategy_1_policy
+    with pytest.raises(Exception):
+        policy_for_difficulty(4)
+    with pytest.raises(Exception):
+        policy_for_difficulty(6)
+
+
+def test_TransformerPolicy(mocker):
+    select = mocker.patch.object(BitmaskHand, "select_transformer_model", return_value=Card("Hearts", 5))
+    policy = policy_for_difficulty(4, transformer_params)
+    assert isinstance(policy, TransformerPolicy)
+
+    own = bm.nvals_to_mask([2, 5, 9, 13])
+    opp = bm.nvals_to_mask([1, 3, 9, 12])
+    assert policy(own, opp, bm.nvals_to_mask([1, 2]), bm.nvals_to_mask([4, 8]), 8, 4) == (0, 1, 0, 0)
+
+    move_data = select.call_args[0][0]
+    assert move_data["pre_play_data"]["own_hand"] == ['2', '5', '9', 'K']
+    assert move_data["pre_play_data"]["prize_values"] == ['4', '8']
+    assert int(move_data["pre_play_data"]["own_score"]) - int(move_data["pre_play_data"]["opponent_score"]) == 4
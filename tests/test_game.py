@@ -1,7 +1,7 @@
 import io
 
-from gops.game import Player, AIPlayer, HumanPlayer, PlayArea, GameBase, AIHumanGame
-from gops.cards import Card, SuitCards, Hand
+from gops.game import Player, AIPlayer, HumanPlayer, PlayArea, GameBase, AIHumanGame, AIAIGame
+from gops.cards import Card, SuitCards, Hand, BitmaskHand
 
 transformer_params = {"epochs": 5,
                     "version": 35,
@@ -34,6 +34,16 @@ def test_AIPlayer():
     assert isinstance(card, Card)
     assert card.suit() == "Hearts"
 
+    # players run unchanged on a bitmask hand
+    hand = BitmaskHand("Hearts")
+    prize_card = Card("Clubs", 5)
+    for difficulty in [1, 2, 3, 5]:
+        player = AIPlayer(transformer_params, 1, hand, difficulty)
+        card = player.play_card(prize_card.nval, prize_card, None)
+        assert isinstance(card, Card)
+        assert card.suit() == "Hearts"
+    assert hand.card_count() == 9
+
 
 def test_HumanPlayer(monkeypatch):
 
@@ -177,3 +187,26 @@ def test_AIHumanGame(mocker):
 
     mocker.patch("builtins.input", side_effect=inputs)
     human_game.run_game()
+
+
+def test_AIAIGame():
+    game = AIAIGame(transformer_params, 3, 5)
+    assert game.game_trace is None
+    winner = game.run_game()
+    assert winner in [0, 1, 2]
+    assert game.prize_deck.empty()
+    assert game.player_1._hand.empty()
+    assert game.player_2._hand.empty()
+
+    margin = game.score_margin()
+    if winner == 1:
+        assert margin > 0
+    elif winner == 2:
+        assert margin < 0
+    else:
+        assert margin == 0
+
+    game = AIAIGame(transformer_params, 1, 2, record_trace=True)
+    game.run_game()
+    assert game.game_trace.turn == 14
+    assert game.game_trace.to_json()["winner"] == game.winner
@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+import pytest
+
+from gops.batch_simulate import simulate_batch
+from gops.trace_batch import TraceBatch
+from gops.game_records import RECORD_DTYPE, HEADER, GameRecords, write_records, to_records, from_records
+
+
+def test_GameRecords(tmp_path):
+    batch = TraceBatch.from_batch_result(simulate_batch(100, 1, 5, seed=6))
+    assert RECORD_DTYPE.itemsize < 50
+    assert np.array_equal(from_records(to_records(batch)).pots, batch.pots)
+
+    shard_1 = str(tmp_path / "games_0.gr")
+    shard_2 = str(tmp_path / "games_1.gr")
+    write_records(shard_1, batch)
+    assert os.path.getsize(shard_1) == HEADER.size + 100 * RECORD_DTYPE.itemsize
+    write_records(shard_2, [batch.game_trace(game) for game in range(10)])
+    write_records(shard_2, to_records(batch)[10:30])
+    open(str(tmp_path / "empty.gr"), "wb").close()
+    write_records(str(tmp_path / "empty.gr"), batch, append=False)
+
+    games = GameRecords([shard_1, shard_2])
+    assert len(games) == 130
+    assert games[5]["winner"] == batch.winners[5]
+    assert np.array_equal(games[110]["bids_2"], batch.bids_2[10])
+    assert np.array_equal(games[-1]["prizes"], batch.prizes[29])
+    assert games.game_trace(120).to_json() == batch.to_json(20)
+    with pytest.raises(IndexError):
+        games[130]
+
+    picked = games.trace_batch([3, 105, 99])
+    assert np.array_equal(picked.final_scores_1, batch.final_scores_1[[3, 5, 99]])
+    assert len(games.trace_batch()) == 130
+    assert len(GameRecords(str(tmp_path / "empty.gr"))) == 100
+
+
+def test_GameRecords_bad_file(tmp_path):
+    filepath = str(tmp_path / "bad.gr")
+    with open(filepath, "wb") as outfile:
+        outfile.write(b"not a record file")
+    with pytest.raises(Exception):
+        GameRecords(filepath)
+    with pytest.raises(Exception):
+        write_records(filepath, np.zeros(2, dtype=np.uint8))
@@ -0,0 +1,70 @@
+import pytest
+
+from gops.cards import Card, Hand
+from gops.game import Player, PlayArea
+from gops.game_traces import GameTrace
+
+
+def play_turn(trace, play_area, player_1, player_2, prize, value_1, value_2):
+    play_area.flip_prize(Card("Clubs", prize))
+    trace.update_trace(player_1, player_2, play_area.prize_cards)
+    card_1 = player_1._hand.select_card("Hearts", value_1)
+    card_2 = player_2._hand.select_card("Spades", value_2)
+    play_area.flip_cards(card_1, card_2)
+    play_area.award_points(player_1, player_2)
+    return card_1, card_2
+
+
+def test_GameTrace():
+    player_1 = Player(Hand("Hearts"))
+    player_1.id = 1
+    player_2 = Player(Hand("Spades"))
+    player_2.id = 2
+    play_area = PlayArea()
+    trace = GameTrace()
+
+    # tie, the 5 carries over
+    cards = play_turn(trace, play_area, player_1, player_2, 5, 3, 3)
+    move = trace.game_trace[1].player_game_state_to_dict(1)
+    assert move["pre_play_data"]["prize_values"] == ["5"]
+    assert len(move["pre_play_data"]["own_hand"]) == 13
+    assert move["post_play_data"] == {}
+    trace.add_played_cards(*cards)
+
+    cards = play_turn(trace, play_area, player_1, player_2, "K", "K", 2)
+    turn_data = trace.game_trace[2]
+    assert trace.game_trace[2] is turn_data
+    move = turn_data.player_game_state_to_dict(2)
+    assert move["pre_play_data"]["prize_values"] == ["5", "K"]
+    assert move["pre_play_data"]["previous_prize_values"] == []
+    assert "3" not in move["pre_play_data"]["own_hand"]
+    assert len(move["pre_play_data"]["opponent_hand"]) == 12
+    trace.add_played_cards(*cards)
+
+    # the played cards show once the turn is over
+    assert trace.game_trace[2].player_game_state_to_dict(1)["post_play_data"] == {"own_played_card": "K"}
+    assert trace.game_trace[2].player_1_data.card_played is Card("Hearts", "K")
+
+    cards = play_turn(trace, play_area, player_1, player_2, "A", 2, 4)
+    move = trace.game_trace[3].player_game_state_to_dict(1)
+    assert move["pre_play_data"]["own_score"] == "18"
+    assert move["pre_play_data"]["opponent_score"] == "0"
+    assert move["pre_play_data"]["prize_values"] == ["A"]
+    assert move["pre_play_data"]["previous_prize_values"] == ["5", "K"]
+    assert trace.game_trace[3].player_1_data.player_hand.card_count() == 11
+    assert [card.nval for card in trace.game_trace[3].player_1_data.prev_cards_played] == [3, 13]
+    trace.add_played_cards(*cards)
+    trace.update_winner(1)
+
+    assert trace.turn == 4
+    assert len(trace.game_trace) == 3
+    assert list(trace.game_trace) == [1, 2, 3]
+    assert 4 not in trace.game_trace
+    with pytest.raises(KeyError):
+        trace.game_trace[4]
+
+    json_trace = trace.to_json()
+    assert sorted(json_trace["turns"]) == [1, 2, 3]
+    assert json_trace["turns"][3]["player_2_move"]["pre_play_data"]["opponent_score"] == "18"
+    assert json_trace["turns"][3]["player_2_move"]["post_play_data"] == {"own_played_card": "4"}
+    assert json_trace["winner"] == 1
@@ -0,0 +1,110 @@
+import time
+import random
+import pytest
+
+import gops.bitmask as bm
+from gops.mcts import MCTS, ROLLOUT_POLICIES, random_bid, strategy_1_bid, get_pool, parallel_search, \
+    parallel_select_bid
+from gops.game import AIAIGame
+
+transformer_params = {"epochs": 7,
+                      "version": 45,
+                      "topk": 1,
+                      "run_device": "cpu",
+                      "train_device": "xpu",
+                      "tokenizer": "HF",
+                      "nproc": 12}
+
+
+def test_rollout_bids():
+    for x in range(200):
+        hand = bm.nvals_to_mask(random.sample(range(1, 14), random.randint(1, 13)))
+        prize_value = random.randint(1, 30)
+        assert bm.in_mask(hand, random_bid(hand, prize_value))
+        assert bm.in_mask(hand, strategy_1_bid(hand, prize_value))
+
+    # a high prize never gets a low card other than the lowest
+    hand = bm.nvals_to_mask([2, 3, 4, 13])
+    for x in range(50):
+        assert strategy_1_bid(hand, 12) in [2, 13]
+
+
+def test_MCTS():
+    with pytest.raises(Exception):
+        MCTS(rollout="bad")
+
+    random.seed(0)
+    search = MCTS()
+    with pytest.raises(Exception):
+        search.search(0b11, 0b11, 0b1, 5, 0)
+
+    # last card, winning the 13 is the only way to win
+    own = bm.nvals_to_mask([1, 13])
+    opp = bm.nvals_to_mask([2, 12])
+    prizes = bm.nvals_to_mask([1])
+    assert search.select_bid(own, opp, prizes, 13, 0, iterations=2000) == 13
+
+    counts, totals = search.search(own, opp, prizes, 13, 0, iterations=10)
+    assert len(counts) == 2
+    assert sum(counts) > 2000
+
+    # the tree is kept, the position after the move is already searched
+    size = len(search.tree)
+    search.search(bm.nvals_to_mask([1]), bm.nvals_to_mask([2]), 0, 1, 13, iterations=1)
+    assert len(search.tree) == size
+
+    assert search.select_bid(own, opp, prizes, 13, 0, time_budget=0.01) in [1, 13]
+
+
+def test_parallel_select_bid():
+    own = bm.nvals_to_mask([1, 13])
+    opp = bm.nvals_to_mask([2, 12])
+    assert parallel_select_bid(2, own, opp, bm.nvals_to_mask([1]), 13, 0, 0.2) == 13
+
+
+def test_parallel_search_deadline():
+    own = bm.nvals_to_mask([1, 13])
+    opp = bm.nvals_to_mask([2, 12])
+    # keep both workers busy past the time budget, the searches then start
+    # after the deadline and stop after their one iteration, which only adds
+    # the root on a new tree (so at most one visit if a process runs both)
+    pool = get_pool(2)
+    busy = [pool.submit(time.sleep, 0.5) for x in range(2)]
+    counts = parallel_search(2, own, opp, bm.nvals_to_mask([1]), 13, 0, 0.1, exploration=1.23)
+    for future in busy:
+        future.result()
+    assert sum(counts) <= 1
+
+    counts = parallel_search(2, own, opp, bm.nvals_to_mask([1]), 13, 0, 0.1, exploration=1.24)
+    assert sum(counts) > 2
+
+
+
+def highest_bid(hand, prize_value):
+    return bm.mask_to_nvals(hand)[-1]
+
+
+def test_no_root_visits(mocker):
+    own = bm.nvals_to_mask([1, 13])
+    opp = bm.nvals_to_mask([2, 12])
+    prizes = bm.nvals_to_mask([1])
+    # one iteration only adds the root, the rollout policy then picks the bid
+    search = MCTS()
+    search.rollout_policy = highest_bid
+    assert search.search(own, opp, prizes, 13, 0, iterations=1)[0] == [0, 0]
+    search.tree.clear()
+    assert search.select_bid(own, opp, prizes, 13, 0, iterations=1) == 13
+
+    # a late start, the deadline has passed before the search
+    mocker.patch.dict(ROLLOUT_POLICIES, {"strategy_1": highest_bid})
+    assert parallel_search(1, own, opp, prizes, 13, 0, -1, exploration=1.25) == [0, 0]
+    assert parallel_select_bid(1, own, opp, prizes, 13, 0, -1, exploration=1.26) == 13
+
+
+def test_AIAIGame_mcts():
+    params = dict(transformer_params, mcts_time=0.002)
+    game = AIAIGame(params, 8, 3)
+    assert game.game_trace is not None
+    assert game.run_game() in [0, 1, 2]
+    assert game.player_1._hand.empty()
+    assert game.player_2._hand.empty()
@@ -0,0 +1,38 @@
+from gops.batch_simulate import simulate_batch
+from gops.trace_batch import TraceBatch
+from gops.trace_sink import TraceSink, read_traces, read_trace_lines
+from gops.statements import move_to_statement
+from gops.dataset_archive import ArchiveWriter, DatasetArchive
+from gops.pair_pipeline import trace_pairs, stream_pairs, write_pairs
+
+
+def test_trace_pairs():
+    json_trace = TraceBatch.from_batch_result(simulate_batch(1, 1, 3, seed=1)).to_json(0)
+    pairs = trace_pairs(json_trace)
+    assert len(pairs) == 26
+    sample = move_to_statement(json_trace["turns"][2]["player_2_move"])
+    assert pairs[3] == (sample["state"], sample["move"])
+
+
+def test_stream_pairs(tmp_path):
+    batch = TraceBatch.from_batch_result(simulate_batch(50, 2, 5, seed=4))
+    with TraceSink(str(tmp_path / "traces")) as sink:
+        for game in range(len(batch)):
+            sink.write(batch.to_json(game))
+
+    expected = []
+    for json_trace in batch.iter_json():
+        expected.extend(trace_pairs(json_trace))
+
+    assert list(stream_pairs(read_traces(str(tmp_path / "traces")), chunk_games=7)) == expected
+    assert list(stream_pairs(batch.iter_json(), workers=2, chunk_games=3, max_in_flight=2)) == expected
+
+    reports = []
+    index_path = str(tmp_path / "train_data_test.npy")
+    with ArchiveWriter(index_path, block_size=64) as writer:
+        count, elapsed = write_pairs(read_trace_lines(str(tmp_path / "traces")), writer, workers=2, chunk_games=8,
+                                     on_report=lambda *report: reports.append(report))
+    assert count == len(expected)
+    assert reports[-1][0] == count
+    archive = DatasetArchive(index_path)
+    assert [archive[sample] for sample in range(len(archive))] == expected
@@ -0,0 +1,62 @@
+import math
+
+from gops.ratings import RatingTable, player_name, rate_simulation
+
+transformer_params = {"epochs": 7,
+                      "version": 45,
+                      "topk": 1,
+                      "run_device": "cpu",
+                      "train_device": "xpu",
+                      "tokenizer": "HF",
+                      "nproc": 12}
+
+
+def test_RatingTable():
+    table = RatingTable(k_factor=32)
+    assert math.isclose(table.expected_score("a", "b"), 0.5)
+
+    table.record_game("a", "b", 1)
+    assert math.isclose(table.rating("a").rating, 1516)
+    assert math.isclose(table.rating("b").rating, 1484)
+    assert table.expected_score("a", "b") > 0.5
+
+    table.record_game("a", "b", 0)
+    assert table.rating("a").draws == 1
+    table.record_games("c", "a", [1, 1, 2])
+    assert table.rating("c").wins == 2
+    assert table.rating("c").losses == 1
+    assert table.rating("a").games == 5
+
+    # ratings are zero sum
+    total = sum(rating.rating for rating in table.ratings.values())
+    assert math.isclose(total, 3 * 1500)
+
+    leaders = table.leaderboard()
+    assert [rating.rating for rating in leaders] == sorted([rating.rating for rating in leaders], reverse=True)
+    assert len(table.leaderboard(top=2)) == 2
+    table.display_leaderboard()
+
+
+def test_RatingTable_save(tmp_path):
+    table = RatingTable()
+    table.record_games("a", "b", [1, 2, 1, 0])
+    filepath = str(tmp_path / "ratings.json")
+    table.save(filepath)
+
+    loaded = RatingTable.load(filepath)
+    for name in ["a", "b"]:
+        assert loaded.rating(name).to_dict() == table.rating(name).to_dict()
+
+
+def test_player_name():
+    assert player_name(3) == "difficulty_3"
+    assert player_name(3, transformer_params) == "difficulty_3"
+    assert player_name(4, transformer_params) == "7_v45_xpu_HF"
+
+
+def test_rate_simulation():
+    table = RatingTable()
+    result = rate_simulation(table, 40, 5, 2, seed=1)
+    assert table.rating("difficulty_5").games == 40
+    assert table.rating("difficulty_5").wins == result.p1_wins
+    assert table.leaderboard()[0].name == "difficulty_5"
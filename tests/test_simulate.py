@@ -0,0 +1,52 @@
+import pytest
+
+from gops.simulate import SimulationResult, simulate, play_game
+
+
+def test_play_game():
+    winner, margin = play_game(2, 2)
+    assert winner == 0
+    assert margin == 0
+
+
+def test_simulate():
+    result = simulate(50, 1, 3, seed=7)
+    assert result.games == 50
+    assert result.p1_wins + result.p2_wins + result.draws == 50
+    assert sum(result.margins.values()) == 50
+    assert result.games_per_sec() > 0
+
+    repeat = simulate(50, 1, 3, seed=7)
+    assert repeat.to_dict()["margins"] == result.to_dict()["margins"]
+
+    seen = []
+    simulate(5, 5, 1, on_game=lambda winner, margin: seen.append((winner, margin)))
+    assert len(seen) == 5
+
+    with pytest.raises(Exception):
+        simulate(1, 1, 6)
+
+
+def test_SimulationResult():
+    result_1 = SimulationResult(1, 2)
+    result_1.add_game(1, 10)
+    result_1.add_game(0, 0)
+
+    result_2 = SimulationResult(1, 2)
+    result_2.add_game(2, -4)
+    result_2.elapsed = 2.0
+
+    result_1.merge(result_2)
+    assert result_1.games == 3
+    assert result_1.p1_wins == 1
+    assert result_1.p2_wins == 1
+    assert result_1.draws == 1
+    assert result_1.mean_margin() == 2
+    assert result_1.games_per_sec() == 1.5
+
+    copy = SimulationResult.from_dict(result_1.to_dict())
+    assert copy.to_dict() == result_1.to_dict()
+    result_1.summary()
+
+    with pytest.raises(Exception):
+        result_1.merge(SimulationResult(2, 1))
@@ -0,0 +1,120 @@
+import math
+import numpy as np
+
+import gops.bitmask as bm
+from gops.solver import GopsSolver, solve_matrix_game, canonical_hands, sign, get_solver
+from gops.game import AIAIGame
+
+transformer_params = {"epochs": 7,
+                      "version": 45,
+                      "topk": 1,
+                      "run_device": "cpu",
+                      "train_device": "xpu",
+                      "tokenizer": "HF",
+                      "nproc": 12}
+
+
+def test_solve_matrix_game():
+    # matching pennies
+    value, row, col = solve_matrix_game(np.asarray([[1.0, -1.0], [-1.0, 1.0]]))
+    assert math.isclose(value, 0, abs_tol=1e-9)
+    assert np.allclose(row, [0.5, 0.5])
+    assert np.allclose(col, [0.5, 0.5])
+
+    # rock paper scissors with a doubled payoff for rock beating scissors
+    payoff = np.asarray([[0.0, -1.0, 2.0], [1.0, 0.0, -1.0], [-2.0, 1.0, 0.0]])
+    value, row, col = solve_matrix_game(payoff)
+    assert np.all(row @ payoff >= value - 1e-9)
+    assert np.all(payoff @ col <= value + 1e-9)
+
+    # saddle point
+    value, row, col = solve_matrix_game(np.asarray([[3.0, 1.0], [4.0, 2.0]]))
+    assert value == 2
+    assert list(row) == [0, 1]
+    assert list(col) == [0, 1]
+
+
+def test_canonical_hands():
+    assert canonical_hands(0b111, 0b111) == (0b111, 0b111)
+    # {3, 9} and {5, 12} compare like {1, 3} and {2, 4}
+    hand_1 = bm.nvals_to_mask([3, 9])
+    hand_2 = bm.nvals_to_mask([5, 12])
+    assert canonical_hands(hand_1, hand_2) == (bm.nvals_to_mask([1, 3]), bm.nvals_to_mask([2, 4]))
+    # shared cards share a rank
+    assert canonical_hands(bm.nvals_to_mask([4, 8]), bm.nvals_to_mask([8, 13])) == (0b011, 0b110)
+
+
+def test_GopsSolver():
+    solver = GopsSolver()
+    assert math.isclose(solver.game_value(4), 0, abs_tol=1e-9)
+    assert solver.states() > 0
+
+    # the lowest prize is taken with the lowest card
+    full = bm.full_mask(4)
+    solution = solver.node(full, full, bm.remove_nval(full, 1), 1, 0)
+    assert solution.strategy_1[0] == 1
+
+    # last card is forced, a final tie awards nothing
+    assert solver.chance_value(0b1, 0b1, 0b1, 5, 2) == 1
+    assert solver.chance_value(0b1, 0b1, 0b1, 5, 0) == 0
+    assert solver.node(0b10, 0b01, 0, 5, -4).value == 1
+
+    # decided positions are cut off
+    assert solver.chance_value(0b11, 0b11, 0b11, 0, -10) == -1
+
+    # equilibrium strategies concede nothing to a best response
+    def best_response(hand_1, hand_2, prizes, pot, diff):
+        if prizes == 0 and hand_1 == 0:
+            return sign(diff)
+        values = []
+        for prize in bm.mask_to_nvals(prizes):
+            rest = bm.remove_nval(prizes, prize)
+            solution = solver.node(hand_1, hand_2, rest, pot + prize, diff)
+            worst = None
+            for bid_2 in bm.mask_to_nvals(hand_2):
+                total = 0
+                for prob, bid_1 in zip(solution.strategy_1, bm.mask_to_nvals(hand_1)):
+                    if prob == 0:
+                        continue
+                    rest_1 = bm.remove_nval(hand_1, bid_1)
+                    rest_2 = bm.remove_nval(hand_2, bid_2)
+                    if bid_1 > bid_2:
+                        total += prob * best_response(rest_1, rest_2, rest, 0, diff + pot + prize)
+                    elif bid_2 > bid_1:
+                        total += prob * best_response(rest_1, rest_2, rest, 0, diff - pot - prize)
+                    else:
+                        total += prob * best_response(rest_1, rest_2, rest, pot + prize, diff)
+                worst = total if worst is None else min(worst, total)
+            values.append(worst)
+        return sum(values) / len(values)
+
+    assert best_response(full, full, full, 0, 0) > -1e-9
+
+
+def test_GopsSolver_margin_weight():
+    solver = GopsSolver(margin_weight=0.01)
+    # still decided, but the bigger margin is worth more
+    assert math.isclose(solver.chance_value(0b1, 0b1, 0b1, 0, -10), -1.1)
+    full = bm.full_mask(3)
+    assert math.isclose(solver.game_value(3), 0, abs_tol=1e-9)
+    solution = solver.node(full, bm.nvals_to_mask([1, 2, 3]), bm.nvals_to_mask([1, 2]), 3, 0)
+    assert math.isclose(sum(solution.strategy_1), 1)
+
+
+def test_equilibrium_player():
+    params = dict(transformer_params)
+    params["solver_cards"] = 3
+    game = AIAIGame(params, 7, 1)
+    assert game.game_trace is not None
+    assert game.run_game() in [0, 1, 2]
+    assert game.player_1.solver.states() > 0
+    assert game.player_1._hand.empty()
+
+    # the memo carries over to the next game
+    states = game.player_1.solver.states()
+    next_game = AIAIGame(params, 1, 7)
+    next_game.run_game()
+    assert next_game.player_2.solver is game.player_1.solver
+    assert next_game.player_2.solver.states() >= states
+    assert get_solver(0.001) is game.player_1.solver
+    assert get_solver(0.0) is not get_solver(0.001)
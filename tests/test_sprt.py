@@ -0,0 +1,48 @@
+import math
+import pytest
+
+from gops.sprt import SPRT, ACCEPT_H0, ACCEPT_H1, run_sprt
+
+
+def test_SPRT():
+    test = SPRT(0.5, 0.6, alpha=0.05, beta=0.1)
+    assert math.isclose(test.upper, math.log(0.9 / 0.05))
+    assert math.isclose(test.lower, math.log(0.1 / 0.95))
+    assert test.verdict() is None
+
+    # draws do not move the test
+    test.add_game(0)
+    assert test.llr == 0
+    assert test.confidence() == 0.5
+
+    for x in range(200):
+        test.add_game(1)
+        if test.verdict() is not None:
+            break
+    assert test.verdict() == ACCEPT_H1
+    assert test.confidence() > 0.9
+
+    test = SPRT(0.5, 0.6)
+    for x in range(200):
+        test.add_game(2)
+    assert test.verdict() == ACCEPT_H0
+
+    with pytest.raises(Exception):
+        SPRT(0.5, 0.5)
+
+
+def test_run_sprt():
+    # difficulty 5 beats the prize card strategy nearly every game
+    result = run_sprt(5, 2, seed=1)
+    assert result.verdict == ACCEPT_H1
+    assert result.games < 100
+    assert result.games == result.result.games
+
+    result = run_sprt(2, 5, seed=1)
+    assert result.verdict == ACCEPT_H0
+
+    # identical strategies only draw, so the game limit stops the test
+    result = run_sprt(2, 2, max_games=30)
+    assert result.verdict is None
+    assert result.games == 30
+    result.summary()
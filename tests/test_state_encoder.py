@@ -0,0 +1,81 @@
+import torch
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+import gops.bitmask as bm
+from gops.cards import Hand
+from gops.engine import move_data_from_position
+from gops.util import get_path_names
+from gops.statements import state_to_statement
+from gops.batch_simulate import simulate_batch
+from gops.trace_batch import TraceBatch
+from gops.state_encoder import StateEncoder, encoder_for, load_state_encoder
+from model_components.transformer_components import Seq2SeqTransformer, construct_text_transform
+from model_components.inference_components import translate_random, translate_ids
+
+app_paths = get_path_names(7, 45, "xpu", "HF")
+
+
+def test_StateEncoder():
+    tokenizer = Tokenizer.from_file(app_paths["state_tokenizer_path"])
+    encoder = StateEncoder(tokenizer)
+
+    batch = TraceBatch.from_batch_result(simulate_batch(40, 1, 5, seed=9))
+    for json_trace in batch.iter_json():
+        for turn in json_trace["turns"].values():
+            for move in ["player_1_move", "player_2_move"]:
+                move_data = turn[move]
+                assert encoder.encode(move_data) == tokenizer.encode(state_to_statement(move_data)).ids
+
+    # words missing from the vocab come out as <unk> both ways
+    move_data = move_data_from_position(0b1000000000001, 0b0100000000010, 0b0000111111100, 0b0000000000001, -20)
+    ids = encoder.encode(move_data)
+    assert ids == tokenizer.encode(state_to_statement(move_data)).ids
+    assert ids[0] == 1 and ids[-1] == 2 and len(ids) == 8
+    assert encoder.encode_masks(bm.FULL_SUIT, 0, bm.FULL_SUIT, 0, 13, 0) == \
+        encoder.encode(move_data_from_position(bm.FULL_SUIT, bm.FULL_SUIT, bm.FULL_SUIT & ~bm.nval_bit(13),
+                                               bm.nval_bit(13), 0))
+
+
+def test_encoder_for():
+    assert isinstance(encoder_for(Tokenizer.from_file(app_paths["state_tokenizer_path"])), StateEncoder)
+    encoder = load_state_encoder(app_paths["state_tokenizer_path"])
+    assert load_state_encoder(app_paths["state_tokenizer_path"]) is encoder
+
+    # no <bos>/<eos> template, the ids could not be reproduced
+    other = Tokenizer(WordLevel({"<unk>": 0, "a": 1}, unk_token="<unk>"))
+    other.pre_tokenizer = Whitespace()
+    assert encoder_for(other) is None
+
+
+def test_select_transformer_model_ids(mocker):
+    state_tokenizer = Tokenizer.from_file(app_paths["state_tokenizer_path"])
+    move_tokenizer = Tokenizer.from_file(app_paths["move_tokenizer_path"])
+    text_transform = construct_text_transform(state_tokenizer, move_tokenizer, "state", "move")
+    torch.manual_seed(0)
+    model = Seq2SeqTransformer(1, 1, 16, 2, state_tokenizer.get_vocab_size(), move_tokenizer.get_vocab_size(),
+                               dim_feedforward=32)
+
+    move_data = TraceBatch.from_batch_result(simulate_batch(1, 1, 3, seed=2)).to_json(0)["turns"][4]["player_1_move"]
+    statement = state_to_statement(move_data)
+    src_ids = StateEncoder(state_tokenizer).encode(move_data)
+    torch.manual_seed(1)
+    expected = translate_random(model, statement, text_transform, "move", "state", 1, "cpu", 2, 3)
+    torch.manual_seed(1)
+    assert translate_ids(model, src_ids, text_transform, "move", 1, "cpu", 2, 3) == expected
+
+    # the hand passes the model the same ids either way, once per move
+    mocker.patch.dict("gops.cards._TRANSFORMER_MODELS", clear=True)
+    mocker.patch("gops.cards.torch.load", return_value=model)
+    seen = []
+    mocker.patch("gops.cards.translate_ids", side_effect=lambda model, ids, *args: seen.append(ids) or "played_card_5")
+    mocker.patch("gops.cards.translate_random", side_effect=lambda model, statement, text_transform, *args:
+                 seen.append(text_transform["state"].encode(statement).ids) or "played_card_6")
+    hand = Hand("Hearts")
+    assert hand.select_transformer_model(move_data, app_paths, 3, "cpu", "HF").nval == 5
+    assert hand.state_encoder is load_state_encoder(app_paths["state_tokenizer_path"])
+    assert Hand("Clubs").select_transformer_model(move_data, app_paths, 3, "cpu", "HF").nval == 5
+    hand.state_encoder = None
+    assert hand.select_transformer_model(move_data, app_paths, 3, "cpu", "HF").nval == 6
+    assert seen == [src_ids, src_ids, src_ids]
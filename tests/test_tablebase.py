@@ -0,0 +1,70 @@
+import random
+import pytest
+
+import gops.bitmask as bm
+from gops.solver import GopsSolver
+from gops.tablebase import Tablebase, build_tablebase, hand_patterns, subset_rank, load_tablebase
+from gops.game import AIAIGame
+
+transformer_params = {"epochs": 7,
+                      "version": 45,
+                      "topk": 1,
+                      "run_device": "cpu",
+                      "train_device": "xpu",
+                      "tokenizer": "HF",
+                      "nproc": 12}
+
+
+def test_hand_patterns():
+    assert hand_patterns(1) == [(0b1, 0b10), (0b10, 0b1), (0b1, 0b1)]
+    assert len(hand_patterns(2)) == 13
+    assert len(set(hand_patterns(3))) == 63
+
+    ranks = sorted(subset_rank(bm.nvals_to_mask([a, b])) for a in range(1, 6) for b in range(a + 1, 6))
+    assert ranks == list(range(10))
+
+
+def test_Tablebase(tmp_path):
+    filepath = str(tmp_path / "tablebase.bin")
+    build_tablebase(filepath, max_cards=3, pot_max=6, n_cards=5)
+    tablebase = Tablebase(filepath)
+    assert tablebase.max_cards == 3
+
+    solver = GopsSolver()
+    for x in range(300):
+        cards = random.randint(1, 3)
+        own = bm.nvals_to_mask(random.sample(range(1, 14), cards))
+        opp = bm.nvals_to_mask(random.sample(range(1, 14), cards))
+        prizes = bm.nvals_to_mask(random.sample(range(1, 6), cards - 1))
+        pot = random.randint(1, 6)
+        diff = random.randint(-20, 20)
+
+        value, strategy = tablebase.lookup(own, opp, prizes, pot, diff)
+        solution = solver.node(own, opp, prizes, pot, diff)
+        assert value == pytest.approx(solution.value, abs=1e-6)
+        assert strategy == pytest.approx(solution.strategy_1, abs=1e-6)
+        assert bm.in_mask(own, tablebase.select_bid(own, opp, prizes, pot, diff))
+
+    # out of the table
+    assert tablebase.lookup(0b1111, 0b1111, 0b111, 1, 0) is None
+    assert tablebase.lookup(0b1, 0b1, 0, 7, 0) is None
+    assert tablebase.select_bid(0b1, 0b1, 0, 7, 0) is None
+
+    with open(filepath, "r+b") as outfile:
+        outfile.write(b"NOTATB00")
+    with pytest.raises(Exception):
+        Tablebase(filepath)
+
+
+def test_AIAIGame_tablebase(tmp_path):
+    filepath = str(tmp_path / "tablebase.bin")
+    build_tablebase(filepath, max_cards=2, pot_max=5)
+    assert load_tablebase(filepath) is load_tablebase(filepath)
+
+    params = dict(transformer_params, tablebase=filepath)
+    for x in range(5):
+        game = AIAIGame(params, 1, 3)
+        assert game.game_trace is not None
+        assert game.run_game() in [0, 1, 2]
+        assert game.player_1._hand.empty()
+        assert game.player_2._hand.empty()
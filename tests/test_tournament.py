@@ -0,0 +1,28 @@
+import numpy as np
+
+from gops.tournament import run_tournament
+
+
+def test_run_tournament():
+    difficulties = [1, 2, 5]
+    tournament = run_tournament(30, difficulties, seed=4, workers=2, chunk_size=20)
+
+    assert tournament.games() == 30 * 9
+    for result in tournament.results.values():
+        assert result.games == 30
+
+    total = tournament.win_matrix() + tournament.draw_matrix() + tournament.loss_matrix()
+    assert np.allclose(total, 1)
+
+    # prize card strategy against itself always ties
+    assert tournament.draw_matrix()[1, 1] == 1
+    assert tournament.margin_matrix()[1, 1] == 0
+
+    repeat = run_tournament(30, difficulties, seed=4, workers=1, chunk_size=20)
+    assert np.allclose(repeat.margin_matrix(), tournament.margin_matrix())
+    tournament.summary()
+
+
+def test_run_tournament_default():
+    tournament = run_tournament(0, workers=1)
+    assert tournament.difficulties == [1, 2, 3, 4, 5]
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from gops.cards import Card, Hand
+from gops.game import Player, PlayArea
+from gops.game_traces import GameTrace
+from gops.batch_simulate import simulate_batch
+from gops.trace_batch import TraceBatch
+import gops.bitmask as bm
+
+
+def replay(prizes, bids_1, bids_2) -> GameTrace:
+    # plays the moves through the real game objects
+    player_1 = Player(Hand("Hearts"))
+    player_1.id = 1
+    player_2 = Player(Hand("Spades"))
+    player_2.id = 2
+    play_area = PlayArea()
+    trace = GameTrace()
+    for prize, bid_1, bid_2 in zip(prizes, bids_1, bids_2):
+        play_area.flip_prize(Card("Clubs", bm.nval_to_value(int(prize))))
+        trace.update_trace(player_1, player_2, play_area.prize_cards)
+        card_1 = player_1._hand.find_card(Card("Hearts", bm.nval_to_value(int(bid_1))))
+        card_2 = player_2._hand.find_card(Card("Spades", bm.nval_to_value(int(bid_2))))
+        trace.add_played_cards(card_1, card_2)
+        play_area.flip_cards(card_1, card_2)
+        play_area.award_points(player_1, player_2)
+
+    if player_1.score() > player_2.score():
+        trace.update_winner(1)
+    elif player_2.score() > player_1.score():
+        trace.update_winner(2)
+    else:
+        trace.update_winner(0)
+    return trace
+
+
+def test_TraceBatch():
+    result = simulate_batch(200, 1, 5, seed=3)
+    batch = TraceBatch.from_batch_result(result)
+    assert len(batch) == 200
+    assert batch.pots.shape == (200, 13)
+    assert batch.nbytes() < 200 * 100
+    assert np.array_equal(batch.final_scores_1, result.scores_1)
+    assert np.array_equal(batch.winners, result.winners)
+    assert np.array_equal(batch.scores_1[:, 0], np.zeros(200))
+    assert np.array_equal(batch.pots[:, 0], batch.prizes[:, 0])
+
+    traces = []
+    for game in range(0, 200, 10):
+        trace = replay(batch.prizes[game], batch.bids_1[game], batch.bids_2[game])
+        assert batch.to_json(game) == trace.to_json()
+        traces.append(trace)
+
+    rebuilt = TraceBatch.from_game_traces(traces)
+    assert np.array_equal(rebuilt.bids_2, batch.bids_2[::10])
+    assert np.array_equal(rebuilt.pots, batch.pots[::10])
+    assert next(rebuilt.iter_json()) == batch.to_json(0)
+
+    joined = TraceBatch.concatenate([batch, rebuilt])
+    assert len(joined) == 220
+    assert joined.to_json(210) == batch.to_json(100)
+
+    with pytest.raises(Exception):
+        TraceBatch(np.zeros((2, 12)), np.zeros((2, 12)), np.zeros((2, 12)))
+    with pytest.raises(Exception):
+        TraceBatch.from_game_traces([GameTrace()])
+
+
+def test_TraceBatch_save(tmp_path):
+    batch = TraceBatch.from_batch_result(simulate_batch(20, 2, 3, seed=1))
+    filepath = str(tmp_path / "traces.npz")
+    batch.save(filepath)
+    loaded = TraceBatch.load(filepath)
+    assert np.array_equal(loaded.scores_2, batch.scores_2)
+    assert loaded.to_json(7) == batch.to_json(7)
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from gops.simulate import simulate
+from gops.trace_batch import TraceBatch
+from gops.batch_simulate import simulate_batch
+from gops.trace_sink import TraceSink, read_traces, shard_paths
+
+
+def test_TraceSink(tmp_path):
+    directory = str(tmp_path)
+    batch = TraceBatch.from_batch_result(simulate_batch(30, 1, 3, seed=2))
+    with TraceSink(directory, max_shard_bytes=20000, queue_size=4) as sink:
+        for game in range(len(batch)):
+            sink.write(batch.game_trace(game))
+        sink.flush()
+        assert sink.games == 30
+
+    paths = shard_paths(directory)
+    assert len(paths) > 1
+    for path in paths[:-1]:
+        assert os.path.getsize(path) <= 20000
+
+    games = list(read_traces(directory))
+    assert len(games) == 30
+    assert games[4]["winner"] == batch.winners[4]
+    assert games[4]["turns"]["13"] == batch.to_json(4)["turns"][13]
+
+    # reopening keeps the old shards and appends new ones after them
+    with TraceSink(directory) as sink:
+        sink.write({"turns": {}, "winner": 0})
+    assert len(shard_paths(directory)) == len(paths) + 1
+    assert list(read_traces(directory))[-1] == {"turns": {}, "winner": 0}
+
+    with pytest.raises(Exception):
+        sink.write({"turns": {}, "winner": 0})
+
+
+def test_TraceSink_error(tmp_path):
+    sink = TraceSink(str(tmp_path))
+    sink.write({"bad": object()})
+    with pytest.raises(Exception):
+        sink.flush()
+    with pytest.raises(Exception):
+        sink.close()
+
+
+def test_simulate_trace_sink(tmp_path):
+    with TraceSink(str(tmp_path)) as sink:
+        result = simulate(5, 1, 3, seed=4, trace_sink=sink)
+    games = list(read_traces(str(tmp_path)))
+    assert len(games) == 5
+    assert [game["winner"] for game in games].count(1) == result.p1_wins
+    assert len(games[0]["turns"]) == 13
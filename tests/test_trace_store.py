@@ -0,0 +1,53 @@
+import json
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+from gops.batch_simulate import simulate_batch
+from gops.trace_batch import TraceBatch
+from gops.statements import move_to_statement
+from gops.trace_store import TraceStore
+from model_components.training_components import get_most_freq_move
+
+
+def test_TraceStore(tmp_path):
+    batch = TraceBatch.from_batch_result(simulate_batch(60, 1, 2, seed=5))
+    # half the games come back from JSON with string turn numbers
+    games = [batch.game_trace(game) for game in range(30)] + \
+        [json.loads(json.dumps(batch.to_json(game))) for game in range(30, 60)]
+
+    with TraceStore(str(tmp_path / "traces.db")) as store:
+        assert store.ingest(games, batch_size=7) == 60
+        assert len(store) == 60
+
+        samples = []
+        for trace in batch.iter_json():
+            for turn in trace["turns"].values():
+                for move in ["player_1_move", "player_2_move"]:
+                    samples.append(move_to_statement(turn[move]))
+
+        state = samples[30]["state"]
+        expected = Counter(int(sample["move"].split("_")[-1]) for sample in samples if sample["state"] == state)
+        assert dict(store.moves_from_state(state)) == expected
+        assert store.moves_from_state("no such state") == []
+
+        opening = [(int(batch.prizes[0, 0]), int(batch.bids_1[0, 0]), int(batch.bids_2[0, 0]))]
+        matching = [game for game in range(60) if (batch.prizes[game, 0], batch.bids_1[game, 0],
+                                                   batch.bids_2[game, 0]) == opening[0]]
+        result = store.win_rate(opening)
+        assert result["games"] == len(matching)
+        assert result["wins"] == sum(batch.winners[game] == 1 for game in matching)
+        assert store.win_rate(opening, player=2)["wins"] == sum(batch.winners[game] == 2 for game in matching)
+        assert store.win_rate([])["games"] == 60
+        two_turns = opening + [(int(batch.prizes[0, 1]), int(batch.bids_1[0, 1]), int(batch.bids_2[0, 1]))]
+        assert 1 <= store.win_rate(two_turns)["games"] <= len(matching)
+
+        frame = pd.DataFrame([(sample["state"], sample["move"]) for sample in samples], columns=["State", "Move"])
+        expected = set(map(tuple, get_most_freq_move(frame).values.tolist()))
+        assert set(store.most_frequent_moves()) == expected
+
+        with pytest.raises(Exception):
+            store.win_rate([], player=3)
+        with pytest.raises(Exception):
+            store.ingest([{"turns": {1: {"player_1_move": {}}}, "winner": 0}])
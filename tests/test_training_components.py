@@ -0,0 +1,66 @@
+import os
+import random
+
+import pandas as pd
+
+from model_components.training_components import MoveCounter, get_most_freq_move
+
+
+def pandas_most_freq_move(data):
+    # the groupby version get_most_freq_move replaced
+    dup_count_df = data.groupby(["State", "Move"]).transform("size").rename("Dup_Count")
+    data = data.join(dup_count_df)
+    data = data.drop_duplicates()
+
+    max_idx = data.groupby(["State"])["Dup_Count"].transform("max") == data["Dup_Count"]
+    data = data[max_idx]
+    data = data.drop(["Dup_Count"], axis=1)
+    return data
+
+
+def sample_frame(n_rows, seed):
+    rng = random.Random(seed)
+    rows = [("player_hand_{} current_score_card_{}".format(rng.randint(0, 20), rng.randint(1, 3)),
+             "played_card_{}".format(rng.randint(1, 4))) for row in range(n_rows)]
+    return pd.DataFrame(rows, columns=["State", "Move"])
+
+
+def test_get_most_freq_move():
+    data = sample_frame(3000, 1)
+    expected = pandas_most_freq_move(data)
+    assert get_most_freq_move(data).equals(expected)
+    # spilling to disk gives the same rows in the same order
+    assert get_most_freq_move(data, max_entries=10).equals(expected)
+
+    shuffled = data.sample(frac=1, random_state=2)
+    assert get_most_freq_move(shuffled, max_entries=25).equals(pandas_most_freq_move(shuffled))
+
+
+def test_MoveCounter():
+    pairs = [("a", "1"), ("b", "2"), ("a", "2"), ("a", "1"), ("b", "1"), ("c", "3"), ("b", "1"), ("a", "2")]
+    with MoveCounter(max_entries=2, partitions=3) as counter:
+        counter.add_many(pairs)
+        tmp_dir = counter.tmp_dir
+        assert os.path.isdir(tmp_dir)
+        assert list(counter.most_frequent()) == [("a", "1", 2), ("a", "2", 2), ("b", "1", 2), ("c", "3", 1)]
+    assert not os.path.exists(tmp_dir)
+
+    counter = MoveCounter()
+    counter.add_many(pairs)
+    assert counter.tmp_dir is None
+    assert list(counter.most_frequent())[2] == ("b", "1", 2)
+
+
+def test_MoveCounter_unique():
+    data = sample_frame(2000, 5)
+    pairs = list(zip(data["State"], data["Move"]))
+    expected = {}
+    for pair in pairs:
+        expected[pair] = expected.get(pair, 0) + 1
+
+    for max_entries in [10**6, 30]:
+        with MoveCounter(max_entries=max_entries, partitions=4) as counter:
+            counter.add_many(pairs)
+            unique = list(counter.unique())
+        assert [(state, move) for state, move, count in unique] == list(expected)
+        assert [count for state, move, count in unique] == list(expected.values())
@@ -0,0 +1,72 @@
+import random
+import pytest
+
+import gops.engine as engine
+import gops.bitmask as bm
+from gops.engine import GameState
+from gops.zobrist import hash_position, hash_state, step_key, toggle_card, TranspositionTable
+
+
+def test_step_key():
+    for game in range(50):
+        state = engine.random_state()
+        key = hash_state(state)
+        while not engine.is_terminal(state):
+            bid_1 = random.choice(engine.legal_bids(state.hand_1))
+            bid_2 = random.choice(engine.legal_bids(state.hand_2))
+            key = step_key(key, state, bid_1, bid_2)
+            state = engine.step(state, bid_1, bid_2)
+            assert key == hash_state(state)
+            assert 0 <= key < 2**64
+
+
+def test_hash_state():
+    # scores only count through their diff, play order does not count
+    state = GameState(0b1100, 0b0011, (5, 9), 0, 30, 20)
+    assert hash_state(state) == hash_state(state._replace(score_1=40, score_2=30))
+    assert hash_state(state) == hash_state(state._replace(prizes=(9, 5)))
+    assert hash_state(state) != hash_state(state._replace(score_1=31))
+    assert hash_state(state) != hash_state(state._replace(pot=3))
+    assert hash_state(state) != hash_state(state._replace(hand_1=0b0011, hand_2=0b1100))
+
+    key = hash_position(0b1100, 0b0011, bm.nvals_to_mask([5, 9]), 0, 10)
+    assert key == hash_state(state)
+    assert toggle_card(toggle_card(key, 1, 3), 1, 3) == key
+    assert toggle_card(key, 1, 3) == hash_position(0b1000, 0b0011, bm.nvals_to_mask([5, 9]), 0, 10)
+
+
+def test_TranspositionTable():
+    with pytest.raises(Exception):
+        TranspositionTable(6)
+
+    table = TranspositionTable(4)
+    table.store(0, "a", depth=5)
+    assert table.lookup(0) == "a"
+    assert 0 in table
+    assert table.lookup(1) is None
+    assert table.hits == 1
+    assert table.misses == 1
+
+    # same bucket, shallower entries only take the second slot
+    table.store(2, "b", depth=1)
+    table.store(4, "c", depth=1)
+    assert table.lookup(0) == "a"
+    assert table.lookup(2) is None
+    assert table.lookup(4) == "c"
+
+    # a deeper entry takes the first slot and moves the old one down
+    table.store(6, "d", depth=7)
+    assert table.lookup(6) == "d"
+    assert table.lookup(0) == "a"
+    assert table.lookup(4) is None
+
+    # updating a key keeps one copy
+    table.store(0, "e", depth=9)
+    assert table.lookup(0) == "e"
+    assert len(table) == 2
+
+    table.store(3, "f")
+    assert len(table) == 3
+    table.clear()
+    assert len(table) == 0
+    assert table.lookup(0) is None